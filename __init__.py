@@ -17,14 +17,34 @@ import bpy
 import os
 import sys
 import json
+import hashlib
 import threading
 import webbrowser
 import shutil
 import socket
 import tempfile
+import time
+import gzip
+import zipfile
+import math
+import struct
+import importlib.util
+from collections import deque
+from contextlib import contextmanager
+import urllib.error
+import urllib.request
+from array import array
 from pathlib import Path
 import subprocess
-from bpy.props import BoolProperty, StringProperty
+import numpy
+from bpy.app.handlers import persistent
+from bpy.props import BoolProperty, EnumProperty, IntProperty, StringProperty
+from mathutils import Vector
+
+try:
+    import brotli  # optional; not bundled with Blender's Python
+except ImportError:
+    brotli = None
 
 # Global server variable
 preview_server = None
@@ -71,6 +91,59 @@ def copy_vite_dist_contents(destination: Path):
         else:
             shutil.copy2(item, target)
 
+# ------------------------------------
+# Export Profiles
+# ------------------------------------
+
+# Keys not prefixed ``export_`` are the add-on's own: ``texture_max_size``
+# caps image sizes and ``animation_tolerance`` scales ``ANIMATION_TOLERANCES``
+# for the animation optimiser (0 leaves tracks as exported).
+EXPORT_PROFILES = {
+    'FAST_PREVIEW': {
+        'export_draco_mesh_compression_enable': True,
+        'export_draco_mesh_compression_level': 3,
+        'export_draco_position_quantization': 11,
+        'export_draco_normal_quantization': 8,
+        'export_draco_texcoord_quantization': 10,
+        'export_draco_color_quantization': 8,
+        'export_draco_generic_quantization': 12,
+        'export_image_format': 'WEBP',
+        'export_image_quality': 75,
+        'export_gpu_instances': True,
+        'texture_max_size': 1024,
+        'animation_tolerance': 1.0,
+    },
+    'BALANCED': {
+        'export_draco_mesh_compression_enable': True,
+        'export_draco_mesh_compression_level': 6,
+        'export_draco_position_quantization': 14,
+        'export_draco_normal_quantization': 10,
+        'export_draco_texcoord_quantization': 12,
+        'export_draco_color_quantization': 10,
+        'export_draco_generic_quantization': 12,
+        'export_image_format': 'WEBP',
+        'export_image_quality': 90,
+        'export_gpu_instances': True,
+        'texture_max_size': 2048,
+        'animation_tolerance': 0.5,
+    },
+    'FINAL': {
+        'export_draco_mesh_compression_enable': False,
+        'export_image_format': 'AUTO',
+        'texture_max_size': 0,
+        'animation_tolerance': 0.25,
+    },
+}
+
+EXPORT_PROFILE_ITEMS = (
+    ('FAST_PREVIEW', "fast preview", "Aggressive Draco compression, WebP textures capped at 1024px"),
+    ('BALANCED', "balanced", "Moderate Draco compression, WebP textures capped at 2048px"),
+    ('FINAL', "final export", "No geometry compression, original textures"),
+)
+
+# Default size of the on-disk content store (see ContentStore).
+CONTENT_STORE_DEFAULT_MB = 2048
+
 # ------------------------------------
 # Preferences
 # ------------------------------------
@@ -135,6 +208,68 @@ class BlendXWebAddonPreferences(bpy.types.AddonPreferences):
         maxlen=1,
         update=_update_shortcut_key,
     )
+    server_mode: EnumProperty(
+        name="Server Mode",
+        description="Where the preview server runs when no server answers on the port yet",
+        items=(
+            ('IN_PROCESS', "in Blender", "Serve from a background thread of this Blender instance"),
+            ('PROCESS', "separate process", "Start a detached server process that outlives this instance"),
+        ),
+        default='IN_PROCESS',
+        update=_mark_preferences_dirty,
+    )
+    server_engine: EnumProperty(
+        name="Server Engine",
+        description="Concurrency model of the preview server",
+        items=(
+            ('threaded', "threaded", "One thread per connection"),
+            ('asyncio', "asyncio", "Single event loop; scales to many open viewers"),
+        ),
+        default='threaded',
+        update=_mark_preferences_dirty,
+    )
+    export_profile: EnumProperty(
+        name="Preview Profile",
+        description="Compression and texture settings used for browser previews",
+        items=EXPORT_PROFILE_ITEMS,
+        default='FAST_PREVIEW',
+        update=_mark_preferences_dirty,
+    )
+    export_mode: EnumProperty(
+        name="Export Mode",
+        description="How the preview scene is written for the browser",
+        items=(
+            ('SINGLE', "single file", "Export the whole scene as one scene.glb"),
+            ('CHUNKED', "per object", "Export one GLB per top-level object and re-export only changed ones"),
+        ),
+        default='SINGLE',
+        update=_mark_preferences_dirty,
+    )
+
+    session_quota_mb: IntProperty(
+        name="Session Disk Quota",
+        description="Disk space (MB) the shared preview server may use for all sessions before "
+                    "evicting the least recently used ones; applies when this instance starts the server",
+        default=4096,
+        min=0,
+        update=_mark_preferences_dirty,
+    )
+
+    content_store_mb: IntProperty(
+        name="Content Store Size",
+        description="Disk space (MB) for exported files reused across refreshes, packages and "
+                    "Blender instances; 0 disables the store",
+        default=CONTENT_STORE_DEFAULT_MB,
+        min=0,
+        update=_mark_preferences_dirty,
+    )
+
+    use_lod: BoolProperty(
+        name="Progressive Loading",
+        description="Also export decimated coarse levels that the viewer shows while scene.glb downloads",
+        default=True,
+        update=_mark_preferences_dirty,
+    )
 
     def draw(self, context):
         layout = self.layout
@@ -166,6 +301,66 @@ class BlendXWebAddonPreferences(bpy.types.AddonPreferences):
         port_value_row.ui_units_x = 4
         port_value_row.prop(self, "server_port", text="")
 
+        server_mode_row = layout.row(align=True)
+        server_mode_row.alignment = 'LEFT'
+        server_mode_row.scale_x = 0
+        server_mode_row.label(text="server-mode:     ")
+        server_mode_value_row = server_mode_row.row(align=True)
+        server_mode_value_row.scale_x = 0
+        server_mode_value_row.ui_units_x = 6
+        server_mode_value_row.prop(self, "server_mode", text="")
+
+        engine_row = layout.row(align=True)
+        engine_row.alignment = 'LEFT'
+        engine_row.scale_x = 0
+        engine_row.label(text="server-engine:   ")
+        engine_value_row = engine_row.row(align=True)
+        engine_value_row.scale_x = 0
+        engine_value_row.ui_units_x = 6
+        engine_value_row.prop(self, "server_engine", text="")
+
+        quota_row = layout.row(align=True)
+        quota_row.alignment = 'LEFT'
+        quota_row.scale_x = 0
+        quota_row.label(text="session-quota:   ")
+        quota_value_row = quota_row.row(align=True)
+        quota_value_row.scale_x = 0
+        quota_value_row.ui_units_x = 6
+        quota_value_row.prop(self, "session_quota_mb", text="")
+
+        store_row = layout.row(align=True)
+        store_row.alignment = 'LEFT'
+        store_row.scale_x = 0
+        store_row.label(text="content-store:   ")
+        store_value_row = store_row.row(align=True)
+        store_value_row.scale_x = 0
+        store_value_row.ui_units_x = 6
+        store_value_row.prop(self, "content_store_mb", text="")
+
+        mode_row = layout.row(align=True)
+        mode_row.alignment = 'LEFT'
+        mode_row.scale_x = 0
+        mode_row.label(text="export-mode:     ")
+        mode_value_row = mode_row.row(align=True)
+        mode_value_row.scale_x = 0
+        mode_value_row.ui_units_x = 6
+        mode_value_row.prop(self, "export_mode", text="")
+
+        lod_row = layout.row(align=True)
+        lod_row.alignment = 'LEFT'
+        lod_row.scale_x = 0
+        lod_row.label(text="progressive-load:")
+        lod_row.prop(self, "use_lod", text="")
+
+        profile_row = layout.row(align=True)
+        profile_row.alignment = 'LEFT'
+        profile_row.scale_x = 0
+        profile_row.label(text="preview-profile: ")
+        profile_value_row = profile_row.row(align=True)
+        profile_value_row.scale_x = 0
+        profile_value_row.ui_units_x = 6
+        profile_value_row.prop(self, "export_profile", text="")
+
         save_col = layout.column(align=False)
         save_col.alignment = 'LEFT'
         save_col.enabled = self.is_dirty
@@ -251,14 +446,114 @@ def register_preview_shortcut_keymap():
 # Server Component
 # ------------------------------------
 
+SESSIONS_DIRNAME = "blendxweb2_sessions"
+SESSION_PING_SECONDS = 60.0
+SESSION_IDLE_TIMEOUT_SECONDS = 15 * 60
+SERVER_LINGER_SECONDS = 5 * 60
+SERVER_START_TIMEOUT_SECONDS = 5.0
+SERVER_LOG_LINES = 200
+SERVER_LOG_MAX_BYTES = 5 * 1024 * 1024
+
+
+class ServerLog:
+    """Fixed-size ring of recent preview server log lines.
+
+    Appended to from server and reader threads, read by the panel.
+    """
+
+    def __init__(self, size=SERVER_LOG_LINES):
+        self._lines = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def append(self, line):
+        with self._lock:
+            self._lines.append(f"{time.strftime('%H:%M:%S')} {line.rstrip()}")
+
+    def tail(self, count):
+        with self._lock:
+            return list(self._lines)[-count:]
+
+
+server_log = ServerLog()
+_server_module = None
+
+
+def load_server_module():
+    """Import server/server.py for in-process serving (once per session)."""
+    global _server_module
+    if _server_module is None:
+        spec = importlib.util.spec_from_file_location(
+            "blendxweb2_preview_server", ADDON_ROOT / "server" / "server.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _server_module = module
+    return _server_module
+
+
+def _follow_log_file(path, stop_event):
+    """Copy lines appended to ``path`` into ``server_log`` until stopped."""
+    try:
+        handle = open(path, 'r', encoding='utf-8', errors='replace')
+    except OSError:
+        return
+    with handle:
+        handle.seek(0, os.SEEK_END)
+        while not stop_event.is_set():
+            line = handle.readline()
+            if line:
+                server_log.append(line)
+            else:
+                stop_event.wait(0.5)
+
+
+def control_request(port, action=None, payload=None, timeout=1.0):
+    """Call the preview server's control API.
+
+    Returns ``(status, data)``; ``status`` is None when nothing answered.
+    """
+    url = f"http://127.0.0.1:{port}/__control" + (f"/{action}" if action else "")
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(
+        url,
+        data=data,
+        headers={"Content-Type": "application/json"},
+        method="POST" if data is not None else "GET",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as error:
+        try:
+            return error.code, json.loads(error.read() or b"{}")
+        except ValueError:
+            return error.code, {}
+    except (OSError, ValueError):
+        return None, None
+
+
 class WebPreviewServer:
-    """Simple HTTP server to serve the Blender scene preview"""
+    """This Blender instance's session on the shared preview server.
+
+    One server per port serves every Blender instance on the machine, each
+    under its own /s/<id>/ directory; later instances find it through the
+    control API and register a session. The first instance to preview
+    starts it, either on a background thread of this Blender (in-process
+    mode, logging into ``server_log``) or as a detached process that
+    outlives this instance and exits once it has had no sessions for a
+    while. The detached server's log file is followed into ``server_log``.
+    """
     
     def __init__(self):
         self.server_process = None
+        self.background_server = None
+        self._log_follower = None
         self.port = 3000
         self.temp_dir = None
+        self.session_id = None
+        self.session_path = "/"
         self.is_running = False
+        self._ping_token = None
         
     def find_available_port(self):
         """Find an available port for the server"""
@@ -266,79 +561,1629 @@ class WebPreviewServer:
         port_str = sanitize_server_port(prefs.server_port if prefs else "3000")
         self.port = int(port_str)
         return self.port
+
+    def probe(self):
+        """Return the control API description of the server on our port."""
+        status, info = control_request(self.port, timeout=0.5)
+        if status == 200 and isinstance(info, dict) and info.get("server") == "blendXweb2":
+            return info
+        return None
+
+    def _start_in_process(self):
+        """Serve from a background thread of this Blender instance."""
+        prefs = get_addon_preferences()
+        module = load_server_module()
+        module.set_log_handler(server_log.append)
+        background = module.BackgroundServer(
+            self.port,
+            str(Path(tempfile.gettempdir()) / SESSIONS_DIRNAME),
+            [str(resolve_web_build_dir())],
+            engine=prefs.server_engine if prefs else "threaded",
+            telemetry_log=str(export_log_path().with_name("viewer_telemetry.jsonl")),
+            sessions=True,
+            quota_bytes=(prefs.session_quota_mb if prefs else 4096) * 1024 * 1024,
+            idle_seconds=SESSION_IDLE_TIMEOUT_SECONDS,
+        )
+        background.start()
+        self.background_server = background
+        return self.probe()
+
+    def _follow_server_log(self):
+        log_path = server_log_path()
+        if self._log_follower is not None or not log_path.exists():
+            return
+        stop_event = threading.Event()
+        threading.Thread(target=_follow_log_file, args=(log_path, stop_event), daemon=True).start()
+        self._log_follower = stop_event
+
+    def _spawn_server(self):
+        """Start a detached sessions-mode server and wait until it answers."""
+        server_script = os.path.join(os.path.dirname(__file__), "server", "server.py")
+        static_dir = resolve_web_build_dir()
+        prefs = get_addon_preferences()
+        engine = prefs.server_engine if prefs else "threaded"
+        quota_mb = prefs.session_quota_mb if prefs else 4096
+        log_path = server_log_path()
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if log_path.stat().st_size > SERVER_LOG_MAX_BYTES:
+                os.replace(log_path, log_path.with_name(log_path.name + ".1"))
+        except OSError:
+            pass
+        command = [
+            sys.executable, server_script, str(self.port),
+            str(Path(tempfile.gettempdir()) / SESSIONS_DIRNAME),
+            "--sessions",
+            "--static", str(static_dir),
+            "--engine", engine,
+            "--telemetry-log", str(export_log_path().with_name("viewer_telemetry.jsonl")),
+            "--quota-mb", str(quota_mb),
+            "--idle-timeout", str(SESSION_IDLE_TIMEOUT_SECONDS),
+            "--linger", str(SERVER_LINGER_SECONDS),
+        ]
+        if os.name == "nt":
+            detach = {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            detach = {"start_new_session": True}
+        with open(log_path, "ab") as log:
+            self.server_process = subprocess.Popen(
+                command, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, **detach
+            )
+
+        deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            info = self.probe()
+            if info is not None:
+                return info
+            if self.server_process.poll() is not None:
+                # Another Blender instance may have won the race for the port.
+                return self.probe()
+            time.sleep(0.1)
+        return None
+
+    def register_session(self):
+        label = Path(bpy.data.filepath).name if bpy.data.filepath else "untitled"
+        status, session = control_request(self.port, "register", {"label": label, "pid": os.getpid()})
+        if status != 200:
+            print(f"Could not register a preview session: {session or 'no answer'}")
+            return False
+        self.session_id = session["id"]
+        self.session_path = session["path"]
+        self.temp_dir = session["directory"]
+        return True
         
     def start_server(self):
-        """Start the HTTP server"""
+        """Join the shared server on the configured port, starting it if needed."""
         if self.is_running:
             return
-            
-        # Create a temporary directory for serving files
-        self.temp_dir = tempfile.mkdtemp()
-        
-        # Find an available port
+
         self.find_available_port()
-        
-        # Set up the server using Python's built-in HTTP server
-        server_script = os.path.join(os.path.dirname(__file__), "server", "server.py")
-        
-        # Start the server process
+        prefs = get_addon_preferences()
+        in_process = (prefs.server_mode if prefs else 'IN_PROCESS') == 'IN_PROCESS'
         try:
-            self.server_process = subprocess.Popen(
-                [sys.executable, server_script, str(self.port), self.temp_dir],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            self.is_running = True
-            print(f"Server started on port {self.port}")
+            info = self.probe()
+            if info is None:
+                info = self._start_in_process() if in_process else self._spawn_server()
         except Exception as e:
             print(f"Failed to start server: {e}")
-            self.is_running = False
+            return
+        if info is None:
+            print(f"Failed to start server: nothing answers on port {self.port}")
+            return
+        if info.get("mode") != "sessions":
+            print(f"Port {self.port} is used by a preview server without sessions; stop it or change the port")
+            return
+        if not self.register_session():
+            return
+        if self.background_server is None:
+            self._follow_server_log()
+
+        self.is_running = True
+        token = self._ping_token = object()
+
+        def ping():
+            # Keeps the session from being evicted as idle.
+            if not self.is_running or self._ping_token is not token:
+                return None
+            threading.Thread(
+                target=control_request, args=(self.port, "ping", {"id": self.session_id}), daemon=True
+            ).start()
+            return SESSION_PING_SECONDS
+
+        bpy.app.timers.register(ping, first_interval=SESSION_PING_SECONDS)
+        print(f"Preview session {self.session_id} on port {self.port}")
+
+    def ensure_session(self):
+        """Re-register when the server evicted or lost our session.
+
+        Returns True when the session (possibly a new one) is usable.
+        """
+        if not self.is_running:
+            return False
+        status, _ = control_request(self.port, "ping", {"id": self.session_id})
+        if status == 200:
+            return True
+        self._forget_session()
+        if status == 404 and self.register_session():
+            return True
+        # The server itself is gone; start (or join) a new one.
+        self.is_running = False
+        self.start_server()
+        return self.is_running
+
+    def _forget_session(self):
+        if self.temp_dir:
+            export_cache.invalidate(self.temp_dir)
+            dirty_chunk_tracker.forget(self.temp_dir)
+        self.temp_dir = None
+        self.session_id = None
+        self.session_path = "/"
             
     def stop_server(self):
-        """Stop the HTTP server"""
+        """End this instance's session; the server removes its directory."""
         if not self.is_running:
             return
-            
-        # Terminate the server process
-        if self.server_process:
-            self.server_process.terminate()
-            self.server_process = None
-            
-        # Clean up the temporary directory - with error handling
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            try:
-                shutil.rmtree(self.temp_dir)
-            except Exception as e:
-                print(f"Warning: Could not remove temp directory: {e}")
-                # We'll just let it be and Windows will clean it up later
-            self.temp_dir = None
-            
+
+        if self.session_id:
+            control_request(self.port, "unregister", {"id": self.session_id})
+        self._forget_session()
+        if self._log_follower is not None:
+            self._log_follower.set()
+            self._log_follower = None
+        # A detached server is left running for other Blender instances and
+        # exits by itself once it has had no sessions for a while; one hosted
+        # here keeps serving while other instances still use it.
+        if self.background_server is not None:
+            status, info = control_request(self.port)
+            if status != 200 or not info.get("sessions"):
+                self.shutdown_background_server()
+        self.server_process = None
         self.is_running = False
-        print("Server stopped")
+        print("Preview session closed")
+
+    def shutdown_background_server(self):
+        """Stop the in-process server, even if other sessions still use it."""
+        if self.background_server is not None:
+            self.background_server.stop()
+            self.background_server = None
         
+    def notify_reload(self, payload):
+        """Tell connected viewers to hot-swap the model (non-blocking)."""
+        if not self.is_running:
+            return
+
+        def post():
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{self.port}{self.session_path}__reload",
+                data=json.dumps(payload).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=2) as response:
+                    response.read()
+            except OSError as e:
+                print(f"[blendXweb2] Could not notify preview clients: {e}")
+
+        threading.Thread(target=post, daemon=True).start()
+
     def get_url(self):
         """Get the URL for the web preview"""
         if not self.is_running:
             return None
-        return f"http://localhost:{self.port}"
+        return f"http://localhost:{self.port}{self.session_path}"
+
+# ------------------------------------
+# Scene Fingerprint
+# ------------------------------------
+
+# RNA properties that change without affecting the exported result.
+_FINGERPRINT_SKIPPED_PROPERTIES = {
+    "rna_type",
+    "name_full",
+    "session_uid",
+    "users",
+    "use_fake_user",
+    "use_extra_user",
+    "is_evaluated",
+    "is_embedded_data",
+    "is_missing",
+    "is_runtime_data",
+    "is_editmode",
+    "tag",
+    "select",
+    "select_head",
+    "select_tail",
+    "is_dirty",
+    "is_active",
+    "show_expanded",
+    "bindcode",
+    "has_data",
+    "pixels",
+    "dimensions",
+    "location",  # node editor position; object transforms come from matrix_world
+    "original",
+    "preview",
+    "packed_file",  # hashed by digest in _hash_image
+    "packed_files",
+    "splines",  # hashed in bulk in _hash_object_data
+    "links",  # node links are hashed per node tree
+    "internal_links",
+}
+# Nested structs (ColorRamp elements, curve mapping points, image users,
+# modifier settings) are followed this many levels deep.
+_FINGERPRINT_MAX_DEPTH = 4
+
+
+def _feed(hasher, *values):
+    for value in values:
+        hasher.update(repr(value).encode("utf-8"))
+        hasher.update(b"\x00")
+
+
+def _hash_rna_struct(hasher, struct, depth=0, visited=None):
+    """Feed the RNA properties of ``struct`` into ``hasher``.
+
+    ID pointers are hashed by name only; the referenced datablocks are hashed
+    separately so shared data is only visited once. Other pointers and
+    collections are followed up to ``_FINGERPRINT_MAX_DEPTH`` levels, each
+    struct at most once.
+    """
+    if struct is None:
+        _feed(hasher, None)
+        return
+    if visited is None:
+        visited = set()
+    pointer = struct.as_pointer()
+    if pointer in visited or depth > _FINGERPRINT_MAX_DEPTH:
+        _feed(hasher, type(struct).__name__)
+        return
+    visited.add(pointer)
+
+    for prop in struct.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in _FINGERPRINT_SKIPPED_PROPERTIES:
+            continue
+        try:
+            value = getattr(struct, identifier)
+        except (AttributeError, RuntimeError):
+            continue
+
+        if prop.type == 'POINTER':
+            if value is None or isinstance(value, bpy.types.ID):
+                _feed(hasher, identifier, value.name_full if value is not None else None)
+            else:
+                _feed(hasher, identifier)
+                _hash_rna_struct(hasher, value, depth + 1, visited)
+            continue
+
+        if prop.type == 'COLLECTION':
+            _feed(hasher, identifier, len(value))
+            for item in value:
+                if isinstance(item, bpy.types.ID):
+                    _feed(hasher, item.name_full)
+                else:
+                    _hash_rna_struct(hasher, item, depth + 1, visited)
+            continue
+
+        if isinstance(value, set):
+            # Enum flags; sets have no stable order.
+            value = tuple(sorted(value))
+        elif hasattr(value, "__len__") and not isinstance(value, str):
+            value = tuple(tuple(item) if hasattr(item, "__len__") else item for item in value)
+        _feed(hasher, identifier, value)
+
+    # Custom properties drive geometry nodes modifier inputs.
+    if hasattr(struct, "keys"):
+        try:
+            for key in sorted(struct.keys()):
+                value = struct[key]
+                _feed(hasher, key, value.to_dict() if hasattr(value, "to_dict") else
+                      value.to_list() if hasattr(value, "to_list") else value)
+        except TypeError:
+            pass
+
+
+def _hash_foreach(hasher, collection, attribute, width, typecode='f'):
+    """Hash a bpy collection attribute in bulk through ``foreach_get``."""
+    count = len(collection) * width
+    _feed(hasher, attribute, count)
+    if not count:
+        return
+    try:
+        buffer = array(typecode, bytes(count * array(typecode).itemsize))
+        collection.foreach_get(attribute, buffer)
+        hasher.update(buffer.tobytes())
+    except (TypeError, RuntimeError):
+        values = [0] * count
+        collection.foreach_get(attribute, values)
+        _feed(hasher, values)
+
+
+# Attribute data types mapped to (foreach_get key, components, array typecode).
+_ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ("value", 1, 'f'),
+    'INT': ("value", 1, 'i'),
+    'INT8': ("value", 1, 'i'),
+    'BOOLEAN': ("value", 1, 'b'),
+    'FLOAT2': ("vector", 2, 'f'),
+    'INT32_2D': ("value", 2, 'i'),
+    'FLOAT_VECTOR': ("vector", 3, 'f'),
+    'FLOAT_COLOR': ("color", 4, 'f'),
+    'BYTE_COLOR': ("color", 4, 'f'),
+    'QUATERNION': ("value", 4, 'f'),
+}
+
+
+def _hash_mesh(hasher, mesh):
+    _feed(hasher, len(mesh.vertices), len(mesh.edges), len(mesh.polygons), len(mesh.loops))
+    _hash_foreach(hasher, mesh.vertices, "co", 3)
+    _hash_foreach(hasher, mesh.loops, "vertex_index", 1, 'i')
+    _hash_foreach(hasher, mesh.polygons, "loop_start", 1, 'i')
+    _hash_foreach(hasher, mesh.polygons, "material_index", 1, 'i')
+
+    for attribute in mesh.attributes:
+        layout = _ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+        _feed(hasher, attribute.name, attribute.domain, attribute.data_type)
+        if layout:
+            key, width, typecode = layout
+            _hash_foreach(hasher, attribute.data, key, width, typecode)
+
+    if mesh.shape_keys:
+        for key_block in mesh.shape_keys.key_blocks:
+            _feed(hasher, key_block.name, key_block.value, key_block.mute)
+            _hash_foreach(hasher, key_block.data, "co", 3)
+
+    _feed(hasher, [slot.name if slot else None for slot in mesh.materials])
+
+
+def _hash_node_tree(hasher, node_tree, referenced):
+    if node_tree is None:
+        _feed(hasher, None)
+        return
+
+    for node in node_tree.nodes:
+        _feed(hasher, node.bl_idname, node.name)
+        _hash_rna_struct(hasher, node)
+        for socket in node.inputs:
+            if hasattr(socket, "default_value"):
+                value = socket.default_value
+                if hasattr(value, "__len__"):
+                    value = tuple(value)
+                _feed(hasher, socket.identifier, value)
+        image = getattr(node, "image", None)
+        if image is not None:
+            referenced["images"].add(image)
+        group = getattr(node, "node_tree", None)
+        if group is not None and group not in referenced["node_groups"]:
+            referenced["node_groups"].add(group)
+            _hash_node_tree(hasher, group, referenced)
+
+    for link in node_tree.links:
+        _feed(hasher, link.from_node.name, link.from_socket.identifier,
+              link.to_node.name, link.to_socket.identifier, link.is_muted)
+
+
+def _hash_image(hasher, image):
+    _hash_rna_struct(hasher, image)
+    if image.packed_file:
+        # Textures are often replaced by one of the same size.
+        _feed(hasher, "packed", image.packed_file.size,
+              hashlib.sha256(image.packed_file.data).hexdigest())
+    elif image.source == 'FILE' and image.filepath:
+        try:
+            stat = os.stat(bpy.path.abspath(image.filepath, library=image.library))
+            _feed(hasher, "file", stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            _feed(hasher, "missing")
+    if image.is_dirty:
+        # Unsaved paint strokes have no cheap content signature; never reuse.
+        _feed(hasher, "dirty", os.urandom(8))
+
+
+def _iter_action_fcurves(action):
+    """Yield F-Curves for both legacy and layered (slotted) actions."""
+    layers = getattr(action, "layers", None)
+    if layers:
+        for layer in layers:
+            for strip in layer.strips:
+                for channelbag in getattr(strip, "channelbags", ()):
+                    yield from channelbag.fcurves
+        return
+    yield from getattr(action, "fcurves", ())
+
+
+def _hash_action(hasher, action):
+    for fcurve in _iter_action_fcurves(action):
+        _feed(hasher, fcurve.data_path, fcurve.array_index, fcurve.mute, len(fcurve.modifiers))
+        _hash_foreach(hasher, fcurve.keyframe_points, "co", 2)
+        _hash_foreach(hasher, fcurve.keyframe_points, "handle_left", 2)
+        _hash_foreach(hasher, fcurve.keyframe_points, "handle_right", 2)
+        _feed(hasher, [point.interpolation for point in fcurve.keyframe_points])
+
+
+def _hash_animation_data(hasher, anim_data, referenced):
+    if anim_data is None:
+        _feed(hasher, None)
+        return
+    _feed(hasher, anim_data.action.name_full if anim_data.action else None)
+    if anim_data.action:
+        referenced["actions"].add(anim_data.action)
+    for track in anim_data.nla_tracks:
+        _feed(hasher, track.name, track.mute)
+        for strip in track.strips:
+            _hash_rna_struct(hasher, strip)
+            if strip.action:
+                referenced["actions"].add(strip.action)
+    for driver in anim_data.drivers:
+        _feed(hasher, driver.data_path, driver.array_index, driver.driver.expression)
+
+
+def _hash_object(hasher, obj, referenced):
+    _feed(hasher, obj.name_full, obj.type, obj.parent.name_full if obj.parent else None)
+    _feed(hasher, [tuple(row) for row in obj.matrix_world])
+    _feed(hasher, obj.hide_render, obj.hide_get() if hasattr(obj, "hide_get") else None)
+    _feed(hasher, obj.data.name_full if obj.data else None)
+    _feed(hasher, obj.instance_type, obj.instance_collection.name_full if obj.instance_collection else None)
+    if obj.instance_collection:
+        referenced["collections"].add(obj.instance_collection)
+
+    for slot in obj.material_slots:
+        _feed(hasher, slot.link, slot.material.name_full if slot.material else None)
+        if slot.material:
+            referenced["materials"].add(slot.material)
+
+    for modifier in obj.modifiers:
+        _hash_rna_struct(hasher, modifier)
+        node_group = getattr(modifier, "node_group", None)
+        if node_group is not None and node_group not in referenced["node_groups"]:
+            referenced["node_groups"].add(node_group)
+            _hash_node_tree(hasher, node_group, referenced)
+
+    for constraint in obj.constraints:
+        _hash_rna_struct(hasher, constraint)
+
+    if obj.pose:
+        for pose_bone in obj.pose.bones:
+            _feed(hasher, pose_bone.name, tuple(pose_bone.location),
+                  tuple(pose_bone.rotation_quaternion), tuple(pose_bone.rotation_euler),
+                  tuple(pose_bone.scale))
+
+    _hash_animation_data(hasher, obj.animation_data, referenced)
+    if obj.data is not None:
+        referenced["data"].add(obj.data)
+
+
+_SPLINE_SETTINGS = (
+    "type",
+    "order_u",
+    "order_v",
+    "resolution_u",
+    "resolution_v",
+    "use_cyclic_u",
+    "use_cyclic_v",
+    "use_endpoint_u",
+    "use_endpoint_v",
+    "use_bezier_u",
+    "use_bezier_v",
+    "use_smooth",
+    "material_index",
+    "tilt_interpolation",
+    "radius_interpolation",
+)
+
+
+def _hash_object_data(hasher, data, referenced):
+    _feed(hasher, type(data).__name__, data.name_full)
+    if isinstance(data, bpy.types.Mesh):
+        _hash_mesh(hasher, data)
+        for material in data.materials:
+            if material:
+                referenced["materials"].add(material)
+    elif isinstance(data, bpy.types.Armature):
+        for bone in data.bones:
+            _feed(hasher, bone.name, tuple(bone.head_local), tuple(bone.tail_local),
+                  bone.parent.name if bone.parent else None)
+    else:
+        _hash_rna_struct(hasher, data)
+        for spline in getattr(data, "splines", ()):
+            _feed(hasher, *(getattr(spline, name, None) for name in _SPLINE_SETTINGS))
+            _hash_foreach(hasher, spline.points, "co", 4)
+            _hash_foreach(hasher, spline.points, "radius", 1)
+            _hash_foreach(hasher, spline.points, "tilt", 1)
+            _hash_foreach(hasher, spline.bezier_points, "co", 3)
+            _hash_foreach(hasher, spline.bezier_points, "handle_left", 3)
+            _hash_foreach(hasher, spline.bezier_points, "handle_right", 3)
+            _hash_foreach(hasher, spline.bezier_points, "radius", 1)
+            _hash_foreach(hasher, spline.bezier_points, "tilt", 1)
+            _feed(hasher, [(point.handle_left_type, point.handle_right_type) for point in spline.bezier_points])
+        for material in getattr(data, "materials", ()):
+            if material:
+                referenced["materials"].add(material)
+
+    _hash_animation_data(hasher, getattr(data, "animation_data", None), referenced)
+    shape_keys = getattr(data, "shape_keys", None)
+    if shape_keys is not None:
+        _hash_animation_data(hasher, shape_keys.animation_data, referenced)
+
+
+def _hash_datablocks(hasher, label, datablocks, hash_fn, *args):
+    for datablock in sorted(datablocks, key=lambda item: item.name_full):
+        _feed(hasher, label, datablock.name_full)
+        hash_fn(hasher, datablock, *args)
+
+
+def _scene_export_globals(scene, export_settings):
+    """Scene-wide state that affects every exported object."""
+    return (
+        tuple(sorted(export_settings.items())),
+        scene.frame_current,
+        scene.frame_start,
+        scene.frame_end,
+        scene.render.fps,
+        scene.render.fps_base,
+        scene.camera.name_full if scene.camera else None,
+    )
+
+
+def compute_objects_fingerprint(scene, objects, export_settings):
+    """Hash everything that influences the glTF export of ``objects``.
+
+    Covers object transforms and hierarchy, mesh/curve/armature data,
+    modifiers, materials and their node trees, images (packed ones by
+    content), animation and the contents of instanced collections.
+    """
+    hasher = hashlib.sha256()
+    _feed(hasher, _scene_export_globals(scene, export_settings))
+
+    referenced = {
+        "data": set(),
+        "materials": set(),
+        "images": set(),
+        "actions": set(),
+        "node_groups": set(),
+        "collections": set(),
+    }
+
+    for obj in sorted(objects, key=lambda item: item.name_full):
+        _hash_object(hasher, obj, referenced)
+
+    # Instanced collections may instance further collections.
+    hashed_collections = set()
+    while referenced["collections"] - hashed_collections:
+        pending = referenced["collections"] - hashed_collections
+        for collection in sorted(pending, key=lambda item: item.name_full):
+            hashed_collections.add(collection)
+            _feed(hasher, "collection", collection.name_full, tuple(collection.instance_offset))
+            for obj in sorted(collection.all_objects, key=lambda item: item.name_full):
+                _hash_object(hasher, obj, referenced)
+
+    _hash_datablocks(hasher, "data", referenced["data"], _hash_object_data, referenced)
+
+    for material in sorted(referenced["materials"], key=lambda item: item.name_full):
+        _feed(hasher, "material", material.name_full)
+        _hash_rna_struct(hasher, material)
+        _hash_node_tree(hasher, material.node_tree if material.use_nodes else None, referenced)
+        _hash_animation_data(hasher, material.animation_data, referenced)
+
+    _hash_datablocks(hasher, "image", referenced["images"], _hash_image)
+    _hash_datablocks(hasher, "action", referenced["actions"], _hash_action)
+
+    return hasher.hexdigest()
+
+
+def compute_scene_fingerprint(context, export_settings):
+    """Fingerprint the whole scene as seen by ``export_scene_to_gltf``."""
+    scene = context.scene
+    return compute_objects_fingerprint(scene, scene.objects, export_settings)
+
+
+class SceneExportCache:
+    """Remember the fingerprint of the last export written to each directory."""
+
+    def __init__(self):
+        self.fingerprints = {}
+        self.hits = 0
+        self.misses = 0
+
+    def is_current(self, output_path, fingerprint):
+        output_path = Path(output_path)
+        cached = self.fingerprints.get(str(output_path))
+        hit = cached == fingerprint and output_path.exists()
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        print(
+            f"[blendXweb2] export cache {'hit' if hit else 'miss'} for {output_path.name} "
+            f"({self.hits} hits / {self.misses} misses)"
+        )
+        return hit
+
+    def store(self, output_path, fingerprint):
+        self.fingerprints[str(Path(output_path))] = fingerprint
+
+    def invalidate(self, output_dir=None):
+        if output_dir is None:
+            self.fingerprints.clear()
+            return
+        prefix = str(Path(output_dir))
+        for key in [key for key in self.fingerprints if key.startswith(prefix)]:
+            del self.fingerprints[key]
+
+    def rebase(self, old_dir, new_dir):
+        """Carry the entries of ``old_dir`` over to files copied into ``new_dir``."""
+        prefix = str(Path(old_dir)) + os.sep
+        for key in [key for key in self.fingerprints if key.startswith(prefix)]:
+            self.fingerprints[str(Path(new_dir) / key[len(prefix):])] = self.fingerprints.pop(key)
+
+
+export_cache = SceneExportCache()
+
+
+def _datablock_key(datablock):
+    return (type(datablock).__name__, datablock.name_full)
+
+
+def _collect_node_tree_keys(node_tree, keys):
+    for node in node_tree.nodes:
+        image = getattr(node, "image", None)
+        if image is not None:
+            keys.add(_datablock_key(image))
+        group = getattr(node, "node_tree", None)
+        if group is not None and _datablock_key(group) not in keys:
+            keys.add(_datablock_key(group))
+            _collect_node_tree_keys(group, keys)
+
+
+def _collect_animation_keys(anim_data, keys):
+    if anim_data is None:
+        return
+    if anim_data.action:
+        keys.add(_datablock_key(anim_data.action))
+    for track in anim_data.nla_tracks:
+        for strip in track.strips:
+            if strip.action:
+                keys.add(_datablock_key(strip.action))
+
+
+def collect_dependency_keys(objects):
+    """Return the datablock keys an export of ``objects`` depends on."""
+    keys = set()
+    materials = set()
+    objects = list(objects)
+    collections = set()
+    for obj in objects:
+        keys.add(_datablock_key(obj))
+        collection = obj.instance_collection
+        if collection is not None and collection not in collections:
+            # Edits inside an instanced collection change the instancer.
+            collections.add(collection)
+            keys.add(_datablock_key(collection))
+            objects.extend(collection.all_objects)
+        _collect_animation_keys(obj.animation_data, keys)
+        materials.update(slot.material for slot in obj.material_slots if slot.material)
+        for modifier in obj.modifiers:
+            node_group = getattr(modifier, "node_group", None)
+            if node_group is not None:
+                keys.add(_datablock_key(node_group))
+                _collect_node_tree_keys(node_group, keys)
+        if obj.data is not None:
+            keys.add(_datablock_key(obj.data))
+            _collect_animation_keys(getattr(obj.data, "animation_data", None), keys)
+            shape_keys = getattr(obj.data, "shape_keys", None)
+            if shape_keys is not None:
+                _collect_animation_keys(shape_keys.animation_data, keys)
+            materials.update(material for material in getattr(obj.data, "materials", ()) if material)
+
+    for material in materials:
+        keys.add(_datablock_key(material))
+        _collect_animation_keys(material.animation_data, keys)
+        if material.use_nodes and material.node_tree:
+            _collect_node_tree_keys(material.node_tree, keys)
+    return keys
+
+
+class DirtyChunkTracker:
+    """Record which datablocks changed, fed by a depsgraph update handler.
+
+    Every recorded update gets an increasing counter value. Each output
+    directory remembers the counter it was last synced at, so several
+    consumers (the preview directory, package exports) can ask what changed
+    since *their* last export without stealing updates from each other.
+    """
+
+    def __init__(self):
+        self.counter = 0
+        self.reset_counter = 0
+        self.updated = {}
+        self.synced = {}
+        self._pending = {}
+
+    def mark_all_dirty(self):
+        self.counter += 1
+        self.reset_counter = self.counter
+        self.updated.clear()
+
+    def record_update(self, datablock):
+        self.counter += 1
+        self.updated[_datablock_key(datablock)] = self.counter
+
+    def begin_sync(self, output_dir, scene, export_settings):
+        """Return a predicate telling whether a list of objects needs re-checking."""
+        key = str(Path(output_dir))
+        scene_globals = _scene_export_globals(scene, export_settings)
+        synced_counter, synced_globals = self.synced.get(key, (-1, None))
+        self._pending[key] = (self.counter, scene_globals)
+
+        if synced_globals != scene_globals or self.reset_counter > synced_counter:
+            return lambda objects: True
+
+        changed = {name for name, counter in self.updated.items() if counter > synced_counter}
+        if not changed:
+            return lambda objects: False
+        return lambda objects: not changed.isdisjoint(collect_dependency_keys(objects))
+
+    def finish_sync(self, output_dir):
+        key = str(Path(output_dir))
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            self.synced[key] = pending
+
+    def forget(self, output_dir):
+        self.synced.pop(str(Path(output_dir)), None)
+
+    def rebase(self, old_dir, new_dir):
+        synced = self.synced.pop(str(Path(old_dir)), None)
+        if synced is not None:
+            self.synced[str(Path(new_dir))] = synced
+
+
+dirty_chunk_tracker = DirtyChunkTracker()
+
+
+@persistent
+def _on_depsgraph_update_post(scene, depsgraph):
+    for update in depsgraph.updates:
+        datablock = update.id
+        if datablock is None:
+            continue
+        dirty_chunk_tracker.record_update(datablock.original)
+
+
+@persistent
+def _on_scene_reloaded(*_args):
+    dirty_chunk_tracker.mark_all_dirty()
+
+
+_APP_HANDLERS = (
+    ("depsgraph_update_post", _on_depsgraph_update_post),
+    ("load_post", _on_scene_reloaded),
+    ("undo_post", _on_scene_reloaded),
+    ("redo_post", _on_scene_reloaded),
+)
+
+# ------------------------------------
+# Content Store
+# ------------------------------------
+
+def addon_user_dir():
+    """Writable per-user directory of the add-on."""
+    try:
+        return Path(bpy.utils.extension_path_user(__package__, create=True))
+    except (AttributeError, TypeError, ValueError):
+        # Legacy add-on installs (and the batch exporter) have no extension
+        # directory.
+        return Path(tempfile.gettempdir()) / "blendxweb2"
+
+
+_export_code_signature = None
+
+
+def export_code_signature():
+    """Digest of the code that turns a fingerprint into bytes: this add-on's
+    source (texture capping, animation optimisation) and the glTF exporter
+    version."""
+    global _export_code_signature
+    if _export_code_signature is None:
+        hasher = hashlib.sha256(Path(__file__).read_bytes())
+        exporter = sys.modules.get("io_scene_gltf2")
+        _feed(hasher, getattr(exporter, "bl_info", {}).get("version"))
+        _export_code_signature = hasher.hexdigest()[:16]
+    return _export_code_signature
+
+
+class ContentStore:
+    """Content-addressed cache of exported GLBs shared by every preview
+    session, package export and Blender instance of the user.
+
+    Keys are derived from the export fingerprints, which hash the mesh,
+    material, image (packed ones by content) and animation datablocks of
+    the exported objects, instanced collections and the export settings
+    including the add-on's own (texture cap, animation tolerance), so an
+    entry only matches bytes the exporter would write again. The Blender
+    version and ``export_code_signature()`` are part of the key too, since
+    the store is shared across files and add-on updates. Entries are
+    placed with a hardlink where the store and the target share a
+    filesystem and copied otherwise. The least recently used entries
+    (by access time, refreshed on every hit) are evicted once the store
+    grows past ``max_bytes``.
+    """
+
+    def __init__(self, root=None):
+        self._root = Path(root) if root else None
+        self.max_bytes = CONTENT_STORE_DEFAULT_MB * 1024 * 1024
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def root(self):
+        if self._root is None:
+            self._root = addon_user_dir() / "store"
+        return self._root
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def key(self, kind, fingerprint):
+        return hashlib.sha256(
+            f"{kind}:{bpy.app.version_string}:{export_code_signature()}:{fingerprint}".encode("utf-8")
+        ).hexdigest()
+
+    def _entry_path(self, key):
+        return self.root / key[:2] / f"{key}.glb"
+
+    def fetch(self, key, destination):
+        """Place the stored file for ``key`` at ``destination``; False on a miss."""
+        if not self.enabled:
+            return False
+        entry = self._entry_path(key)
+        destination = Path(destination)
+        try:
+            _place_file(entry, destination)
+            os.utime(entry, (time.time(), entry.stat().st_mtime))
+        except OSError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def put(self, key, source, replace=False):
+        """Add ``source`` (a freshly exported file) under ``key``.
+
+        An existing entry is kept unless ``replace`` is set, as it is when
+        a post-processing step rewrote the file after the first ``put``.
+        """
+        if not self.enabled:
+            return
+        entry = self._entry_path(key)
+        if entry.exists() and not replace:
+            return
+        previous_size = entry.stat().st_size if entry.exists() else 0
+        partial = entry.with_name(f"{entry.name}.{os.getpid()}.partial")
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            _place_file(source, partial)
+            os.replace(partial, entry)
+        except OSError as e:
+            partial.unlink(missing_ok=True)
+            print(f"[blendXweb2] Could not add {Path(source).name} to the content store: {e}")
+            return
+        if self._size is not None:
+            self._size += entry.stat().st_size - previous_size
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for path in self.root.glob("*/*.glb"):
+            try:
+                stat_result = path.stat()
+            except OSError:
+                continue
+            entries.append((stat_result.st_atime, stat_result.st_size, path))
+        return entries
+
+    def evict(self):
+        """Drop least recently used entries until the store fits ``max_bytes``.
+
+        The size is tracked incrementally and recounted from disk before
+        evicting, since other Blender instances share the store.
+        """
+        if self._size is not None and self._size <= self.max_bytes:
+            return
+        entries = self._entries()
+        self._size = sum(size for _atime, size, _path in entries)
+        for _atime, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if self._size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+
+
+def _place_file(source, destination):
+    """Hardlink ``source`` to ``destination``, copying across filesystems."""
+    destination = Path(destination)
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        if not Path(source).is_file():
+            raise
+        shutil.copyfile(source, destination)
+
+
+content_store = ContentStore()
+
+
+def export_through_store(path, kind, fingerprint, export):
+    """Place the stored export of ``fingerprint`` at ``path``, or run
+    ``export()`` and store its result. Returns the store key when it
+    exported, None on a store hit."""
+    prefs = get_addon_preferences()
+    content_store.max_bytes = (
+        prefs.content_store_mb if prefs else CONTENT_STORE_DEFAULT_MB
+    ) * 1024 * 1024
+    key = content_store.key(kind, fingerprint)
+    # .gz/.br siblings of the previous file are not part of the entry.
+    _remove_precompressed_variants(path)
+    if content_store.fetch(key, path):
+        print(f"[blendXweb2] content store hit for {Path(path).name}")
+        return None
+    # The old file may be a hardlink into the store; writing through it
+    # would change the stored entry.
+    Path(path).unlink(missing_ok=True)
+    export()
+    content_store.put(key, path)
+    return key
+
+
+# ------------------------------------
+# Animation Optimisation
+# ------------------------------------
+
+# Base tolerances, scaled by a profile's ``animation_tolerance``: scene
+# units for translation and scale, radians for rotation, weight units.
+ANIMATION_TOLERANCES = {
+    'translation': 1e-4,
+    'rotation': 1e-3,
+    'scale': 1e-4,
+    'weights': 1e-3,
+}
+ANIMATION_REPORT_KEY = "blendxweb2_animation"
+# Extensions whose accessor and buffer view references the optimiser knows
+# how to remap; files using anything else are left untouched.
+ANIMATION_SAFE_EXTENSIONS = {
+    "KHR_draco_mesh_compression",
+    "KHR_lights_punctual",
+    "KHR_materials_clearcoat",
+    "KHR_materials_emissive_strength",
+    "KHR_materials_ior",
+    "KHR_materials_sheen",
+    "KHR_materials_specular",
+    "KHR_materials_transmission",
+    "KHR_materials_unlit",
+    "KHR_materials_volume",
+    "KHR_mesh_quantization",
+    "KHR_texture_transform",
+    "EXT_mesh_gpu_instancing",
+    "EXT_texture_webp",
+}
+
+GLB_MAGIC = b"glTF"
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN = 0x004E4942
+GLTF_FLOAT = 5126
+GLTF_SHORT = 5122
+GLTF_COMPONENT_DTYPES = {
+    5120: numpy.int8,
+    5121: numpy.uint8,
+    5122: numpy.int16,
+    5123: numpy.uint16,
+    5125: numpy.uint32,
+    GLTF_FLOAT: numpy.float32,
+}
+GLTF_TYPE_WIDTHS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT4": 16}
+GLTF_PATH_TYPES = {"translation": "VEC3", "rotation": "VEC4", "scale": "VEC3"}
+
+
+class _UnsupportedGlb(Exception):
+    pass
+
+
+def read_glb(path):
+    """Return ``(document, binary)`` of a GLB file."""
+    data = Path(path).read_bytes()
+    magic, _version, length = struct.unpack_from("<4sII", data, 0)
+    if magic != GLB_MAGIC:
+        raise _UnsupportedGlb("not a GLB file")
+    document, binary = None, b""
+    offset = 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == GLB_CHUNK_JSON:
+            document = json.loads(chunk.decode("utf-8"))
+        elif chunk_type == GLB_CHUNK_BIN and not binary:
+            binary = chunk
+        offset += 8 + chunk_length
+    if document is None:
+        raise _UnsupportedGlb("GLB has no JSON chunk")
+    return document, binary
+
+
+def read_glb_document(path):
+    """Return only the JSON chunk of a GLB, without reading the binary."""
+    with open(path, 'rb') as handle:
+        header = handle.read(20)
+        magic, _version, _length, chunk_length, chunk_type = struct.unpack("<4sIIII", header)
+        if magic != GLB_MAGIC or chunk_type != GLB_CHUNK_JSON:
+            raise _UnsupportedGlb("GLB does not start with a JSON chunk")
+        return json.loads(handle.read(chunk_length).decode("utf-8"))
+
+
+def write_glb(path, document, binary):
+    """Write a GLB aside and rename it over ``path`` (which may be a hardlink)."""
+    payload = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    payload += b" " * (-len(payload) % 4)
+    binary += b"\0" * (-len(binary) % 4)
+    length = 12 + 8 + len(payload) + (8 + len(binary) if binary else 0)
+    partial = Path(f"{path}.partial")
+    with partial.open('wb') as handle:
+        handle.write(struct.pack("<4sII", GLB_MAGIC, 2, length))
+        handle.write(struct.pack("<II", len(payload), GLB_CHUNK_JSON))
+        handle.write(payload)
+        if binary:
+            handle.write(struct.pack("<II", len(binary), GLB_CHUNK_BIN))
+            handle.write(binary)
+    os.replace(partial, path)
+
+
+def _read_accessor(document, binary, index):
+    """Decode an accessor to a float64 array of shape (count, width)."""
+    accessor = document["accessors"][index]
+    if "sparse" in accessor or "bufferView" not in accessor:
+        raise _UnsupportedGlb("sparse or empty animation accessor")
+    view = document["bufferViews"][accessor["bufferView"]]
+    if view.get("buffer", 0) != 0:
+        raise _UnsupportedGlb("animation data outside the GLB buffer")
+    dtype = numpy.dtype(GLTF_COMPONENT_DTYPES[accessor["componentType"]])
+    width = GLTF_TYPE_WIDTHS[accessor["type"]]
+    count = accessor["count"]
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    stride = view.get("byteStride") or dtype.itemsize * width
+    values = numpy.ndarray(
+        (count, width), dtype, buffer=binary, offset=offset, strides=(stride, dtype.itemsize)
+    ).astype(numpy.float64)
+    if accessor.get("normalized"):
+        limit = numpy.iinfo(dtype).max
+        values = values / limit
+        if numpy.iinfo(dtype).min < 0:
+            values = numpy.maximum(values, -1.0)
+    return values
+
+
+def _interpolation_error(times, values, start, end, path):
+    """Largest deviation of the keys between ``start`` and ``end`` from
+    linear interpolation between those two keys."""
+    if end - start < 2:
+        return 0.0
+    fraction = ((times[start + 1:end] - times[start]) / (times[end] - times[start]))[:, None]
+    first, last = values[start], values[end]
+    actual = values[start + 1:end]
+    if path == 'rotation':
+        # three.js slerps; normalised lerp is within tolerance of it here.
+        if numpy.dot(first, last) < 0:
+            last = -last
+        approx = first + (last - first) * fraction
+        approx /= numpy.maximum(numpy.linalg.norm(approx, axis=1, keepdims=True), 1e-12)
+        dots = numpy.clip(numpy.abs(numpy.sum(approx * actual, axis=1)), 0.0, 1.0)
+        return float(numpy.max(2.0 * numpy.arccos(dots)))
+    return float(numpy.max(numpy.abs(first + (last - first) * fraction - actual)))
+
+
+def _deviation_from(values, reference, path):
+    if path == 'rotation':
+        dots = numpy.clip(numpy.abs(values @ reference), 0.0, 1.0)
+        return float(numpy.max(2.0 * numpy.arccos(dots)))
+    return float(numpy.max(numpy.abs(values - reference)))
+
+
+def reduce_linear_keys(times, values, path, tolerance):
+    """Indices of the keys to keep so linear interpolation stays within
+    ``tolerance`` of every dropped key. First and last keys are kept.
+
+    Each segment is grown by doubling and then bisected back to the
+    longest end that still fits, so long smooth runs cost O(n log n).
+    """
+    count = len(times)
+    if count <= 2:
+        return list(range(count))
+
+    def fits(start, end):
+        return _interpolation_error(times, values, start, end, path) <= tolerance
+
+    keep = [0]
+    start = 0
+    while start < count - 1:
+        good, span = start + 1, 2
+        while start + span < count and fits(start, start + span):
+            good = start + span
+            span *= 2
+        bad = min(start + span, count)
+        if bad == count and good < count - 1 and fits(start, count - 1):
+            good = count - 1
+        while bad - good > 1:
+            middle = (good + bad) // 2
+            if fits(start, middle):
+                good = middle
+            else:
+                bad = middle
+        keep.append(good)
+        start = good
+    return keep
+
+
+def reduce_step_keys(values, path, tolerance):
+    keep = [0]
+    for index in range(1, len(values)):
+        if _deviation_from(values[index:index + 1], values[keep[-1]], path) > tolerance:
+            keep.append(index)
+    return keep
+
+
+def _accessor_bytes(document, index):
+    accessor = document["accessors"][index]
+    itemsize = numpy.dtype(GLTF_COMPONENT_DTYPES[accessor["componentType"]]).itemsize
+    return accessor["count"] * GLTF_TYPE_WIDTHS[accessor["type"]] * itemsize
+
+
+def _accessor_references(document):
+    """Every (container, key) holding an accessor index outside animations."""
+    references = []
+    for mesh in document.get("meshes", []):
+        for primitive in mesh.get("primitives", []):
+            attributes = primitive.get("attributes", {})
+            references += [(attributes, name) for name in attributes]
+            if "indices" in primitive:
+                references.append((primitive, "indices"))
+            for target in primitive.get("targets", []):
+                references += [(target, name) for name in target]
+    for skin in document.get("skins", []):
+        if "inverseBindMatrices" in skin:
+            references.append((skin, "inverseBindMatrices"))
+    for node in document.get("nodes", []):
+        instancing = node.get("extensions", {}).get("EXT_mesh_gpu_instancing")
+        if instancing:
+            attributes = instancing.get("attributes", {})
+            references += [(attributes, name) for name in attributes]
+    return references
+
+
+def _buffer_view_references(value, found):
+    """Collect every object holding a ``bufferView`` reference."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "bufferView":
+                found.append(value)
+            else:
+                _buffer_view_references(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            _buffer_view_references(item, found)
+    return found
+
+
+class _BinaryWriter:
+    """Appends 4-byte aligned buffer views to a new binary chunk."""
+
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+        self.views = []
+
+    def add(self, data, **view):
+        padding = -self.length % 4
+        if padding:
+            self.parts.append(b"\0" * padding)
+            self.length += padding
+        self.views.append({"buffer": 0, "byteOffset": self.length, "byteLength": len(data), **view})
+        self.parts.append(data)
+        self.length += len(data)
+        return len(self.views) - 1
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+def _encode_output(values, path, quantize):
+    """Return ``(bytes, componentType, normalized)`` for sampler output.
+
+    glTF only allows normalised integers for rotation and weights output;
+    translation and scale stay float.
+    """
+    if quantize and path in ('rotation', 'weights') and numpy.all(numpy.abs(values) <= 1.0):
+        encoded = numpy.round(values * 32767.0).astype('<i2')
+        return encoded.tobytes(), GLTF_SHORT, True
+    return values.astype('<f4').tobytes(), GLTF_FLOAT, False
+
+
+def _plan_channels(document, binary, tolerance_scale):
+    """Decide per channel whether to keep, reduce, bake or collapse it.
+
+    Returns one list of channel entries per animation. Entries carry the
+    decoded ``times``/``values`` and the ``keep`` key indices when the
+    channel is rewritten.
+    """
+    animations = document.get("animations", [])
+    animated = {}
+    for animation in animations:
+        for channel in animation["channels"]:
+            target = (channel["target"].get("node"), channel["target"]["path"])
+            animated[target] = animated.get(target, 0) + 1
+
+    nodes = document.get("nodes", [])
+    plans = []
+    for animation in animations:
+        entries = []
+        for channel in animation["channels"]:
+            sampler = animation["samplers"][channel["sampler"]]
+            target = channel["target"]
+            path = target["path"]
+            entry = {"channel": channel, "path": path, "sampler": sampler, "action": "keep"}
+            entries.append(entry)
+            interpolation = sampler.get("interpolation", "LINEAR")
+            if path not in ANIMATION_TOLERANCES or interpolation == "CUBICSPLINE" or "node" not in target:
+                continue
+            times = _read_accessor(document, binary, sampler["input"])[:, 0]
+            if not len(times):
+                continue
+            values = _read_accessor(document, binary, sampler["output"])
+            if path == 'weights':
+                values = values.reshape(len(times), -1)
+            elif path == 'rotation':
+                values /= numpy.maximum(numpy.linalg.norm(values, axis=1, keepdims=True), 1e-12)
+            tolerance = ANIMATION_TOLERANCES[path] * tolerance_scale
+            entry.update(times=times, values=values)
+
+            if _deviation_from(values, values[0], path) <= tolerance:
+                node = nodes[target["node"]]
+                # Baking into the node is only exact when no other clip
+                # animates the same property.
+                bakeable = "matrix" not in node and animated[(target["node"], path)] == 1
+                if path == 'weights':
+                    bakeable = bakeable and "mesh" in node
+                entry.update(action="bake" if bakeable else "constant", keep=[0])
+            elif interpolation == "STEP":
+                keep = reduce_step_keys(values, path, tolerance)
+                if keep[-1] != len(times) - 1:
+                    keep.append(len(times) - 1)
+                entry.update(action="reduce", keep=keep)
+            else:
+                entry.update(action="reduce", keep=reduce_linear_keys(times, values, path, tolerance))
+        plans.append(entries)
+    return plans
+
+
+def _sampler_bytes(document, samplers):
+    seen = set()
+    for sampler in samplers:
+        seen.update((sampler["input"], sampler["output"]))
+    return sum(_accessor_bytes(document, index) for index in seen)
+
+
+def optimize_glb_animations(path, tolerance_scale=1.0, quantize=True):
+    """Shrink the animation data of an exported GLB in place.
+
+    Samplers keep only the keys linear (or step) interpolation needs to
+    stay within ``ANIMATION_TOLERANCES * tolerance_scale``. Channels that
+    never change are baked into their node when no other clip animates the
+    same property, and otherwise collapse to a single key. Rotations and
+    morph weights are stored as normalised 16-bit integers. The binary
+    chunk is rebuilt without the replaced data.
+
+    Does not touch ``bpy``, so it runs on the export worker thread. Returns
+    a report with per-clip channel, key and byte counts (also stored in the
+    file's ``asset.extras``), or None when the file has no animation or
+    uses extensions the optimiser does not know.
+    """
+    document, binary = read_glb(path)
+    animations = document.get("animations", [])
+    if not animations:
+        return None
+    unknown = set(document.get("extensionsUsed", [])) - ANIMATION_SAFE_EXTENSIONS
+    if unknown or len(document.get("buffers", [])) != 1 or "uri" in document["buffers"][0]:
+        print(f"[blendXweb2] animation optimisation skipped for {Path(path).name}: "
+              f"{', '.join(sorted(unknown)) or 'external buffers'}")
+        return None
+    try:
+        plans = _plan_channels(document, binary, tolerance_scale)
+    except (_UnsupportedGlb, KeyError, ValueError) as e:
+        print(f"[blendXweb2] animation optimisation skipped for {Path(path).name}: {e}")
+        return None
+
+    nodes = document.get("nodes", [])
+    accessors = document["accessors"]
+    replaced_accessors = set()
+    new_views = []
+    input_accessors = {}
+
+    def add_accessor(data, component_type, accessor_type, count, normalized=False, bounds=None):
+        new_views.append(data)
+        accessor = {
+            # Resolved to a real index once the binary chunk is rebuilt.
+            "bufferView": ("new", len(new_views) - 1),
+            "componentType": component_type,
+            "count": count,
+            "type": accessor_type,
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if bounds is not None:
+            accessor["min"], accessor["max"] = bounds
+        accessors.append(accessor)
+        return len(accessors) - 1
+
+    clips = []
+    for animation, entries in zip(animations, plans):
+        samplers = animation["samplers"]
+        for sampler in samplers:
+            replaced_accessors.update((sampler["input"], sampler["output"]))
+        starts, ends = [], []
+        for sampler in samplers:
+            bounds = accessors[sampler["input"]]
+            starts.append(bounds.get("min", [0.0])[0])
+            ends.append(bounds.get("max", [0.0])[0])
+        clip_end = max(ends)
+        report = {
+            "name": animation.get("name", ""),
+            "duration": round(clip_end - min(starts), 4),
+            "channels_before": len(entries),
+            "keys_before": sum(accessors[sampler["input"]]["count"] for sampler in samplers),
+            "bytes_before": _sampler_bytes(document, samplers),
+        }
+
+        # three.js takes a clip's duration from its last key, so keep one
+        # constant channel at full length when nothing else reaches the end.
+        kept = [entry for entry in entries if entry["action"] != "bake"]
+        reached = [
+            float(entry["times"][entry["keep"][-1]]) if "keep" in entry else clip_end for entry in kept
+        ]
+        if not reached or max(reached) < clip_end - 1e-6:
+            constant = [entry for entry in entries if entry["action"] in ("bake", "constant")]
+            if constant:
+                longest = max(constant, key=lambda entry: entry["times"][-1])
+                if longest["action"] == "bake":
+                    kept.append(longest)
+                longest.update(action="constant", keep=[0, len(longest["times"]) - 1])
+
+        for entry in entries:
+            if entry["action"] == "bake":
+                value = [round(float(component), 7) for component in entry["values"][0]]
+                nodes[entry["channel"]["target"]["node"]][entry["path"]] = value
+
+        channels, new_samplers = [], []
+        for entry in kept:
+            sampler = entry["sampler"]
+            if entry["action"] == "keep":
+                new_samplers.append(dict(sampler))
+            else:
+                times = entry["times"][entry["keep"]].astype('<f4')
+                values = entry["values"][entry["keep"]]
+                key = times.tobytes()
+                if key not in input_accessors:
+                    input_accessors[key] = add_accessor(
+                        key, GLTF_FLOAT, "SCALAR", len(times),
+                        bounds=([float(times[0])], [float(times[-1])]),
+                    )
+                data, component_type, normalized = _encode_output(values, entry["path"], quantize)
+                new_samplers.append({
+                    "input": input_accessors[key],
+                    "output": add_accessor(
+                        data,
+                        component_type,
+                        GLTF_PATH_TYPES.get(entry["path"], "SCALAR"),
+                        values.size if entry["path"] == 'weights' else len(values),
+                        normalized,
+                    ),
+                    "interpolation": sampler.get("interpolation", "LINEAR"),
+                })
+            channels.append({**entry["channel"], "sampler": len(new_samplers) - 1})
+        animation["channels"] = channels
+        animation["samplers"] = new_samplers
+        report.update(
+            channels_after=len(channels),
+            baked=sum(1 for entry in entries if entry["action"] == "bake"),
+        )
+        clips.append((animation, report))
+    document["animations"] = [animation for animation in animations if animation["channels"]]
+    if not document["animations"]:
+        del document["animations"]
+
+    # Drop the replaced accessors nothing references any more.
+    references = _accessor_references(document)
+    in_use = {container[key] for container, key in references}
+    for animation in document.get("animations", []):
+        for sampler in animation["samplers"]:
+            in_use.update((sampler["input"], sampler["output"]))
+    remap = {}
+    rebuilt = []
+    for index, accessor in enumerate(accessors):
+        if index in replaced_accessors and index not in in_use:
+            continue
+        remap[index] = len(rebuilt)
+        rebuilt.append(accessor)
+    for container, key in references:
+        container[key] = remap[container[key]]
+    for animation in document.get("animations", []):
+        for sampler in animation["samplers"]:
+            sampler["input"] = remap[sampler["input"]]
+            sampler["output"] = remap[sampler["output"]]
+    document["accessors"] = rebuilt
+
+    # Rebuild the binary chunk from the buffer views still referenced.
+    holders = _buffer_view_references(
+        {key: value for key, value in document.items() if key != "bufferViews"}, []
+    )
+    old_views = document.get("bufferViews", [])
+    writer = _BinaryWriter()
+    view_remap = {}
+    for index in sorted({holder["bufferView"] for holder in holders if isinstance(holder["bufferView"], int)}):
+        view = old_views[index]
+        start = view.get("byteOffset", 0)
+        extra = {key: value for key, value in view.items() if key not in ("buffer", "byteOffset", "byteLength")}
+        view_remap[index] = writer.add(binary[start:start + view["byteLength"]], **extra)
+    added_views = [writer.add(data) for data in new_views]
+    for holder in holders:
+        reference = holder["bufferView"]
+        holder["bufferView"] = added_views[reference[1]] if isinstance(reference, tuple) else view_remap[reference]
+    document["bufferViews"] = writer.views
+    new_binary = writer.getvalue()
+    document["buffers"][0]["byteLength"] = len(new_binary)
+
+    for animation, report in clips:
+        samplers = animation["samplers"]
+        report.update(
+            keys_after=sum(document["accessors"][sampler["input"]]["count"] for sampler in samplers),
+            bytes_after=_sampler_bytes(document, samplers),
+        )
+    summary = {
+        "tolerance_scale": tolerance_scale,
+        "quantized": quantize,
+        "bytes_before": len(binary),
+        "bytes_after": len(new_binary),
+        "clips": [report for _animation, report in clips],
+    }
+    document.setdefault("asset", {}).setdefault("extras", {})[ANIMATION_REPORT_KEY] = summary
+    write_glb(path, document, new_binary)
+    return summary
+
+
+def optimize_exported_animations(path, export_settings, store_key=None):
+    """File task: optimise a freshly exported GLB and refresh its content
+    store entry, so later store hits get the optimised file."""
+    scale = export_settings.get('animation_tolerance', 0)
+    if not scale or not export_settings.get('export_animations', True):
+        return None
+    report = optimize_glb_animations(path, scale)
+    if report is None:
+        return None
+    for clip in report["clips"]:
+        print(
+            f"[blendXweb2] {Path(path).name} clip '{clip['name']}': "
+            f"{clip['channels_before']} -> {clip['channels_after']} channels, "
+            f"{clip['keys_before']} -> {clip['keys_after']} keys, "
+            f"{clip['bytes_before']} -> {clip['bytes_after']} bytes"
+        )
+    if store_key is not None:
+        content_store.put(store_key, path, replace=True)
+    return report
+
+
+def read_animation_report(path):
+    """The optimiser report stored in a GLB, or None."""
+    try:
+        return read_glb_document(path).get("asset", {}).get("extras", {}).get(ANIMATION_REPORT_KEY)
+    except (OSError, ValueError, struct.error, _UnsupportedGlb):
+        return None
+
+
+def collect_animation_report(output_dir):
+    """Per-clip optimiser reports of the GLBs in an export directory.
+
+    Read back from the files, so GLBs reused from the export cache or the
+    content store report the optimisation they got when first exported.
+    """
+    output_path = Path(output_dir)
+    scene_glb = output_path / "scene.glb"
+    files = [scene_glb] if scene_glb.exists() else sorted((output_path / "chunks").glob("*.glb"))
+    clips = []
+    for path in files:
+        report = read_animation_report(path)
+        if report:
+            relative = path.relative_to(output_path).as_posix()
+            clips += [{"file": relative, **clip} for clip in report["clips"]]
+    return clips
+
 
 # ------------------------------------
 # Export Functions
 # ------------------------------------
 
-def export_scene_to_gltf(context, filepath, export_settings):
+def build_export_settings(profile):
+    """Return exporter settings for one of ``EXPORT_PROFILES``."""
+    settings = {
+        'use_selection': False,
+        'export_animations': True,
+        'export_cameras': True,
+        'export_lights': True,
+    }
+    settings.update(EXPORT_PROFILES.get(profile, EXPORT_PROFILES['FINAL']))
+    return settings
+
+
+def _supported_gltf_export_kwargs(kwargs):
+    """Drop glTF exporter options the running Blender version does not know."""
+    try:
+        supported = set(bpy.ops.export_scene.gltf.get_rna_type().properties.keys())
+    except (AttributeError, KeyError, RuntimeError):
+        return kwargs
+    dropped = sorted(key for key in kwargs if key not in supported)
+    if dropped:
+        print(f"[blendXweb2] glTF exporter does not support: {', '.join(dropped)}")
+    return {key: value for key, value in kwargs.items() if key in supported}
+
+
+@contextmanager
+def _downscaled_images(objects, max_size):
+    """Temporarily swap oversized textures used by ``objects`` for scaled copies.
+
+    The glTF exporter has no resolution limit, so each image larger than
+    ``max_size`` is copied, scaled in memory and remapped for the duration of
+    the export; the originals are restored afterwards.
+    """
+    swapped = []
+    if max_size:
+        image_names = {name for kind, name in collect_dependency_keys(objects) if kind == "Image"}
+        for image in list(bpy.data.images):
+            if image.name_full not in image_names or image.type != 'IMAGE':
+                continue
+            width, height = image.size
+            if max(width, height) <= max_size:
+                continue
+            factor = max_size / max(width, height)
+            scaled = image.copy()
+            scaled.scale(max(1, round(width * factor)), max(1, round(height * factor)))
+            image.user_remap(scaled)
+            swapped.append((image, scaled))
+    try:
+        yield
+    finally:
+        for image, scaled in swapped:
+            scaled.user_remap(image)
+            bpy.data.images.remove(scaled)
+
+
+def export_scene_to_gltf(context, filepath, export_settings, objects=None):
     """Export the current scene to glTF format"""
     
     # Configure export settings for glTF - using GLB format instead
+    kwargs = {
+        'filepath': filepath,
+        'export_format': 'GLB',  # Changed from GLTF_EMBEDDED to GLB
+        'use_selection': export_settings.get('use_selection', False),
+        'export_animations': export_settings.get('export_animations', True),
+        'export_cameras': export_settings.get('export_cameras', True),
+        'export_lights': export_settings.get('export_lights', True),
+    }
+    # Profile options (Draco, image format, ...) map 1:1 to exporter options.
+    kwargs.update({key: value for key, value in export_settings.items() if key.startswith('export_')})
+    if objects is None:
+        objects = context.scene.objects
     try:
-        bpy.ops.export_scene.gltf(
-            filepath=filepath,
-            export_format='GLB',  # Changed from GLTF_EMBEDDED to GLB
-            export_selected=export_settings.get('export_selected', False),
-            export_animations=export_settings.get('export_animations', True),
-            export_cameras=export_settings.get('export_cameras', True),
-            export_lights=export_settings.get('export_lights', True)
-        )
+        with _downscaled_images(objects, export_settings.get('texture_max_size', 0)):
+            bpy.ops.export_scene.gltf(**_supported_gltf_export_kwargs(kwargs))
     except TypeError as e:
         # If the above parameters don't work, try with minimal parameters
         print(f"Trying minimal export parameters due to error: {e}")
@@ -354,57 +2199,1053 @@ def export_scene_to_gltf(context, filepath, export_settings):
     
     return filepath
 
-def generate_preview_files(context, temp_dir):
-    """Generate all necessary files for web preview"""
-    temp_path = Path(temp_dir)
 
-    # Copy Vite build output (hashed assets, etc.) into the preview directory.
-    copy_vite_dist_contents(temp_path)
+def _safe_chunk_filename(name):
+    safe = "".join(char if char.isalnum() or char in "-_." else "_" for char in name)
+    return safe.strip(".") or "chunk"
 
-    # Export the scene to glTF (GLB)
-    gltf_path = temp_path / "scene.glb"
-    export_settings = {
-        'export_selected': False,
-        'export_animations': True,
-        'export_cameras': True,
-        'export_lights': True,
+
+def compute_scene_chunks(scene):
+    """Group the scene into exportable chunks: one per top-level object.
+
+    Each chunk holds the top-level object and all of its descendants so the
+    hierarchy and parent-relative transforms survive the split.
+    """
+    chunks = []
+    used_filenames = set()
+    for obj in sorted(scene.objects, key=lambda item: item.name_full):
+        if obj.parent is not None:
+            continue
+        filename = _safe_chunk_filename(obj.name_full)
+        if filename.lower() in used_filenames:
+            filename = f"{filename}_{len(used_filenames)}"
+        used_filenames.add(filename.lower())
+        members = [obj, *[child for child in obj.children_recursive if child.name in scene.objects]]
+        chunks.append({"name": obj.name_full, "file": f"chunks/{filename}.glb", "objects": members})
+    return chunks
+
+
+def _export_selected_objects(context, filepath, objects, export_settings):
+    """Export only ``objects`` by temporarily swapping the selection."""
+    view_layer = context.view_layer
+    previous_selection = [obj for obj in view_layer.objects if obj.select_get()]
+    previous_active = view_layer.objects.active
+    try:
+        for obj in previous_selection:
+            obj.select_set(False)
+        for obj in objects:
+            try:
+                obj.select_set(True)
+            except RuntimeError:
+                # Objects excluded from the view layer cannot be selected.
+                pass
+        export_scene_to_gltf(context, filepath, {**export_settings, 'use_selection': True}, objects)
+    finally:
+        for obj in objects:
+            try:
+                obj.select_set(False)
+            except RuntimeError:
+                pass
+        for obj in previous_selection:
+            obj.select_set(True)
+        view_layer.objects.active = previous_active
+
+
+def _file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _read_manifest_entries(manifest_path):
+    try:
+        with Path(manifest_path).open('r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {entry["name"]: entry for entry in manifest.get("chunks", [])}
+
+
+PRECOMPRESS_MIN_BYTES = 1024
+PRECOMPRESS_SUFFIXES = (".gz", ".br")
+
+
+def _remove_precompressed_variants(path):
+    for suffix in PRECOMPRESS_SUFFIXES:
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def write_precompressed_variants(path):
+    """Write ``.gz`` (and ``.br`` when brotli is installed) next to ``path``.
+
+    The preview server picks these up based on Accept-Encoding, so the
+    compression cost is paid once per export instead of once per request.
+    Variants newer than the source are kept; variants that do not save at
+    least 5% are dropped.
+    """
+    path = Path(path)
+    try:
+        source_stat = path.stat()
+    except OSError:
+        return
+    if source_stat.st_size < PRECOMPRESS_MIN_BYTES:
+        _remove_precompressed_variants(path)
+        return
+
+    def compress(suffix, open_target):
+        target = Path(f"{path}{suffix}")
+        try:
+            if target.stat().st_mtime_ns >= source_stat.st_mtime_ns:
+                return
+        except OSError:
+            pass
+        partial = Path(f"{target}.partial")
+        with path.open('rb') as source, open_target(partial) as destination:
+            shutil.copyfileobj(source, destination, 1024 * 1024)
+        if partial.stat().st_size > source_stat.st_size * 0.95:
+            partial.unlink(missing_ok=True)
+            target.unlink(missing_ok=True)
+        else:
+            os.replace(partial, target)
+
+    compress(".gz", lambda target: gzip.GzipFile(target, 'wb', compresslevel=6, mtime=0))
+    if brotli is not None:
+        compress(".br", _BrotliWriter)
+
+
+class _BrotliWriter:
+    """Minimal file-like wrapper around ``brotli.Compressor``."""
+
+    def __init__(self, target):
+        self._handle = open(target, 'wb')
+        self._compressor = brotli.Compressor(quality=5)
+
+    def write(self, data):
+        self._handle.write(self._compressor.process(data))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self._handle.write(self._compressor.finish())
+        finally:
+            self._handle.close()
+
+
+def _write_json(path, data, **kwargs):
+    # Written aside and renamed: the old file may be hardlinked into an
+    # older generation, and readers must never see it half-written.
+    partial = Path(f"{path}.partial")
+    with partial.open('w', encoding='utf-8') as f:
+        json.dump(data, f, **kwargs)
+    os.replace(partial, path)
+
+
+def _finalize_chunk_manifest(output_path, entries, precompress=True):
+    """Fill in content hashes, drop stale chunk files and write the manifest.
+
+    Only touches files, so it is safe to run on a worker thread.
+    """
+    for entry in entries:
+        chunk_path = output_path / entry["file"]
+        if "hash" not in entry:
+            entry["hash"] = _file_sha256(chunk_path)
+            entry["size"] = chunk_path.stat().st_size
+        if precompress:
+            write_precompressed_variants(chunk_path)
+
+    live_files = {entry["file"] for entry in entries}
+    for stale in (output_path / "chunks").iterdir():
+        relative = stale.relative_to(output_path).as_posix()
+        for suffix in PRECOMPRESS_SUFFIXES:
+            if relative.endswith(suffix):
+                relative = relative[:-len(suffix)]
+        if relative not in live_files:
+            stale.unlink(missing_ok=True)
+
+    manifest_path = output_path / "scene_manifest.json"
+    _write_json(manifest_path, {"version": 1, "chunks": entries}, indent=2)
+    if precompress:
+        write_precompressed_variants(manifest_path)
+
+
+def iter_scene_chunks_export(context, output_dir, export_settings, precompress=True):
+    """Export one GLB per top-level object, yielding progress between chunks.
+
+    Chunks whose dependencies were not touched since the last export to
+    ``output_dir`` (see ``dirty_chunk_tracker``) are reused without hashing;
+    touched chunks are fingerprinted and only re-exported when the
+    fingerprint differs from the one recorded for their file. Returns the
+    file tasks that optimise the animations of newly exported chunks, hash
+    the chunks and write ``scene_manifest.json``.
+    """
+    output_path = Path(output_dir)
+    (output_path / "chunks").mkdir(parents=True, exist_ok=True)
+    manifest_path = output_path / "scene_manifest.json"
+
+    scene = context.scene
+    chunks = compute_scene_chunks(scene)
+    previous_entries = _read_manifest_entries(manifest_path)
+    is_dirty = dirty_chunk_tracker.begin_sync(output_path, scene, export_settings)
+
+    entries = []
+    tasks = []
+    exported = 0
+    for index, chunk in enumerate(chunks):
+        yield (f"export {chunk['name']}", index / max(len(chunks), 1))
+        chunk_path = output_path / chunk["file"]
+        previous = previous_entries.get(chunk["name"])
+        reusable = previous and previous.get("file") == chunk["file"] and chunk_path.exists()
+
+        if reusable and not is_dirty(chunk["objects"]):
+            entries.append(previous)
+            continue
+
+        fingerprint = compute_objects_fingerprint(scene, chunk["objects"], export_settings)
+        if reusable and export_cache.is_current(chunk_path, fingerprint):
+            entries.append(previous)
+            continue
+
+        store_key = export_through_store(
+            chunk_path,
+            "chunk",
+            fingerprint,
+            lambda: _export_selected_objects(context, str(chunk_path), chunk["objects"], export_settings),
+        )
+        if store_key:
+            exported += 1
+            tasks.append((
+                f"optimize {chunk['name']} animations",
+                lambda path=chunk_path, key=store_key: optimize_exported_animations(path, export_settings, key),
+            ))
+        export_cache.store(chunk_path, fingerprint)
+        entries.append({
+            "name": chunk["name"],
+            "file": chunk["file"],
+            "objects": [obj.name_full for obj in chunk["objects"]],
+        })
+
+    dirty_chunk_tracker.finish_sync(output_path)
+    print(f"[blendXweb2] chunked export: {exported} of {len(entries)} chunks exported")
+    tasks.append(("write manifest", lambda: _finalize_chunk_manifest(output_path, entries, precompress)))
+    return tasks
+
+
+LOD_LEVELS = (
+    {'name': "lod0", 'triangle_budget': 25_000, 'texture_max_size': 256},
+    {'name': "lod1", 'triangle_budget': 250_000, 'texture_max_size': 1024},
+)
+# A coarse level is only worth a download when it is at most this fraction
+# of the full scene.
+LOD_MAX_RATIO = 0.5
+
+
+def count_evaluated_triangles(context, objects):
+    """Triangle count of ``objects`` after modifiers, as the exporter sees them."""
+    depsgraph = context.evaluated_depsgraph_get()
+    total = 0
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        mesh = obj.evaluated_get(depsgraph).data
+        loop_totals = array('i', [0]) * len(mesh.polygons)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        total += sum(loop_totals) - 2 * len(loop_totals)
+    return total
+
+
+@contextmanager
+def _temporary_decimation(objects, ratio):
+    """Append a collapse Decimate modifier to each mesh for one export.
+
+    Skinned meshes are left alone: decimating after the Armature modifier
+    would bake the current pose into the coarse level.
+    """
+    added = []
+    for obj in objects:
+        if obj.type != 'MESH' or any(mod.type == 'ARMATURE' for mod in obj.modifiers):
+            continue
+        try:
+            modifier = obj.modifiers.new(name="blendXweb2 LOD", type='DECIMATE')
+        except RuntimeError:
+            # Linked objects cannot take new modifiers.
+            continue
+        modifier.decimate_type = 'COLLAPSE'
+        modifier.ratio = ratio
+        modifier.use_collapse_triangulate = True
+        added.append((obj, modifier))
+    try:
+        yield
+    finally:
+        for obj, modifier in added:
+            obj.modifiers.remove(modifier)
+
+
+def _remove_lod_files(output_path):
+    manifest_path = output_path / "scene_lod.json"
+    manifest_path.unlink(missing_ok=True)
+    _remove_precompressed_variants(manifest_path)
+    shutil.rmtree(output_path / "lod", ignore_errors=True)
+
+
+def _finalize_lod_manifest(output_path, levels, precompress=True):
+    """Hash every level (coarse to full) and write ``scene_lod.json``."""
+    live_files = set()
+    for level in levels:
+        level_path = output_path / level["file"]
+        level["hash"] = _file_sha256(level_path)
+        level["size"] = level_path.stat().st_size
+        if level["file"].startswith("lod/"):
+            if precompress:
+                write_precompressed_variants(level_path)
+            live_files.add(level_path.name)
+
+    for stale in (output_path / "lod").iterdir():
+        name = stale.name
+        for suffix in PRECOMPRESS_SUFFIXES:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        if name not in live_files:
+            stale.unlink(missing_ok=True)
+
+    manifest_path = output_path / "scene_lod.json"
+    _write_json(manifest_path, {"version": 1, "levels": levels}, indent=2)
+    if precompress:
+        write_precompressed_variants(manifest_path)
+
+
+def iter_lod_export(context, output_dir, export_settings, fingerprint, precompress=True):
+    """Export decimated coarse levels of the scene next to ``scene.glb``.
+
+    Each level targets a fixed triangle budget rather than a fixed ratio, so
+    the first level the viewer shows stays about the same size however large
+    the scene grows. Levels are reused while ``fingerprint`` (the full
+    scene's) is unchanged. Returns the file task that writes ``scene_lod.json``.
+    """
+    output_path = Path(output_dir)
+    objects = list(context.scene.objects)
+    total_triangles = count_evaluated_triangles(context, objects)
+
+    levels = []
+    for level in LOD_LEVELS:
+        ratio = level['triangle_budget'] / max(total_triangles, 1)
+        if ratio > LOD_MAX_RATIO:
+            continue
+        level_path = output_path / "lod" / f"{level['name']}.glb"
+        level_path.parent.mkdir(parents=True, exist_ok=True)
+        if not export_cache.is_current(level_path, fingerprint):
+            yield (f"export {level['name']}", 0.0)
+            profile_max = export_settings.get('texture_max_size', 0)
+            level_settings = {
+                **export_settings,
+                'export_apply': True,
+                'export_animations': False,
+                'texture_max_size': min(profile_max or level['texture_max_size'], level['texture_max_size']),
+            }
+
+            def export_level():
+                with _temporary_decimation(objects, ratio):
+                    export_scene_to_gltf(context, str(level_path), level_settings)
+
+            level_kind = f"{level['name']}:{level['triangle_budget']}:{level['texture_max_size']}"
+            export_through_store(level_path, level_kind, fingerprint, export_level)
+            export_cache.store(level_path, fingerprint)
+        levels.append({
+            "name": level['name'],
+            "file": f"lod/{level['name']}.glb",
+            "triangles": level['triangle_budget'],
+        })
+
+    if not levels:
+        _remove_lod_files(output_path)
+        return []
+
+    levels.append({"name": "full", "file": "scene.glb", "triangles": total_triangles})
+    return [("write LOD manifest", lambda: _finalize_lod_manifest(output_path, levels, precompress))]
+
+
+SCENE_INFO_VERSION = 2
+# Object types the exporter turns into meshes; they get bounds and counts.
+GEOMETRY_OBJECT_TYPES = {'MESH', 'CURVE', 'SURFACE', 'FONT', 'META'}
+
+
+def _to_gltf_axes(vector):
+    """Blender Z-up to glTF Y-up, as the exporter converts: (x, z, -y)."""
+    return [round(vector.x, 5), round(vector.z, 5), round(-vector.y, 5)]
+
+
+def _world_bounds(obj_eval):
+    corners = [obj_eval.matrix_world @ Vector(corner) for corner in obj_eval.bound_box]
+    # Min/max after the axis swap, since -y flips which corner is smallest.
+    converted = [_to_gltf_axes(corner) for corner in corners]
+    return [min(axis) for axis in zip(*converted)], [max(axis) for axis in zip(*converted)]
+
+
+def _image_bytes(image):
+    """Size of the image as stored: packed data, the file on disk, or RGBA8."""
+    if image.packed_file is not None:
+        return image.packed_file.size
+    if image.source in {'FILE', 'SEQUENCE', 'MOVIE'} and image.filepath:
+        try:
+            return os.path.getsize(bpy.path.abspath(image.filepath, library=image.library))
+        except OSError:
+            pass
+    width, height = image.size
+    return width * height * 4
+
+
+def _material_images(material, images):
+    def walk(node_tree, seen):
+        if node_tree is None or node_tree in seen:
+            return
+        seen.add(node_tree)
+        for node in node_tree.nodes:
+            if getattr(node, "image", None) is not None:
+                images.setdefault(node.image.name_full, node.image)
+            if node.type == 'GROUP':
+                walk(node.node_tree, seen)
+
+    if material.use_nodes:
+        walk(material.node_tree, set())
+
+
+def _camera_vertical_fov(camera, scene):
+    """Vertical field of view in degrees, as three.js PerspectiveCamera takes it."""
+    data = camera.data
+    if data.type != 'PERSP':
+        return None
+    render = scene.render
+    aspect = (render.resolution_x * render.pixel_aspect_x) / max(render.resolution_y * render.pixel_aspect_y, 1e-6)
+    fit = data.sensor_fit
+    if fit == 'VERTICAL':
+        return math.degrees(2 * math.atan(data.sensor_height / (2 * data.lens)))
+    if fit == 'AUTO' and aspect < 1:
+        return math.degrees(2 * math.atan(data.sensor_width / (2 * data.lens)))
+    horizontal = 2 * math.atan(data.sensor_width / (2 * data.lens))
+    return math.degrees(2 * math.atan(math.tan(horizontal / 2) / aspect))
+
+
+def _camera_info(scene):
+    camera = scene.camera
+    if camera is None:
+        return None
+    matrix = camera.matrix_world
+    position = matrix.translation
+    forward = matrix.to_3x3() @ Vector((0.0, 0.0, -1.0))
+    up = matrix.to_3x3() @ Vector((0.0, 1.0, 0.0))
+    fov = _camera_vertical_fov(camera, scene)
+    return {
+        "name": camera.name_full,
+        "position": _to_gltf_axes(position),
+        "target": _to_gltf_axes(position + forward),
+        "up": _to_gltf_axes(up.normalized()),
+        "fov": round(fov, 4) if fov is not None else None,
     }
-    export_scene_to_gltf(context, str(gltf_path), export_settings)
 
-    # Create a scene info JSON file with metadata
-    scene_info = {
+
+def collect_scene_info(context):
+    """Metadata the viewer can show before the scene has downloaded.
+
+    Positions are in the exported (glTF, Y-up) frame. Vertex and triangle
+    counts are Blender's after modifiers; the GLB may split vertices along
+    seams. Texture sizes are the source images', before any downscaling.
+    """
+    scene = context.scene
+    depsgraph = context.evaluated_depsgraph_get()
+    objects = list(scene.objects)
+
+    object_bounds = []
+    scene_min = [math.inf] * 3
+    scene_max = [-math.inf] * 3
+    vertices = 0
+    materials = {}
+    for obj in objects:
+        if obj.type not in GEOMETRY_OBJECT_TYPES:
+            continue
+        obj_eval = obj.evaluated_get(depsgraph)
+        low, high = _world_bounds(obj_eval)
+        object_bounds.append({"name": obj.name_full, "min": low, "max": high})
+        scene_min = [min(a, b) for a, b in zip(scene_min, low)]
+        scene_max = [max(a, b) for a, b in zip(scene_max, high)]
+        if obj.type == 'MESH':
+            mesh = obj_eval.data
+            vertices += len(mesh.vertices)
+        for slot in obj.material_slots:
+            if slot.material is not None:
+                materials.setdefault(slot.material.name_full, slot.material)
+    triangles = count_evaluated_triangles(context, objects)
+
+    images = {}
+    for material in materials.values():
+        _material_images(material, images)
+    textures = [
+        {"name": name, "width": image.size[0], "height": image.size[1], "bytes": _image_bytes(image)}
+        for name, image in images.items()
+    ]
+
+    fps = scene.render.fps / scene.render.fps_base
+    actions = {}
+    for obj in objects:
+        anim_data = obj.animation_data
+        if anim_data is None:
+            continue
+        if anim_data.action is not None:
+            actions.setdefault(anim_data.action.name_full, anim_data.action)
+        for track in anim_data.nla_tracks:
+            for strip in track.strips:
+                if strip.action is not None:
+                    actions.setdefault(strip.action.name_full, strip.action)
+    animations = [
+        {"name": name, "duration": round((action.frame_range[1] - action.frame_range[0]) / fps, 4)}
+        for name, action in actions.items()
+    ]
+
+    return {
+        "version": SCENE_INFO_VERSION,
         "title": bpy.path.basename(bpy.data.filepath) or "Untitled Scene",
         "objects": len(bpy.data.objects),
         "has_animations": any(obj.animation_data for obj in bpy.data.objects),
+        "up_axis": "Y",
+        "bounds": {"min": scene_min, "max": scene_max} if object_bounds else None,
+        "object_bounds": object_bounds,
+        "vertices": vertices,
+        "triangles": triangles,
+        "materials": len(materials),
+        "textures": {"count": len(textures), "bytes": sum(texture["bytes"] for texture in textures), "items": textures},
+        "animations": animations,
+        "camera": _camera_info(scene),
     }
 
-    with (temp_path / "scene_info.json").open('w', encoding='utf-8') as f:
-        json.dump(scene_info, f)
 
-    return str(temp_path)
+GENERATION_POINTER = "generation.json"
+GENERATIONS_DIRNAME = "gen"
+
+
+def generation_dir(output_dir, generation):
+    return Path(output_dir) / GENERATIONS_DIRNAME / str(generation)
 
-def package_for_export(context, export_path):
-    """Package all files into a standalone web export"""
-    # Create a temporary directory for staging files
+
+def published_generation(output_dir):
+    """Number of the generation ``generation.json`` points at, or None."""
     try:
-        temp_dir = tempfile.mkdtemp()
-        
-        # Generate all the preview files
-        generate_preview_files(context, temp_dir)
-        
-        # Create a zip file with all contents
-        shutil.make_archive(export_path, 'zip', temp_dir)
-        
-        # Clean up with error handling
+        with (Path(output_dir) / GENERATION_POINTER).open('r', encoding='utf-8') as f:
+            return int(json.load(f)["generation"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def begin_generation(output_dir):
+    """Create the next export generation under ``output_dir/gen``.
+
+    The new directory starts as hardlinks of every file in the published
+    generation, so unchanged chunks, LOD levels and precompressed siblings
+    cost nothing; exports replace files rather than writing through them.
+    Unpublished generations left by failed exports are removed. Returns
+    ``(generation, path)``.
+    """
+    output_path = Path(output_dir)
+    current = published_generation(output_path)
+    generations = output_path / GENERATIONS_DIRNAME
+    generations.mkdir(parents=True, exist_ok=True)
+    for stale in generations.iterdir():
+        if stale.name.isdigit() and (current is None or int(stale.name) > current):
+            shutil.rmtree(stale, ignore_errors=True)
+
+    generation = 1 if current is None else current + 1
+    path = generation_dir(output_path, generation)
+    path.mkdir()
+    if current is not None:
+        previous = generation_dir(output_path, current)
+        for source in previous.rglob('*'):
+            if source.is_file() and not source.name.endswith(".partial"):
+                target = path / source.relative_to(previous)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                _place_file(source, target)
+        export_cache.rebase(previous, path)
+        dirty_chunk_tracker.rebase(previous, path)
+    return generation, path
+
+
+def publish_generation(output_dir, generation):
+    """Atomically point ``generation.json`` at a finished generation.
+
+    The preview server serves whatever the pointer names when a request
+    arrives and deletes superseded generations once nobody reads them.
+    """
+    _write_json(
+        Path(output_dir) / GENERATION_POINTER,
+        {"generation": generation, "published": round(time.time(), 3)},
+    )
+
+
+def iter_preview_export(context, temp_dir, profile=None, precompress=True):
+    """Main-thread half of a preview export.
+
+    Yields ``(stage, fraction)`` tuples between units of Blender work and
+    returns a list of ``(stage, callable)`` file tasks that do not touch
+    ``bpy`` and may run on a worker thread (see ``run_export_tasks``).
+    ``profile`` defaults to the preview profile from the preferences;
+    ``precompress`` controls the ``.gz``/``.br`` siblings the server uses.
+
+    Files are written to a new generation (see ``begin_generation``); the
+    last task publishes it.
+    """
+    generation, temp_path = begin_generation(temp_dir)
+
+    prefs = get_addon_preferences()
+    if profile is None:
+        profile = prefs.export_profile if prefs else 'FAST_PREVIEW'
+    export_settings = build_export_settings(profile)
+
+    tasks = []
+    if prefs and prefs.export_mode == 'CHUNKED':
+        (temp_path / "scene.glb").unlink(missing_ok=True)
+        _remove_precompressed_variants(temp_path / "scene.glb")
+        _remove_lod_files(temp_path)
+        tasks += yield from iter_scene_chunks_export(context, temp_path, export_settings, precompress)
+    else:
+        # Export the scene to glTF (GLB), unless the last export is still current
+        (temp_path / "scene_manifest.json").unlink(missing_ok=True)
+        _remove_precompressed_variants(temp_path / "scene_manifest.json")
+        shutil.rmtree(temp_path / "chunks", ignore_errors=True)
+        gltf_path = temp_path / "scene.glb"
+        yield ("fingerprint", 0.0)
+        fingerprint = compute_scene_fingerprint(context, export_settings)
+        if prefs is None or prefs.use_lod:
+            tasks += yield from iter_lod_export(
+                context, temp_path, export_settings, fingerprint, precompress
+            )
+        else:
+            _remove_lod_files(temp_path)
+        if not export_cache.is_current(gltf_path, fingerprint):
+            yield ("export scene", 0.1)
+            store_key = export_through_store(
+                gltf_path,
+                "scene",
+                fingerprint,
+                lambda: export_scene_to_gltf(context, str(gltf_path), export_settings),
+            )
+            export_cache.store(gltf_path, fingerprint)
+            if store_key:
+                # Before the LOD manifest hashes scene.glb.
+                tasks.insert(0, (
+                    "optimize animations",
+                    lambda: optimize_exported_animations(gltf_path, export_settings, store_key),
+                ))
+        if precompress:
+            tasks.append(("compress scene", lambda: write_precompressed_variants(gltf_path)))
+
+    # Scene metadata (bounds, counts, camera) lets the viewer frame the view
+    # and fill in stats before the model has downloaded.
+    yield ("scene info", 0.95)
+    scene_info = collect_scene_info(context)
+    scene_info_path = temp_path / "scene_info.json"
+
+    def write_scene_info():
+        scene_info["animation_report"] = collect_animation_report(temp_path)
+        _write_json(scene_info_path, scene_info)
+
+    tasks.append(("write scene info", write_scene_info))
+    if precompress:
+        tasks.append(("compress scene info", lambda: write_precompressed_variants(scene_info_path)))
+    tasks.append(("publish generation", lambda: publish_generation(temp_dir, generation)))
+    return tasks
+
+
+class StageTimer:
+    """Accumulate wall-clock seconds per named export stage.
+
+    Safe to share between the main thread and the export worker thread.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, stage):
+        started = time.perf_counter()
         try:
-            shutil.rmtree(temp_dir)
-        except:
-            print("Warning: Could not remove temporary directory after export")
-            
-        return export_path + ".zip"
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    @property
+    def total(self):
+        with self._lock:
+            return sum(self.stages.values())
+
+    def as_dict(self):
+        with self._lock:
+            return {stage: round(seconds, 4) for stage, seconds in self.stages.items()}
+
+
+def _timed_steps(steps, timer):
+    """Wrap an export generator, charging the work after each yield to its stage.
+
+    Only the time spent inside the generator counts; idle time between
+    timer ticks does not.
+    """
+    stage = "prepare"
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(steps)
+        except StopIteration as stop:
+            timer.add(stage, time.perf_counter() - started)
+            return stop.value
+        timer.add(stage, time.perf_counter() - started)
+        stage = item[0]
+        yield item
+
+
+def run_export_tasks(tasks, on_progress=None, timer=None, cancelled=None):
+    """Run the file tasks returned by ``iter_preview_export`` in order.
+
+    Stops before the next task once the ``cancelled`` event is set, so a
+    cancelled export never publishes its generation. Returns False then.
+    """
+    for index, (stage, task) in enumerate(tasks):
+        if cancelled is not None and cancelled.is_set():
+            return False
+        if on_progress:
+            on_progress(stage, index / max(len(tasks), 1))
+        if timer is None:
+            task()
+        else:
+            with timer.measure(stage):
+                task()
+    return True
+
+
+def _drain(steps):
+    """Run a generator to completion and return its return value."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def generate_preview_files(context, temp_dir, profile=None, precompress=True, timer=None):
+    """Generate the per-scene files (GLB and scene info) for web preview.
+
+    The static viewer bundle is not copied here: the preview server serves it
+    straight from ``resolve_web_build_dir()``. This runs the whole pipeline
+    synchronously; the preview operator uses ``PreviewExportJob`` instead.
+    Returns the directory of the generation that was written.
+    """
+    steps = iter_preview_export(context, temp_dir, profile, precompress)
+    if timer is not None:
+        steps = _timed_steps(steps, timer)
+    run_export_tasks(_drain(steps), timer=timer)
+    return str(generation_dir(temp_dir, published_generation(temp_dir)))
+
+
+def export_log_path():
+    """JSONL file that receives one timing record per export."""
+    return addon_user_dir() / "export_timings.jsonl"
+
+
+def server_log_path():
+    """Output of the detached preview server process."""
+    return addon_user_dir() / "preview_server.log"
+
+
+last_export_timings = None
+
+
+def record_export_timings(kind, timer, error=None):
+    """Remember the latest stage breakdown and append it to the export log."""
+    global last_export_timings
+    prefs = get_addon_preferences()
+    last_export_timings = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "kind": kind,
+        "blend": bpy.data.filepath,
+        "mode": prefs.export_mode if prefs else 'SINGLE',
+        "total_seconds": round(timer.total, 4),
+        "stages": timer.as_dict(),
+        "error": str(error) if error is not None else None,
+    }
+    try:
+        log_path = export_log_path()
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with log_path.open('a', encoding='utf-8') as f:
+            f.write(json.dumps(last_export_timings) + "\n")
+    except OSError as e:
+        print(f"[blendXweb2] Could not write export log: {e}")
+    return last_export_timings
+
+
+def _tag_panels_for_redraw():
+    window_manager = getattr(bpy.context, "window_manager", None)
+    if window_manager is None:
+        return
+    for window in window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+class PreviewExportJob:
+    """Timer-driven preview refresh that keeps Blender's UI responsive.
+
+    Blender data is only read from ``bpy.app.timers`` callbacks on the main
+    thread, one unit of work (fingerprint, scene export, one chunk) per tick.
+    The remaining file work (hashing, JSON writing) runs on a worker thread.
+
+    An undo or delete between ticks can free objects the export still
+    holds; the export then restarts from scratch (``MAX_RESTARTS`` times).
+    """
+
+    MAIN_THREAD_SHARE = 0.8
+    MAX_RESTARTS = 3
+
+    def __init__(self, output_dir, open_url=None):
+        self.output_dir = output_dir
+        self.open_url = open_url
+        self.stage = "queued"
+        self.progress = 0.0
+        self.summary = ""
+        self.error = None
+        self.rerun_requested = False
+        self.finished = False
+        self._steps = None
+        self._tasks = None
+        self._worker = None
+        self._cancelled = threading.Event()
+        self._restarts = 0
+        self._cache_misses = export_cache.misses
+        self.timer = StageTimer()
+
+    @property
+    def is_running(self):
+        return not self.finished
+
+    def start(self):
+        bpy.app.timers.register(self._tick, first_interval=0.0)
+
+    def cancel(self):
+        """Stop the export; the worker finishes its current task at most and
+        the generation is not published."""
+        self._cancelled.set()
+        if bpy.app.timers.is_registered(self._tick):
+            bpy.app.timers.unregister(self._tick)
+        # Files written so far belong to a generation that is never published.
+        export_cache.invalidate(self.output_dir)
+        dirty_chunk_tracker.forget(self.output_dir)
+        self.stage = "cancelled"
+        self.finished = True
+
+    def _set_progress(self, stage, fraction):
+        self.stage = stage
+        self.progress = fraction
+
+    def _run_worker(self):
+        share = self.MAIN_THREAD_SHARE
+        try:
+            run_export_tasks(
+                self._tasks,
+                lambda stage, fraction: self._set_progress(stage, share + fraction * (1.0 - share)),
+                timer=self.timer,
+                cancelled=self._cancelled,
+            )
+        except Exception as error:
+            self.error = error
+
+    def _tick(self):
+        if self._worker is None:
+            try:
+                if self._steps is None:
+                    self._steps = _timed_steps(
+                        iter_preview_export(bpy.context, self.output_dir), self.timer
+                    )
+                stage, fraction = next(self._steps)
+                self._set_progress(stage, fraction * self.MAIN_THREAD_SHARE)
+                _tag_panels_for_redraw()
+                return 0.01
+            except StopIteration as stop:
+                self._tasks = stop.value
+                self._worker = threading.Thread(target=self._run_worker, daemon=True)
+                self._worker.start()
+            except ReferenceError as error:
+                # A datablock was removed under the export (undo, delete).
+                if self._restarts >= self.MAX_RESTARTS:
+                    self.error = error
+                    return self._finish()
+                self._restarts += 1
+                # The aborted attempt stored fingerprints for files in the
+                # generation that begin_generation is about to re-seed.
+                export_cache.invalidate(self.output_dir)
+                dirty_chunk_tracker.forget(self.output_dir)
+                self._steps = None
+                self._set_progress("restarting", 0.0)
+                self.summary = f"Scene changed during export ({error}); restarting."
+                print(f"[blendXweb2] {self.summary}")
+                _tag_panels_for_redraw()
+                return 0.01
+            except Exception as error:
+                self.error = error
+                return self._finish()
+
+        if self._worker.is_alive():
+            _tag_panels_for_redraw()
+            return 0.1
+        return self._finish()
+
+    def _finish(self):
+        self.finished = True
+        self.progress = 1.0
+        timings = record_export_timings("preview", self.timer, self.error)
+        if self.error is not None:
+            export_cache.invalidate(self.output_dir)
+            dirty_chunk_tracker.forget(self.output_dir)
+            self.stage = "failed"
+            self.summary = f"Error generating preview: {self.error}"
+        elif export_cache.misses == self._cache_misses:
+            self.stage = "done"
+            self.summary = "Scene unchanged since the last refresh; export skipped."
+        else:
+            self.stage = "done"
+            self.summary = "Preview files updated; open viewers reload automatically."
+            if preview_server is not None:
+                preview_server.notify_reload({"reason": "export", "timings": timings})
+        print(f"[blendXweb2] {self.summary}")
+
+        if self.error is None and self.open_url:
+            webbrowser.open(self.open_url)
+
+        if self.rerun_requested:
+            start_preview_export(self.output_dir)
+        _tag_panels_for_redraw()
+        return None
+
+
+preview_export_job = None
+
+
+def start_preview_export(output_dir, open_url=None):
+    """Start a background preview refresh, or merge into the running one.
+
+    Returns ``(job, merged)``; ``merged`` is True when a refresh was already
+    running and will be followed by exactly one more refresh.
+    """
+    global preview_export_job
+    if preview_export_job is not None and preview_export_job.is_running:
+        preview_export_job.rerun_requested = True
+        return preview_export_job, True
+
+    preview_export_job = PreviewExportJob(output_dir, open_url=open_url)
+    preview_export_job.start()
+    return preview_export_job, False
+
+
+# Formats that are already compressed; deflating them again wastes time.
+# GLBs are decided per file (see ``_package_compress_type``).
+PACKAGE_STORED_SUFFIXES = {
+    ".wasm", ".png", ".jpg", ".jpeg", ".webp", ".ktx2", ".basis",
+    ".mp3", ".mp4", ".ogg", ".webm", ".woff", ".woff2", ".zip",
+}
+
+
+def _collect_package_files(roots):
+    """Map archive names to files, later roots overriding earlier ones.
+
+    Precompressed ``.gz``/``.br`` siblings are preview-server artifacts and
+    are left out of packages.
+    """
+    files = {}
+    for root in roots:
+        root = Path(root)
+        for path in sorted(root.rglob("*")):
+            if not path.is_file() or path.suffix in PRECOMPRESS_SUFFIXES:
+                continue
+            files[path.relative_to(root).as_posix()] = path
+    return files
+
+
+def _package_compress_type(path):
+    """Store already-compressed files; deflate the rest.
+
+    A GLB is only stored when its geometry is Draco-compressed; the FINAL
+    profile writes raw float vertex and index buffers, which deflate well.
+    """
+    suffix = path.suffix.lower()
+    if suffix in PACKAGE_STORED_SUFFIXES:
+        return zipfile.ZIP_STORED
+    if suffix == ".glb":
+        try:
+            extensions = read_glb_document(path).get("extensionsUsed", [])
+        except (OSError, ValueError, struct.error, _UnsupportedGlb):
+            extensions = []
+        if "KHR_draco_mesh_compression" in extensions:
+            return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def write_web_package(archive_path, roots, on_progress=None):
+    """Stream the files under ``roots`` into a zip at ``archive_path``.
+
+    Already-compressed formats (see ``_package_compress_type``) are stored
+    as-is; everything else is deflated while it is streamed from disk.
+    Entries are deflated one after another: ``zipfile`` has no public API
+    for adding data deflated elsewhere, so compression cannot move to a
+    thread pool. ``on_progress`` receives a 0..1 fraction of the bytes
+    written.
+    """
+    files = _collect_package_files(roots)
+    total_bytes = sum(path.stat().st_size for path in files.values()) or 1
+    written = 0
+
+    partial = Path(f"{archive_path}.partial")
+    with zipfile.ZipFile(partial, 'w', allowZip64=True) as archive:
+        for arcname, path in files.items():
+            compress_type = _package_compress_type(path)
+            if compress_type == zipfile.ZIP_DEFLATED:
+                archive.write(path, arcname, compress_type=compress_type, compresslevel=6)
+            else:
+                archive.write(path, arcname, compress_type=compress_type)
+            written += path.stat().st_size
+            if on_progress:
+                on_progress(written / total_bytes)
+    os.replace(partial, archive_path)
+    return archive_path
+
+
+def package_for_export(context, export_path, profile='FINAL', on_progress=None):
+    """Export the scene and stream it with the viewer bundle into ``<export_path>.zip``.
+
+    Only the per-scene files are written to a temporary directory; the
+    viewer bundle is read in place from ``resolve_web_build_dir()``.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="blendxweb2_")
+    timer = StageTimer()
+    error = None
+    try:
+        scene_dir = generate_preview_files(context, temp_dir, profile, precompress=False, timer=timer)
+        with timer.measure("write package"):
+            return write_web_package(
+                export_path + ".zip",
+                [resolve_web_build_dir(), scene_dir],
+                on_progress,
+            )
     except Exception as e:
+        error = e
         print(f"Error during export: {e}")
         return None
+    finally:
+        record_export_timings("package", timer, error)
+        export_cache.invalidate(temp_dir)
+        dirty_chunk_tracker.forget(temp_dir)
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
 # ------------------------------------
 # Operators
@@ -451,26 +3292,26 @@ class WEB_PREVIEW_OT_preview_scene(bpy.types.Operator):
 
         server_was_running = preview_server.is_running
 
+        session_dir = preview_server.temp_dir
+
         if not server_was_running:
             preview_server.start_server()
             if not preview_server.is_running:
                 self.report({'ERROR'}, "Failed to start web preview server")
                 return {'CANCELLED'}
-        elif not preview_server.temp_dir:
-            self.report({'ERROR'}, "Preview server has no temporary directory")
+        elif not preview_server.ensure_session():
+            self.report({'ERROR'}, "Lost the preview server session and could not start a new one")
             return {'CANCELLED'}
 
-        # Generate preview files
-        try:
-            generate_preview_files(context, preview_server.temp_dir)
-        except Exception as e:
-            self.report({'ERROR'}, f"Error generating preview: {str(e)}")
-            return {'CANCELLED'}
-
-        if not server_was_running:
-            webbrowser.open(preview_server.get_url())
+        # Generate preview files in the background; the browser opens once the
+        # first export is on disk (again if the session had to be renewed).
+        session_renewed = server_was_running and preview_server.temp_dir != session_dir
+        open_url = preview_server.get_url() if not server_was_running or session_renewed else None
+        _job, merged = start_preview_export(preview_server.temp_dir, open_url=open_url)
+        if merged:
+            self.report({'INFO'}, "Refresh already running; another refresh will follow it.")
         else:
-            self.report({'INFO'}, "Preview files updated. Refresh the browser tab to view changes.")
+            self.report({'INFO'}, "Refreshing preview in the background.")
 
         return {'FINISHED'}
 
@@ -485,6 +3326,12 @@ class WEB_PREVIEW_OT_export_scene(bpy.types.Operator):
         default="",
         subtype='FILE_PATH'
     )
+    profile: EnumProperty(
+        name="Profile",
+        description="Compression and texture settings for the exported scene",
+        items=EXPORT_PROFILE_ITEMS,
+        default='FINAL',
+    )
     
     def invoke(self, context, event):
         # Set default filename based on blend file
@@ -501,7 +3348,17 @@ class WEB_PREVIEW_OT_export_scene(bpy.types.Operator):
     def execute(self, context):
         # Package and export the scene
         try:
-            export_path = package_for_export(context, self.filepath)
+            window_manager = context.window_manager
+            window_manager.progress_begin(0, 100)
+            try:
+                export_path = package_for_export(
+                    context,
+                    self.filepath,
+                    self.profile,
+                    on_progress=lambda fraction: window_manager.progress_update(int(fraction * 100)),
+                )
+            finally:
+                window_manager.progress_end()
             if export_path:
                 self.report({'INFO'}, f"Scene exported to {export_path}")
                 return {'FINISHED'}
@@ -513,13 +3370,16 @@ class WEB_PREVIEW_OT_export_scene(bpy.types.Operator):
             return {'CANCELLED'}
 
 class WEB_PREVIEW_OT_stop_server(bpy.types.Operator):
-    """Stop the web preview server"""
+    """End this Blender instance's preview session"""
     bl_idname = "web_preview.stop_server"
     bl_label = "Stop Server"
     
     def execute(self, context):
         global preview_server
         
+        if preview_export_job is not None and preview_export_job.is_running:
+            preview_export_job.cancel()
+
         if preview_server and preview_server.is_running:
             preview_server.stop_server()
             self.report({'INFO'}, "Web preview server stopped")
@@ -532,6 +3392,10 @@ class WEB_PREVIEW_OT_stop_server(bpy.types.Operator):
 # UI
 # ------------------------------------
 
+PANEL_TIMING_ROWS = 5
+PANEL_LOG_ROWS = 6
+
+
 class WEB_PREVIEW_PT_panel(bpy.types.Panel):
     """Panel for web preview controls"""
     bl_label = "blendXweb2"
@@ -557,13 +3421,40 @@ class WEB_PREVIEW_PT_panel(bpy.types.Panel):
         row = box.row()
         row.operator("web_preview.preview_scene", text=button_label, icon='WORLD')
 
+        job = preview_export_job
+        if job is not None and job.is_running:
+            label = f"{job.stage}{' (+1 queued)' if job.rerun_requested else ''}"
+            if hasattr(box, "progress"):
+                box.progress(factor=job.progress, type='BAR', text=label)
+            else:
+                box.label(text=f"{label}: {int(job.progress * 100)}%")
+        elif job is not None and job.summary:
+            box.label(text=job.summary, icon='ERROR' if job.error else 'CHECKMARK')
+
+        timings = last_export_timings
+        if timings and not (job is not None and job.is_running):
+            col = box.column(align=True)
+            col.label(text=f"last {timings['kind']}: {timings['total_seconds']:.2f}s", icon='TIME')
+            slowest = sorted(timings["stages"].items(), key=lambda item: item[1], reverse=True)
+            for stage, seconds in slowest[:PANEL_TIMING_ROWS]:
+                col.label(text=f"    {stage}: {seconds:.2f}s")
+
         # Server status
         status_text = "running" if is_running else "offline"
         box.label(text=f"server: {status_text}")
 
         if is_running:
             box.operator("web_preview.stop_server", text="stop server", icon='X')
-            box.label(text=f"port: {preview_server.port}")
+            box.label(text=f"port: {preview_server.port}  session: {preview_server.session_id}")
+            box.label(text=f"export cache: {export_cache.hits} hits / {export_cache.misses} misses")
+            box.label(text=f"content store: {content_store.hits} hits / {content_store.misses} misses")
+            log_lines = server_log.tail(PANEL_LOG_ROWS)
+            if log_lines:
+                col = box.column(align=True)
+                col.scale_y = 0.7
+                col.label(text="server log:")
+                for line in log_lines:
+                    col.label(text=line)
 
         # Export section
         box = layout.box()
@@ -587,15 +3478,26 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
 
+    for handler_name, handler in _APP_HANDLERS:
+        getattr(bpy.app.handlers, handler_name).append(handler)
+
     register_preview_shortcut_keymap()
 
 def unregister():
-    # Stop the server if it's running
+    # Stop any background refresh and the server if it's running
     global preview_server
-    if preview_server and preview_server.is_running:
+    if preview_export_job is not None and preview_export_job.is_running:
+        preview_export_job.cancel()
+    if preview_server:
         preview_server.stop_server()
+        preview_server.shutdown_background_server()
 
     clear_preview_shortcut_keymap()
+
+    for handler_name, handler in _APP_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_name)
+        if handler in handlers:
+            handlers.remove(handler)
     
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
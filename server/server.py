@@ -1,59 +1,1558 @@
 #!/usr/bin/env python3
 """
 Simple HTTP server for serving Blender Web Preview files.
-Usage: python server.py [port] [directory]
+Usage: python server.py port directory [--static DIR ...] [--engine threaded|asyncio]
+                        [--telemetry-log FILE]
+                        [--sessions [--quota-mb MB] [--idle-timeout S] [--linger S]]
+
+The directory holds the per-scene files written by the add-on (scene.glb,
+scene_info.json, ...). Each --static directory is layered underneath it, so
+the Vite bundle can be served in place from the add-on instead of being
+copied next to the scene on every refresh.
+
+With --sessions the directory is instead a root for many preview sessions,
+one per Blender instance, served under /s/<id>/. Blender instances register
+and release their session through the localhost-only control API
+(GET /__control, POST /__control/register|ping|unregister). Sessions idle for
+longer than --idle-timeout are removed. While their directories together
+exceed --quota-mb, the least recently used sessions without open viewers are
+removed too. With --linger the server exits once no session has been
+registered for that many seconds.
+
+Viewers subscribe to GET /events (Server-Sent Events); the add-on POSTs to
+/__reload from localhost after each export so open tabs hot-swap the model.
+GET /metrics returns request counts, bytes served, a latency histogram and
+the stage timings of the last export as JSON. Viewers POST frame-time
+summaries to /__telemetry; with --telemetry-log they are appended to a JSONL
+file so regressions can be tracked per scene over time. The server listens
+on all interfaces, so any client on the LAN may post; the log is therefore
+rotated to FILE.1 once it passes 16 MB.
+
+The add-on writes each export into gen/<n>/ inside the scene directory and
+publishes it by atomically replacing generation.json. Requests are served
+from the generation the pointer names when they arrive, so a refresh never
+exposes half-written files. Responses name their generation in an
+X-Generation header; a viewer that loaded a manifest from generation n
+requests the files it lists with ?g=n and gets them from that generation,
+even if a newer one was published in between. Superseded generations are
+deleted once no response is reading from them and a short grace period has
+passed. Directories without generation.json are served as they are.
+
+BackgroundServer runs the same server on threads of another process (the
+add-on's in-process mode); set_log_handler() redirects its log lines.
+
+Static files are served with ETag revalidation, immutable caching for
+content-hashed Vite assets, precompressed .br/.gz siblings, byte ranges and
+zero-copy socket.sendfile transfers.
 """
 
-import sys
+import argparse
+import asyncio
+import json
+import mimetypes
 import os
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import queue
+import re
+import secrets
+import shutil
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
 import socketserver
+from urllib.parse import parse_qs, unquote, urlsplit
+
+INDEX_FILES = ("index.html", "index.htm")
+EVENTS_PATH = "/events"
+RELOAD_PATH = "/__reload"
+METRICS_PATH = "/metrics"
+TELEMETRY_PATH = "/__telemetry"
+CONTROL_PATH = "/__control"
+SESSION_PREFIX = "/s/"
+MAX_TELEMETRY_BYTES = 64 * 1024
+# The telemetry log keeps at most this much plus one rotated file.
+TELEMETRY_LOG_MAX_BYTES = 16 * 1024 * 1024
+MAX_CONTROL_BYTES = 16 * 1024
+JANITOR_INTERVAL_SECONDS = 30
+GENERATION_POINTER = "generation.json"
+GENERATIONS_DIRNAME = "gen"
+# Viewers fetch a chunk or LOD manifest first and then the files it lists
+# with ?g=<generation>; a superseded generation stays on disk this long so
+# those requests can still be served from it.
+GENERATION_GRACE_SECONDS = 30
+GENERATION_QUERY = "g"
+KEEPALIVE_SECONDS = 15
+LOCAL_ADDRESSES = {"127.0.0.1", "::1", "::ffff:127.0.0.1"}
+
+
+def _print_line(message):
+    # Flushed so a log file being followed by the add-on stays current.
+    print(message, flush=True)
+
+
+_log_handler = _print_line
+
+
+def set_log_handler(handler):
+    """Send log lines to ``handler(line)`` instead of stdout (None restores
+    printing), e.g. into a bounded buffer when running inside Blender."""
+    global _log_handler
+    _log_handler = handler or _print_line
+
+
+def log(message):
+    _log_handler(message)
+
+
+# ------------------------------------
+# Live reload events
+# ------------------------------------
+
+class EventBroadcaster:
+    """Fan out Server-Sent Events to every connected viewer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self, subscriber=None):
+        """Register a subscriber with a thread-safe ``put(message)`` method."""
+        if subscriber is None:
+            subscriber = queue.Queue()
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        message = (event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(message)
+        return len(subscribers)
+
+    def close(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(None)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+# ------------------------------------
+# Metrics
+# ------------------------------------
+
+# Upper bounds (milliseconds) of the latency histogram buckets.
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class ServerMetrics:
+    """Thread-safe request counters shared by both engines.
+
+    Event streams are long-lived and are not counted as requests. Viewer
+    telemetry reports are kept in memory (the latest one) and, when
+    ``telemetry_log`` is set, appended to that JSONL file, which is rotated
+    past ``TELEMETRY_LOG_MAX_BYTES`` since remote viewers can post too.
+    """
+
+    def __init__(self, telemetry_log=None):
+        self._lock = threading.Lock()
+        self.telemetry_log = telemetry_log
+        self.telemetry_reports = 0
+        self.last_telemetry = None
+        self.started = time.time()
+        self.requests = 0
+        self.by_status = {}
+        self.bytes_served = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_sum_ms = 0.0
+        self.last_export = None
+
+    def record(self, status, size, seconds):
+        latency_ms = seconds * 1000.0
+        bucket = len(LATENCY_BUCKETS_MS)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                bucket = index
+                break
+        with self._lock:
+            self.requests += 1
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+            self.bytes_served += size if isinstance(size, int) else 0
+            self.latency_counts[bucket] += 1
+            self.latency_sum_ms += latency_ms
+
+    def record_export(self, timings):
+        with self._lock:
+            self.last_export = timings
+
+    def record_telemetry(self, report, client, session=None):
+        entry = {
+            "received": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "client": client,
+            "last_export": session.last_export if session is not None else self.last_export,
+            "report": report,
+        }
+        if session is not None and session.id:
+            entry["session"] = {"id": session.id, "label": session.label}
+        with self._lock:
+            self.telemetry_reports += 1
+            self.last_telemetry = entry
+            if self.telemetry_log:
+                try:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.telemetry_log)), exist_ok=True)
+                    try:
+                        if os.path.getsize(self.telemetry_log) > TELEMETRY_LOG_MAX_BYTES:
+                            os.replace(self.telemetry_log, self.telemetry_log + ".1")
+                    except FileNotFoundError:
+                        pass
+                    with open(self.telemetry_log, "a", encoding="utf-8") as log_file:
+                        log_file.write(json.dumps(entry) + "\n")
+                except OSError as error:
+                    log(f"Could not write telemetry log: {error}")
+
+    def snapshot(self, sessions=None):
+        viewers = sessions.viewer_count() if sessions is not None else 0
+        with self._lock:
+            cumulative = 0
+            buckets = []
+            for bound, count in zip((*LATENCY_BUCKETS_MS, "+Inf"), self.latency_counts):
+                cumulative += count
+                buckets.append({"le": bound, "count": cumulative})
+            return {
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "requests": {
+                    "total": self.requests,
+                    "by_status": {str(status): count for status, count in sorted(self.by_status.items())},
+                },
+                "bytes_served": self.bytes_served,
+                "latency_ms": {
+                    "buckets": buckets,
+                    "count": self.requests,
+                    "sum": round(self.latency_sum_ms, 3),
+                },
+                "event_subscribers": viewers,
+                "sessions": sessions.session_count() if sessions is not None else 0,
+                "last_export": self.last_export,
+                "viewer_telemetry": {
+                    "reports": self.telemetry_reports,
+                    "last": self.last_telemetry,
+                },
+            }
+
+
+def encode_json(data):
+    return json.dumps(data).encode("utf-8")
+
+
+def parse_json_object(body):
+    """Return the decoded body, or None when it is not a JSON object."""
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def requested_generation(query):
+    """The ``?g=`` generation a viewer asks for, or None."""
+    values = parse_qs(query).get(GENERATION_QUERY)
+    if not values or not values[0].isdigit():
+        return None
+    return int(values[0])
+
+
+def generation_headers(generation):
+    if generation is None:
+        return []
+    return [("X-Generation", str(generation)), ("Access-Control-Expose-Headers", "X-Generation")]
+
+
+def parse_content_length(value):
+    """Return the Content-Length header as an int, or None when malformed."""
+    if value is None or not value.strip():
+        return 0
+    try:
+        length = int(value.strip())
+    except ValueError:
+        return None
+    return length if length >= 0 else None
+
+
+# ------------------------------------
+# Sessions
+# ------------------------------------
+
+SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+
+
+class Session:
+    """One scene directory layered over the static roots, with its own
+    reload events. Single-directory servers have one implicit session."""
+
+    def __init__(self, session_id, directory, static_dirs, label="", owner_pid=None):
+        self.id = session_id
+        self.directory = os.path.abspath(directory) if directory else None
+        self.static_dirs = list(static_dirs)
+        self.document_roots = [root for root in (self.directory, *static_dirs) if root]
+        self.label = label
+        self.owner_pid = owner_pid
+        self.events = EventBroadcaster()
+        self.created = self.last_seen = time.time()
+        self.last_export = None
+        self.generation = None
+        self._generation_lock = threading.Lock()
+        self._pointer_stamp = None
+        self._in_flight = {}
+        self._retired = {}
+        self._removing = set()
+
+    def disk_usage(self):
+        # Generations hardlink unchanged files; count each inode once.
+        total = 0
+        seen = set()
+        for dirpath, _dirnames, filenames in os.walk(self.directory or ""):
+            for name in filenames:
+                try:
+                    stat_result = os.lstat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                if (stat_result.st_dev, stat_result.st_ino) not in seen:
+                    seen.add((stat_result.st_dev, stat_result.st_ino))
+                    total += stat_result.st_size
+        return total
+
+    def _read_generation(self):
+        """Follow ``generation.json``; call with the generation lock held.
+
+        Returns None for directories written without generations.
+        """
+        if self.directory is None:
+            return None
+        pointer = os.path.join(self.directory, GENERATION_POINTER)
+        try:
+            stat_result = os.stat(pointer)
+        except OSError:
+            return None
+        stamp = (stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+        if stamp == self._pointer_stamp:
+            return self.generation
+        try:
+            with open(pointer, "r", encoding="utf-8") as handle:
+                generation = int(json.load(handle)["generation"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return self.generation
+        self._pointer_stamp = stamp
+        if generation != self.generation:
+            if self.generation is not None:
+                self._retired[self.generation] = time.time()
+            self.generation = generation
+        return generation
+
+    def _generation_root(self, generation):
+        return os.path.join(self.directory, GENERATIONS_DIRNAME, str(generation))
+
+    @contextmanager
+    def pinned_roots(self, requested=None):
+        """Yield ``(document_roots, generation)`` and keep that generation on
+        disk until the caller is done serving from it.
+
+        ``requested`` names an earlier generation a viewer is still loading
+        from; it is used while it exists, otherwise the published one is.
+        ``generation`` is None for directories written without generations.
+        """
+        with self._generation_lock:
+            generation = self._read_generation()
+            if (
+                generation is not None
+                and requested is not None
+                and requested < generation
+                and requested not in self._removing
+                and os.path.isdir(self._generation_root(requested))
+            ):
+                generation = requested
+            if generation is not None:
+                self._in_flight[generation] = self._in_flight.get(generation, 0) + 1
+        if generation is None:
+            yield self.document_roots, None
+            return
+        try:
+            yield [self._generation_root(generation), *self.static_dirs], generation
+        finally:
+            with self._generation_lock:
+                self._in_flight[generation] -= 1
+                if not self._in_flight[generation]:
+                    del self._in_flight[generation]
+
+    def collect_generations(self):
+        """Delete superseded generations that no response is reading from.
+
+        Generations newer than the published one are exports still being
+        written and are left alone. Returns the generations removed.
+        """
+        if self.directory is None:
+            return []
+        generations_dir = os.path.join(self.directory, GENERATIONS_DIRNAME)
+        try:
+            names = os.listdir(generations_dir)
+        except OSError:
+            return []
+        now = time.time()
+        candidates = []
+        with self._generation_lock:
+            current = self._read_generation()
+            if current is None:
+                return []
+            for name in names:
+                if not name.isdigit() or int(name) >= current:
+                    continue
+                generation = int(name)
+                retired = self._retired.setdefault(generation, now)
+                if not self._in_flight.get(generation) and now - retired >= GENERATION_GRACE_SECONDS:
+                    candidates.append(generation)
+            # No request may pin these while they are being deleted.
+            self._removing.update(candidates)
+        removed = []
+        for generation in candidates:
+            path = os.path.join(generations_dir, str(generation))
+            # On Windows files still open elsewhere survive; retry next time.
+            shutil.rmtree(path, ignore_errors=True)
+            with self._generation_lock:
+                self._removing.discard(generation)
+                if not os.path.exists(path):
+                    self._retired.pop(generation, None)
+                    removed.append(generation)
+        return removed
+
+    def describe(self, include_usage=False):
+        info = {
+            "id": self.id,
+            "label": self.label,
+            "owner_pid": self.owner_pid,
+            "path": f"{SESSION_PREFIX}{self.id}/",
+            "directory": self.directory,
+            "viewers": self.events.subscriber_count,
+            "generation": self.generation,
+            "created": round(self.created, 3),
+            "idle_seconds": round(time.time() - self.last_seen, 3),
+        }
+        if include_usage:
+            info["disk_bytes"] = self.disk_usage()
+        return info
+
+
+class SessionRegistry:
+    """Maps request paths onto sessions and evicts idle ones.
+
+    Without ``multi`` every path belongs to one fixed session rooted at
+    ``directory``. With ``multi`` sessions live in subdirectories of
+    ``directory`` and are addressed as ``/s/<id>/``; other paths only see the
+    static layers (the Vite bundle's /assets). Sessions are kept in least
+    recently used order: every request and control ping moves a session to
+    the end.
+    """
+
+    def __init__(self, directory, static_dirs, multi=False, quota_bytes=0, idle_seconds=0):
+        self.multi = multi
+        self.static_dirs = [os.path.abspath(root) for root in static_dirs]
+        self.quota_bytes = quota_bytes
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._empty_since = time.time()
+        self._janitor_stop = threading.Event()
+        if multi:
+            self.root = os.path.abspath(directory)
+            os.makedirs(self.root, exist_ok=True)
+            self.default = Session(None, None, self.static_dirs)
+        else:
+            self.root = None
+            self.default = Session(None, directory, self.static_dirs)
+
+    def session_count(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def viewer_count(self):
+        with self._lock:
+            sessions = [self.default, *self._sessions.values()]
+        return sum(session.events.subscriber_count for session in sessions)
+
+    def route(self, url_path):
+        """Split ``url_path`` into ``(session, path, redirect)``.
+
+        ``session`` is None for unknown session ids; ``redirect`` is a URL to
+        send the client to instead (``/s/<id>`` without its trailing slash,
+        or ``/`` to the most recently used session).
+        """
+        if not self.multi:
+            return self.default, url_path, None
+        if url_path == "/":
+            with self._lock:
+                latest = next(reversed(self._sessions), None)
+            if latest:
+                return None, None, f"{SESSION_PREFIX}{latest}/"
+            return self.default, url_path, None
+        if not url_path.startswith(SESSION_PREFIX):
+            return self.default, url_path, None
+        session_id, slash, rest = url_path[len(SESSION_PREFIX):].partition("/")
+        session = self.get(session_id)
+        if session is None:
+            return None, None, None
+        if not slash:
+            return session, None, f"{SESSION_PREFIX}{session_id}/"
+        return session, "/" + rest, None
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return None
+            self._sessions[session_id] = session
+        session.last_seen = time.time()
+        return session
+
+    def register(self, label="", owner_pid=None):
+        session_id = secrets.token_hex(6)
+        directory = os.path.join(self.root, session_id)
+        os.makedirs(directory, exist_ok=True)
+        session = Session(session_id, directory, self.static_dirs, label, owner_pid)
+        with self._lock:
+            self._sessions[session_id] = session
+        log(f"Session {session_id} registered ({label or 'unnamed'})")
+        return session
+
+    def unregister(self, session_id, reason="unregistered"):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if not self._sessions:
+                self._empty_since = time.time()
+        if session is None:
+            return False
+        session.events.close()
+        shutil.rmtree(session.directory, ignore_errors=True)
+        log(f"Session {session_id} {reason}")
+        return True
+
+    def evict(self, keep=None):
+        """Remove idle sessions, then least recently used ones over quota.
+
+        Sessions with connected viewers and ``keep`` are never evicted.
+        Returns the ids that were removed.
+        """
+        now = time.time()
+        with self._lock:
+            sessions = list(self._sessions.values())
+        evicted = []
+        if self.idle_seconds:
+            for session in sessions:
+                if (session.id != keep and not session.events.subscriber_count
+                        and now - session.last_seen > self.idle_seconds):
+                    self.unregister(session.id, "evicted (idle)")
+                    evicted.append(session.id)
+        if self.quota_bytes:
+            remaining = [session for session in sessions if session.id not in evicted]
+            usage = {session.id: session.disk_usage() for session in remaining}
+            total = sum(usage.values())
+            for session in remaining:
+                if total <= self.quota_bytes:
+                    break
+                if session.id == keep or session.events.subscriber_count:
+                    continue
+                self.unregister(session.id, "evicted (disk quota)")
+                evicted.append(session.id)
+                total -= usage[session.id]
+        return evicted
+
+    def describe(self, include_usage=False):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "server": "blendXweb2",
+            "mode": "sessions" if self.multi else "single",
+            "root": self.root,
+            "quota_bytes": self.quota_bytes,
+            "idle_seconds": self.idle_seconds,
+            "sessions": [session.describe(include_usage) for session in sessions],
+        }
+
+    def start_janitor(self, linger_seconds=0, on_linger_expired=None):
+        """Periodically collect old generations and evict idle sessions;
+        call ``on_linger_expired`` once the registry has been empty for
+        ``linger_seconds``."""
+        def run():
+            while not self._janitor_stop.wait(JANITOR_INTERVAL_SECONDS):
+                with self._lock:
+                    sessions = [self.default, *self._sessions.values()]
+                for session in sessions:
+                    session.collect_generations()
+                if not self.multi:
+                    continue
+                self.evict()
+                with self._lock:
+                    empty_for = time.time() - self._empty_since if not self._sessions else 0
+                if linger_seconds and on_linger_expired and empty_for > linger_seconds:
+                    log(f"No sessions for {int(empty_for)}s, shutting down")
+                    on_linger_expired()
+                    return
+
+        threading.Thread(target=run, name="session-janitor", daemon=True).start()
+
+    def close(self):
+        self._janitor_stop.set()
+        with self._lock:
+            sessions = [self.default, *self._sessions.values()]
+        for session in sessions:
+            session.events.close()
+
+
+def handle_control(sessions, method, url_path, body, client):
+    """Answer a control API request; returns ``(status, json_data)``."""
+    if client not in LOCAL_ADDRESSES:
+        return 403, {"error": "The control API is only available from localhost"}
+    action = url_path[len(CONTROL_PATH):].strip("/")
+    if method == "GET" and not action:
+        return 200, sessions.describe(include_usage=True)
+    if method != "POST":
+        return 405, {"error": "Method not allowed"}
+    if not sessions.multi:
+        return 409, {"error": "This server serves a single directory; start it with --sessions"}
+    payload = parse_json_object(body)
+    if payload is None:
+        return 400, {"error": "Invalid JSON body"}
+
+    if action == "register":
+        owner_pid = payload.get("pid")
+        session = sessions.register(
+            str(payload.get("label") or "")[:200],
+            owner_pid if isinstance(owner_pid, int) else None,
+        )
+        sessions.evict(keep=session.id)
+        return 200, session.describe()
+
+    session_id = str(payload.get("id") or "")
+    if not SESSION_ID_PATTERN.match(session_id):
+        return 400, {"error": "Missing or malformed session id"}
+    if action == "ping":
+        session = sessions.get(session_id)
+        if session is None:
+            return 404, {"error": "Unknown session"}
+        return 200, session.describe()
+    if action == "unregister":
+        return 200, {"removed": sessions.unregister(session_id)}
+    return 404, {"error": "Unknown control action"}
+
+
+def publish_reload(sessions, metrics, session, payload):
+    """Forward an export notification to the session's viewers."""
+    if payload.get("timings"):
+        metrics.record_export(payload["timings"])
+        session.last_export = payload["timings"]
+    delivered = session.events.publish("reload", payload)
+    # A fresh export is the usual reason to go over quota.
+    session.collect_generations()
+    sessions.evict(keep=session.id)
+    return delivered
+
+
+# ------------------------------------
+# Static file resolution
+# ------------------------------------
+
+mimetypes.add_type("application/wasm", ".wasm")
+mimetypes.add_type("model/gltf-binary", ".glb")
+mimetypes.add_type("model/gltf+json", ".gltf")
+mimetypes.add_type("text/javascript", ".js")
+mimetypes.add_type("text/javascript", ".mjs")
+
+# Vite emits assets as name-<hash>.ext; those never change for a given URL.
+HASHED_ASSET_PATTERN = re.compile(r"(^|/)assets/[^/]+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def locate_file(document_roots, url_path):
+    """Map a URL path onto the first document root that contains it.
+
+    Directories resolve to their index page. Returns None when no layer has a
+    matching file; path components such as ``..`` are discarded.
+    """
+    words = [word for word in unquote(url_path).split("/") if word and word not in (".", "..")]
+    if any(os.sep in word or (os.altsep and os.altsep in word) for word in words):
+        return None
+
+    for root in document_roots:
+        candidate = os.path.join(root, *words)
+        if os.path.isdir(candidate):
+            for name in INDEX_FILES:
+                index = os.path.join(candidate, name)
+                if os.path.isfile(index):
+                    return index
+            continue
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def file_etag(stat_result, suffix=""):
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}{suffix}"'
+
+
+def etag_matches(header_value, etag):
+    if not header_value:
+        return False
+    if header_value.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header_value.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def parse_byte_range(header_value, size):
+    """Parse a single ``bytes=`` range. Returns (start, end) inclusive,
+    None when the header should be ignored, or False when unsatisfiable."""
+    match = RANGE_PATTERN.match((header_value or "").strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
 
-def run_server(port, directory):
+def accepted_encodings(header_value):
+    encodings = set()
+    for part in (header_value or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class FileResponse:
+    """Everything needed to answer a GET/HEAD for a static file."""
+
+    __slots__ = ("status", "headers", "path", "offset", "length")
+
+    def __init__(self, status, headers, path=None, offset=0, length=0):
+        self.status = status
+        self.headers = headers
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+
+def prepare_file_response(document_roots, url_path, get_header):
+    """Resolve a request for a static file into a ``FileResponse``.
+
+    Handles the layered document roots, ETag/If-None-Match revalidation,
+    immutable caching of hashed Vite assets, precompressed ``.br``/``.gz``
+    siblings written at export time, and single byte-range requests.
+    ``get_header`` is a case-insensitive header lookup so both server engines
+    can share this code. Returns None when the file does not exist.
+    """
+    path = locate_file(document_roots, url_path)
+    if path is None:
+        return None
+
+    stat_result = os.stat(path)
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    relative = url_path.lstrip("/")
+    cache_control = (
+        IMMUTABLE_CACHE_CONTROL if HASHED_ASSET_PATTERN.search(relative) else REVALIDATE_CACHE_CONTROL
+    )
+    headers = [
+        ("Content-Type", content_type),
+        ("Cache-Control", cache_control),
+        ("Accept-Ranges", "bytes"),
+        ("Vary", "Accept-Encoding"),
+        ("Last-Modified", formatdate(stat_result.st_mtime, usegmt=True)),
+    ]
+
+    range_header = get_header("Range")
+    serve_path = path
+    serve_stat = stat_result
+    etag_suffix = ""
+    if not range_header:
+        encodings = accepted_encodings(get_header("Accept-Encoding"))
+        for encoding, extension in PRECOMPRESSED_ENCODINGS:
+            if encoding not in encodings:
+                continue
+            try:
+                sibling_stat = os.stat(path + extension)
+            except OSError:
+                continue
+            if sibling_stat.st_mtime_ns >= stat_result.st_mtime_ns:
+                serve_path, serve_stat, etag_suffix = path + extension, sibling_stat, f"-{encoding}"
+                headers.append(("Content-Encoding", encoding))
+                # Content-Length is the compressed size; viewers show
+                # download progress against the decoded size.
+                headers.append(("X-Uncompressed-Length", str(stat_result.st_size)))
+                headers.append(("Access-Control-Expose-Headers", "X-Uncompressed-Length"))
+                break
+
+    etag = file_etag(stat_result, etag_suffix)
+    headers.append(("ETag", etag))
+
+    if etag_matches(get_header("If-None-Match"), etag):
+        return FileResponse(304, headers)
+
+    size = serve_stat.st_size
+    if range_header:
+        if_range = get_header("If-Range")
+        byte_range = parse_byte_range(range_header, size) if not if_range or if_range == etag else None
+        if byte_range is False:
+            headers.append(("Content-Range", f"bytes */{size}"))
+            headers.append(("Content-Length", "0"))
+            return FileResponse(416, headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+            headers.append(("Content-Length", str(end - start + 1)))
+            return FileResponse(206, headers, serve_path, start, end - start + 1)
+
+    headers.append(("Content-Length", str(size)))
+    return FileResponse(200, headers, serve_path, 0, size)
+
+
+# ------------------------------------
+# Threaded engine
+# ------------------------------------
+
+class QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "blendXweb2"
+
+    def log_message(self, format, *args):
+        # Minimal logging to keep console clean
+        log(f"HTTP: {format % args}")
+
+    def handle_one_request(self):
+        self._status = None
+        self._bytes_sent = 0
+        self._started = time.perf_counter()
+        super().handle_one_request()
+        if self._status is not None:
+            self.server.metrics.record(self._status, self._bytes_sent, time.perf_counter() - self._started)
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def send_json(self, data, status=200):
+        body = encode_json(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+            self._bytes_sent = len(body)
+
+    def send_redirect(self, location):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def read_body(self, limit):
+        """Read the request body, or answer 400/413 and return None."""
+        length = parse_content_length(self.headers.get("Content-Length"))
+        if length is None:
+            self.send_error(400, "Malformed Content-Length")
+            self.close_connection = True
+            return None
+        if length > limit:
+            self.send_error(413, "Request body too large")
+            self.close_connection = True
+            return None
+        return self.rfile.read(length)
+
+    def route(self, url_path):
+        """Resolve the session for ``url_path`` or answer the request."""
+        session, path, redirect = self.server.sessions.route(url_path)
+        if redirect:
+            self.send_redirect(redirect)
+            return None, None
+        if session is None:
+            self.send_error(404, "Unknown preview session")
+            return None, None
+        return session, path
+
+    def do_GET(self):
+        url_path = urlsplit(self.path).path
+        if url_path == METRICS_PATH:
+            self.send_json(self.server.metrics.snapshot(self.server.sessions))
+            return
+        if url_path == CONTROL_PATH or url_path.startswith(CONTROL_PATH + "/"):
+            self.control(b"")
+            return
+        session, path = self.route(url_path)
+        if session is None:
+            return
+        if path == EVENTS_PATH:
+            self.stream_events(session)
+            return
+        self.serve_file(session, path, send_body=True)
+
+    def do_HEAD(self):
+        url_path = urlsplit(self.path).path
+        if url_path == METRICS_PATH:
+            self.send_json(self.server.metrics.snapshot(self.server.sessions))
+            return
+        if url_path == CONTROL_PATH or url_path.startswith(CONTROL_PATH + "/"):
+            self.control(b"")
+            return
+        session, path = self.route(url_path)
+        if session is not None:
+            self.serve_file(session, path, send_body=False)
+
+    def serve_file(self, session, url_path, send_body):
+        requested = requested_generation(urlsplit(self.path).query)
+        with session.pinned_roots(requested) as (document_roots, generation):
+            self._serve_file(document_roots, generation, url_path, send_body)
+
+    def _serve_file(self, document_roots, generation, url_path, send_body):
+        try:
+            response = prepare_file_response(document_roots, url_path, self.headers.get)
+        except OSError:
+            response = None
+        if response is None:
+            self.send_error(404, "File not found")
+            return
+        response.headers.extend(generation_headers(generation))
+
+        self.send_response(response.status)
+        for name, value in response.headers:
+            self.send_header(name, value)
+        self.end_headers()
+
+        if not send_body or response.path is None or not response.length:
+            return
+        try:
+            with open(response.path, "rb") as source:
+                self.wfile.flush()
+                # socket.sendfile uses os.sendfile (zero-copy) where available
+                # and falls back to a send() loop elsewhere.
+                self._bytes_sent = self.connection.sendfile(source, response.offset, response.length)
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            self.close_connection = True
+
+    def do_POST(self):
+        url_path = urlsplit(self.path).path
+        if url_path == CONTROL_PATH or url_path.startswith(CONTROL_PATH + "/"):
+            body = self.read_body(MAX_CONTROL_BYTES)
+            if body is not None:
+                self.control(body)
+            return
+        session, path = self.route(url_path)
+        if session is None:
+            return
+        if path == TELEMETRY_PATH:
+            self.receive_telemetry(session)
+            return
+        if path != RELOAD_PATH:
+            self.send_error(404, "Not found")
+            return
+        if self.client_address[0] not in LOCAL_ADDRESSES:
+            self.send_error(403, "Reload notifications are only accepted from localhost")
+            return
+
+        body = self.read_body(MAX_BODY_BYTES)
+        if body is None:
+            return
+        payload = parse_json_object(body)
+        if payload is None:
+            self.send_error(400, "Invalid JSON body")
+            return
+
+        delivered = publish_reload(self.server.sessions, self.server.metrics, session, payload)
+        self.send_json({"delivered": delivered})
+
+    def control(self, body):
+        method = self.command
+        status, data = handle_control(
+            self.server.sessions, method, urlsplit(self.path).path, body, self.client_address[0]
+        )
+        self.send_json(data, status)
+
+    def receive_telemetry(self, session):
+        body = self.read_body(MAX_TELEMETRY_BYTES)
+        if body is None:
+            return
+        report = parse_json_object(body)
+        if report is None:
+            self.send_error(400, "Invalid JSON body")
+            return
+        self.server.metrics.record_telemetry(report, self.client_address[0], session)
+        self.send_json({"stored": True})
+
+    def stream_events(self, session):
+        """Hold the connection open and forward broadcast events as SSE."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        # Long-lived streams would skew the latency histogram.
+        self._status = None
+        subscriber = session.events.subscribe()
+        try:
+            self.wfile.write(b"retry: 2000\n\n")
+            self.wfile.flush()
+            while True:
+                try:
+                    message = subscriber.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                if message is None:
+                    break
+                self.wfile.write(format_sse(*message))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            session.events.unsubscribe(subscriber)
+
+    def end_headers(self):
+        # Add CORS headers to allow loading from any origin
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, HEAD, POST')
+        super().end_headers()
+
+
+class ThreadedHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """Handle requests in a separate thread."""
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, sessions, telemetry_log=None):
+        self.sessions = sessions
+        self.metrics = ServerMetrics(telemetry_log)
+        super().__init__(server_address, handler_class)
+
+    def server_close(self):
+        self.sessions.close()
+        super().server_close()
+
+
+# ------------------------------------
+# Asyncio engine
+# ------------------------------------
+
+MAX_HEADER_LINE = 64 * 1024
+MAX_HEADERS = 100
+MAX_BODY_BYTES = 1024 * 1024
+SHUTDOWN_GRACE_SECONDS = 5
+
+
+class _LoopQueue:
+    """Queue-like subscriber that hands messages to an asyncio loop safely."""
+
+    def __init__(self, loop):
+        self._loop = loop
+        self.queue = asyncio.Queue()
+
+    def put(self, message):
+        self._loop.call_soon_threadsafe(self.queue.put_nowait, message)
+
+
+class _BadRequest(Exception):
+    """A request the asyncio engine answers with ``status`` and closes."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class AsyncPreviewServer:
+    """Single-threaded asyncio server with the same routes as QuietHandler.
+
+    Connections are kept alive between requests, at most ``max_concurrency``
+    requests are processed at once (long-lived /events streams do not count),
+    and shutdown stops accepting, ends event streams and gives in-flight
+    requests a grace period before cancelling them.
+    """
+
+    def __init__(self, sessions, max_concurrency=64, keepalive_timeout=KEEPALIVE_SECONDS,
+                 telemetry_log=None):
+        self.sessions = sessions
+        self.metrics = ServerMetrics(telemetry_log)
+        self.keepalive_timeout = keepalive_timeout
+        self.max_concurrency = max_concurrency
+        self._limiter = None
+        self._server = None
+        self._connections = set()
+        self._stopping = None
+        self._loop = None
+        # Set once the listening socket is bound (see BackgroundServer).
+        self.listening = threading.Event()
+
+    async def serve(self, host, port):
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._limiter = asyncio.Semaphore(self.max_concurrency)
+        self._stopping = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self._handle_connection, host or None, port, limit=MAX_HEADER_LINE
+        )
+        self.listening.set()
+        for signame in ("SIGINT", "SIGTERM"):
+            try:
+                loop.add_signal_handler(getattr(signal, signame), self._stopping.set)
+            except (NotImplementedError, AttributeError, RuntimeError, ValueError):
+                # Windows event loops and non-main threads cannot install handlers.
+                pass
+        async with self._server:
+            await self._stopping.wait()
+            await self._shutdown()
+
+    def request_stop(self):
+        """Stop serving; safe to call from any thread."""
+        if self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def _shutdown(self):
+        self._server.close()
+        self.sessions.close()
+        pending = [task for task in self._connections if not task.done()]
+        if pending:
+            _done, still_running = await asyncio.wait(pending, timeout=SHUTDOWN_GRACE_SECONDS)
+            for task in still_running:
+                task.cancel()
+        await self._server.wait_closed()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        peer = writer.get_extra_info("peername") or ("", 0)
+        try:
+            while not self._stopping.is_set():
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.keepalive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except _BadRequest as error:
+                    await self._send_error(writer, error.status, str(error), keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, target, version, headers, body = request
+                keep_alive = self._wants_keep_alive(version, headers)
+                url_path, query = urlsplit(target)[2:4]
+                request_line = f"{method} {target} {version}"
+
+                if method == "GET":
+                    session, path, redirect = self.sessions.route(url_path)
+                    if session is not None and not redirect and path == EVENTS_PATH:
+                        await self._stream_events(writer, request_line, session)
+                        break
+
+                started = time.perf_counter()
+                async with self._limiter:
+                    keep_alive = await self._dispatch(
+                        writer, method, url_path, headers, body, peer, keep_alive, request_line, started,
+                        requested_generation(query),
+                    )
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").strip().split(" ", 2)
+        except ValueError:
+            raise _BadRequest("Malformed request line")
+        if not version.startswith("HTTP/1."):
+            raise _BadRequest("Unsupported HTTP version")
+
+        headers = {}
+        for _ in range(MAX_HEADERS + 1):
+            raw = await reader.readline()
+            if raw in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = raw.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise _BadRequest("Too many headers")
+
+        length = parse_content_length(headers.get("content-length"))
+        if length is None:
+            raise _BadRequest("Malformed Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise _BadRequest("Request body too large", 413)
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, version, headers, body
+
+    @staticmethod
+    def _wants_keep_alive(version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    @staticmethod
+    def _head(status, headers, keep_alive):
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines.append("Server: blendXweb2")
+        lines.append(f"Date: {formatdate(usegmt=True)}")
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        lines.append("Access-Control-Allow-Origin: *")
+        lines.append("Access-Control-Allow-Methods: GET, HEAD, POST")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def _complete(self, request_line, status, size, started):
+        log_request(request_line, status, size)
+        self.metrics.record(status, size, time.perf_counter() - started if started else 0.0)
+
+    async def _send_error(self, writer, status, message, keep_alive=True, request_line="-", started=None):
+        body = f"{status} {message}\n".encode("utf-8")
+        writer.write(self._head(status, [
+            ("Content-Type", "text/plain; charset=utf-8"),
+            ("Content-Length", str(len(body))),
+            ("Cache-Control", "no-store"),
+        ], keep_alive) + body)
+        await writer.drain()
+        self._complete(request_line, status, len(body), started)
+        return keep_alive
+
+    async def _send_redirect(self, writer, location, keep_alive, request_line, started):
+        writer.write(self._head(302, [("Location", location), ("Content-Length", "0")], keep_alive))
+        await writer.drain()
+        self._complete(request_line, 302, 0, started)
+        return keep_alive
+
+    async def _send_json(self, writer, data, keep_alive, request_line, started, status=200, send_body=True):
+        response_body = encode_json(data)
+        writer.write(self._head(status, [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(response_body))),
+            ("Cache-Control", "no-store"),
+        ], keep_alive) + (response_body if send_body else b""))
+        await writer.drain()
+        self._complete(request_line, status, len(response_body) if send_body else "-", started)
+        return keep_alive
+
+    async def _dispatch(
+        self, writer, method, url_path, headers, body, peer, keep_alive, request_line, started, generation=None
+    ):
+        if url_path == CONTROL_PATH or url_path.startswith(CONTROL_PATH + "/"):
+            if len(body) > MAX_CONTROL_BYTES:
+                return await self._send_error(writer, 413, "Request body too large", keep_alive, request_line, started)
+            status, data = handle_control(self.sessions, method, url_path, body, peer[0])
+            return await self._send_json(
+                writer, data, keep_alive, request_line, started, status, send_body=method != "HEAD"
+            )
+
+        if method in ("GET", "HEAD") and url_path == METRICS_PATH:
+            return await self._send_json(
+                writer, self.metrics.snapshot(self.sessions), keep_alive, request_line, started,
+                send_body=method == "GET",
+            )
+
+        session, path, redirect = self.sessions.route(url_path)
+        if redirect:
+            return await self._send_redirect(writer, redirect, keep_alive, request_line, started)
+        if session is None:
+            return await self._send_error(writer, 404, "Unknown preview session", keep_alive, request_line, started)
+
+        if method == "POST":
+            if path == TELEMETRY_PATH:
+                if len(body) > MAX_TELEMETRY_BYTES:
+                    return await self._send_error(
+                        writer, 413, "Request body too large", keep_alive, request_line, started
+                    )
+                report = parse_json_object(body)
+                if report is None:
+                    return await self._send_error(writer, 400, "Invalid JSON body", keep_alive, request_line, started)
+                self.metrics.record_telemetry(report, peer[0], session)
+                return await self._send_json(writer, {"stored": True}, keep_alive, request_line, started)
+            if path != RELOAD_PATH:
+                return await self._send_error(writer, 404, "Not found", keep_alive, request_line, started)
+            if peer[0] not in LOCAL_ADDRESSES:
+                return await self._send_error(
+                    writer, 403, "Reload notifications are only accepted from localhost",
+                    keep_alive, request_line, started,
+                )
+            payload = parse_json_object(body)
+            if payload is None:
+                return await self._send_error(writer, 400, "Invalid JSON body", keep_alive, request_line, started)
+            delivered = publish_reload(self.sessions, self.metrics, session, payload)
+            return await self._send_json(writer, {"delivered": delivered}, keep_alive, request_line, started)
+
+        if method not in ("GET", "HEAD"):
+            return await self._send_error(writer, 405, "Method not allowed", keep_alive, request_line, started)
+
+        with session.pinned_roots(generation) as (document_roots, served_generation):
+            try:
+                response = prepare_file_response(document_roots, path, lambda name: headers.get(name.lower()))
+            except OSError:
+                response = None
+            if response is None:
+                return await self._send_error(writer, 404, "File not found", keep_alive, request_line, started)
+            response.headers.extend(generation_headers(served_generation))
+
+            writer.write(self._head(response.status, response.headers, keep_alive))
+            await writer.drain()
+            if method == "GET" and response.path is not None and response.length:
+                loop = asyncio.get_running_loop()
+                with open(response.path, "rb") as source:
+                    await loop.sendfile(writer.transport, source, response.offset, response.length)
+        self._complete(request_line, response.status, response.length if method == "GET" else "-", started)
+        return keep_alive
+
+    async def _stream_events(self, writer, request_line, session):
+        writer.write(self._head(200, [
+            ("Content-Type", "text/event-stream"),
+            ("Cache-Control", "no-store"),
+        ], keep_alive=False) + b"retry: 2000\n\n")
+        await writer.drain()
+        log_request(request_line, 200, "-")
+
+        subscriber = _LoopQueue(asyncio.get_running_loop())
+        session.events.subscribe(subscriber)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                    await writer.drain()
+                    continue
+                if message is None:
+                    break
+                writer.write(format_sse(*message))
+                await writer.drain()
+        finally:
+            session.events.unsubscribe(subscriber)
+
+
+def log_request(request_line, status, size):
+    log(f'HTTP: "{request_line}" {status} {size}')
+
+
+# ------------------------------------
+# Entry point
+# ------------------------------------
+
+ENGINES = ("threaded", "asyncio")
+
+
+def run_server(port, directory, static_dirs=(), engine="threaded", max_concurrency=64, telemetry_log=None,
+               sessions=False, quota_bytes=0, idle_seconds=0, linger_seconds=0):
     """Run a simple HTTP server on the specified port and directory"""
-    
-    # Change to the specified directory
-    os.chdir(directory)
-    
-    # Create a request handler that logs minimally
-    class QuietHandler(SimpleHTTPRequestHandler):
-        def log_message(self, format, *args):
-            # Minimal logging to keep console clean
-            print(f"HTTP: {format % args}")
-            
-        def end_headers(self):
-            # Add CORS headers to allow loading from any origin
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET')
-            self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-            super().end_headers()
-    
-    # Create a threaded HTTP server
-    class ThreadedHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
-        """Handle requests in a separate thread."""
-        daemon_threads = True
-    
+    registry = SessionRegistry(directory, static_dirs, sessions, quota_bytes, idle_seconds)
+
+    log(f"Server started at http://localhost:{port} ({engine} engine)")
+    if sessions:
+        log(f"Serving sessions from: {directory}")
+    else:
+        log(f"Serving files from: {directory}")
+    for static_dir in static_dirs:
+        log(f"Serving static files from: {static_dir}")
+    log("Press Ctrl+C to stop")
+
+    if engine == "asyncio":
+        server = AsyncPreviewServer(
+            registry, max_concurrency=max_concurrency, telemetry_log=telemetry_log
+        )
+        registry.start_janitor(linger_seconds, server.request_stop)
+        try:
+            asyncio.run(server.serve("", port))
+        except KeyboardInterrupt:
+            pass
+        log("Server stopped.")
+        return
+
     # Create and start the server
-    server = ThreadedHTTPServer(("", port), QuietHandler)
-    print(f"Server started at http://localhost:{port}")
-    print(f"Serving files from: {directory}")
-    print("Press Ctrl+C to stop")
-    
+    server = ThreadedHTTPServer(("", port), QuietHandler, registry, telemetry_log)
+    registry.start_janitor(linger_seconds, server.shutdown)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
-        print("Server stopped.")
+        log("Server stopped.")
     finally:
         server.server_close()
 
+
+class BackgroundServer:
+    """Run a preview server on daemon threads of the calling process.
+
+    Used by the add-on to serve from inside Blender without launching an
+    interpreter. ``start`` raises when the port cannot be bound; ``stop``
+    ends event streams and waits for the serving thread.
+    """
+
+    def __init__(self, port, directory, static_dirs=(), engine="threaded", max_concurrency=64,
+                 telemetry_log=None, sessions=False, quota_bytes=0, idle_seconds=0):
+        self.port = port
+        self.engine = engine
+        self.max_concurrency = max_concurrency
+        self.telemetry_log = telemetry_log
+        self.sessions = SessionRegistry(directory, static_dirs, sessions, quota_bytes, idle_seconds)
+        self._server = None
+        self._thread = None
+        self._error = None
+
+    @property
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, timeout=5.0):
+        if self.engine == "asyncio":
+            self._server = AsyncPreviewServer(
+                self.sessions, max_concurrency=self.max_concurrency, telemetry_log=self.telemetry_log
+            )
+            self._thread = threading.Thread(target=self._run_asyncio, name="preview-server", daemon=True)
+            self._thread.start()
+            self._server.listening.wait(timeout)
+            if self._error is not None:
+                raise self._error
+            if not self._server.listening.is_set():
+                raise OSError(f"preview server did not start listening on port {self.port}")
+        else:
+            self._server = ThreadedHTTPServer(("", self.port), QuietHandler, self.sessions, self.telemetry_log)
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, args=(0.5,), name="preview-server", daemon=True
+            )
+            self._thread.start()
+        self.sessions.start_janitor()
+        log(f"Server started at http://localhost:{self.port} ({self.engine} engine, in process)")
+
+    def _run_asyncio(self):
+        try:
+            asyncio.run(self._server.serve("", self.port))
+        except BaseException as error:  # reported to start() when binding failed
+            self._error = error
+            self._server.listening.set()
+
+    def stop(self, timeout=SHUTDOWN_GRACE_SECONDS + 1):
+        if self._server is None:
+            return
+        if self.engine == "asyncio":
+            self._server.request_stop()
+        else:
+            self._server.shutdown()
+            self._server.server_close()
+        self._thread.join(timeout)
+        self._server = None
+        log("Server stopped.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Blender Web Preview files.")
+    parser.add_argument("port", type=int, help="port to listen on")
+    parser.add_argument(
+        "directory", help="directory with the per-scene files (with --sessions: root for session directories)"
+    )
+    parser.add_argument(
+        "--static",
+        dest="static_dirs",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="read-only directory layered below the scene directory (repeatable)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="threaded",
+        help="threaded: one thread per connection; asyncio: single event loop",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=64,
+        metavar="N",
+        help="asyncio engine: maximum number of requests processed at once",
+    )
+    parser.add_argument(
+        "--telemetry-log",
+        metavar="FILE",
+        help="append viewer telemetry reports to this JSONL file",
+    )
+    parser.add_argument(
+        "--sessions",
+        action="store_true",
+        help="serve many sessions under /s/<id>/, managed through the /__control API",
+    )
+    parser.add_argument(
+        "--quota-mb",
+        type=float,
+        default=0,
+        metavar="MB",
+        help="sessions: evict least recently used sessions while their files exceed this size (0: no quota)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="sessions: remove sessions without requests, pings or viewers for this long (0: never)",
+    )
+    parser.add_argument(
+        "--linger",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="sessions: exit after this long without any registered session (0: run until stopped)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    # Get command line arguments
-    if len(sys.argv) < 3:
-        print("Usage: python server.py [port] [directory]")
-        sys.exit(1)
-    
-    port = int(sys.argv[1])
-    directory = sys.argv[2]
-    
+    args = parse_args()
+
     # Run the server
-    run_server(port, directory)
\ No newline at end of file
+    run_server(
+        args.port, args.directory, args.static_dirs, args.engine, args.max_concurrency, args.telemetry_log,
+        sessions=args.sessions,
+        quota_bytes=int(args.quota_mb * 1024 * 1024),
+        idle_seconds=args.idle_timeout,
+        linger_seconds=args.linger,
+    )
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Export many .blend files to standalone web packages with a pool of headless
+Blender processes.
+Usage: python batch_export.py INPUT [INPUT ...] --output DIR [--blender PATH]
+                              [--jobs N] [--profile FINAL] [--report FILE] [--force]
+
+Each INPUT is a .blend file or a directory searched recursively. Every file is
+exported by its own `blender -b FILE --python batch_export.py -- --worker ...`
+process, which loads the add-on straight from this checkout and calls
+package_for_export(); the add-on does not need to be installed or enabled.
+
+Files whose content hash, profile and add-on source are unchanged since the
+last run (recorded in DIR/batch_state.json) are skipped while their package
+still exists. Only the .blend itself is hashed: edits to linked libraries or
+external textures need --force. A JSON report with per-file timings and sizes
+is written to DIR/batch_report.json (or --report).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+ADDON_ROOT = Path(__file__).resolve().parent.parent
+STATE_FILENAME = "batch_state.json"
+REPORT_FILENAME = "batch_report.json"
+RESULT_MARKER = "BLENDXWEB2_RESULT "
+PROFILES = ("FAST_PREVIEW", "BALANCED", "FINAL")
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def collect_blend_files(inputs):
+    files = []
+    for item in inputs:
+        path = Path(item).resolve()
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.blend")))
+        elif path.suffix.lower() == ".blend" and path.is_file():
+            files.append(path)
+        else:
+            print(f"[blendXweb2] skipping {item}: not a .blend file or directory", file=sys.stderr)
+    return list(dict.fromkeys(files))
+
+
+def package_basenames(blend_files):
+    """Give every .blend a unique package name, ``<stem>_web`` where possible."""
+    stems = {}
+    for path in blend_files:
+        stems.setdefault(path.stem, []).append(path)
+    names = {}
+    for stem, paths in stems.items():
+        for path in paths:
+            if len(paths) == 1:
+                names[path] = f"{stem}_web"
+            else:
+                digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:8]
+                names[path] = f"{stem}_{digest}_web"
+    return names
+
+
+def read_json(path, default):
+    try:
+        with Path(path).open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    path = Path(path)
+    partial = path.with_name(path.name + ".partial")
+    with partial.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(partial, path)
+
+
+def run_worker_process(blender, blend_path, export_base, profile, timeout):
+    """Export one file in a fresh Blender; returns the worker's result dict."""
+    command = [
+        blender,
+        "--background",
+        "--factory-startup",
+        str(blend_path),
+        "--python-exit-code", "1",
+        "--python", str(Path(__file__).resolve()),
+        "--",
+        "--worker",
+        "--export-base", str(export_base),
+        "--profile", profile,
+    ]
+    started = time.perf_counter()
+    try:
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {"status": "failed", "error": f"timed out after {timeout}s"}
+    except OSError as error:
+        return {"status": "failed", "error": f"could not start Blender: {error}"}
+
+    result = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+    if result is None:
+        tail = "\n".join(completed.stdout.splitlines()[-20:])
+        result = {"status": "failed", "error": f"Blender exited with {completed.returncode}:\n{tail}"}
+    result["process_seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(args):
+    output_dir = Path(args.output).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state_path = output_dir / STATE_FILENAME
+    state = read_json(state_path, {})
+    addon_hash = file_sha256(ADDON_ROOT / "__init__.py")
+
+    blend_files = collect_blend_files(args.inputs)
+    names = package_basenames(blend_files)
+    state_lock = threading.Lock()
+    results = []
+
+    def export_one(blend_path):
+        export_base = output_dir / names[blend_path]
+        archive_path = export_base.with_name(export_base.name + ".zip")
+        entry = {
+            "blend": str(blend_path),
+            "archive": str(archive_path),
+            "blend_size": blend_path.stat().st_size,
+        }
+        started = time.perf_counter()
+        content_hash = file_sha256(blend_path)
+        key = {"hash": content_hash, "profile": args.profile, "addon": addon_hash}
+        previous = state.get(str(blend_path))
+        if not args.force and previous and previous.get("key") == key and archive_path.exists():
+            entry.update(status="skipped", archive_size=archive_path.stat().st_size)
+        else:
+            entry.update(run_worker_process(args.blender, blend_path, export_base, args.profile, args.timeout))
+            if entry["status"] == "exported":
+                with state_lock:
+                    state[str(blend_path)] = {"key": key, "archive": str(archive_path)}
+                    write_json(state_path, state)
+        entry["seconds"] = round(time.perf_counter() - started, 3)
+        return entry
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(export_one, path) for path in blend_files]
+        for future in as_completed(futures):
+            entry = future.result()
+            results.append(entry)
+            print(f"[blendXweb2] {entry['status']:>8} {entry['blend']} ({entry['seconds']}s)")
+
+    results.sort(key=lambda entry: entry["blend"])
+    counts = {status: sum(1 for entry in results if entry["status"] == status)
+              for status in ("exported", "skipped", "failed")}
+    report = {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+        "seconds": round(time.time() - started, 3),
+        "profile": args.profile,
+        "jobs": args.jobs,
+        "totals": {
+            **counts,
+            "files": len(results),
+            "blend_bytes": sum(entry.get("blend_size", 0) for entry in results),
+            "archive_bytes": sum(entry.get("archive_size", 0) for entry in results),
+        },
+        "results": results,
+    }
+    report_path = Path(args.report).resolve() if args.report else output_dir / REPORT_FILENAME
+    write_json(report_path, report)
+    print(f"[blendXweb2] {counts['exported']} exported, {counts['skipped']} skipped, "
+          f"{counts['failed']} failed; report written to {report_path}")
+    return 1 if counts["failed"] else 0
+
+
+def run_worker(args):
+    """Runs inside Blender: load the add-on from this checkout and package."""
+    import importlib.util
+    import bpy
+
+    spec = importlib.util.spec_from_file_location(
+        "blendxweb2_batch",
+        ADDON_ROOT / "__init__.py",
+        submodule_search_locations=[str(ADDON_ROOT)],
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = addon
+    spec.loader.exec_module(addon)
+
+    started = time.perf_counter()
+    archive_path = addon.package_for_export(bpy.context, args.export_base, args.profile)
+    result = {"export_seconds": round(time.perf_counter() - started, 3)}
+    if archive_path and Path(archive_path).exists():
+        result.update(status="exported", archive_size=Path(archive_path).stat().st_size)
+    else:
+        result.update(status="failed", error="package_for_export failed; see Blender output")
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Export .blend files to web packages in parallel.")
+    parser.add_argument("inputs", nargs="*", help=".blend files or directories to search")
+    parser.add_argument("--output", help="directory for the packages, state and report")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"),
+                        help="Blender executable (default: $BLENDER or 'blender')")
+    parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="number of Blender processes to run at once")
+    parser.add_argument("--profile", choices=PROFILES, default="FINAL", help="export profile")
+    parser.add_argument("--report", help="report path (default: OUTPUT/batch_report.json)")
+    parser.add_argument("--timeout", type=float, default=3600, help="per-file timeout in seconds")
+    parser.add_argument("--force", action="store_true", help="export even when unchanged")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--export-base", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if not args.worker and (not args.inputs or not args.output):
+        parser.error("INPUT and --output are required")
+    return args
+
+
+if __name__ == "__main__":
+    # Inside Blender our arguments follow the "--" separator.
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+    if args.worker:
+        run_worker(args)
+    else:
+        sys.exit(run_batch(args))
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Time the add-on's export pipeline on synthetic scenes in headless Blender.
+Usage: python bench_export.py [--blender PATH] [--objects 10,100] [--triangles 20000]
+                              [--textures 0,4] [--texture-size 1024] [--animated]
+                              [--profile FAST_PREVIEW] [--repeat 3]
+                              [--output FILE] [--compare BASELINE]
+
+Every combination of --objects, --triangles (whole scene) and --textures is
+a case. Each case runs in its own `blender -b --factory-startup --python
+bench_export.py -- --worker ...` process, which loads the add-on straight
+from this checkout, builds the scene and times:
+
+- export_scene_to_gltf
+- generate_preview_files into a new directory (cold caches, empty content
+  store), into the same directory again (scene unchanged), and into a
+  new directory with the content store filled (another session)
+- package_for_export
+
+The content store points at a temporary directory, so the user's store is
+neither used nor touched. Results (medians over --repeat runs, per-stage
+timings and output sizes) are written as JSON; --compare prints how the
+medians moved against an earlier result file.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import benchlib  # noqa: E402
+
+RESULT_MARKER = "BLENDXWEB2_BENCH "
+PROFILES = ("FAST_PREVIEW", "BALANCED", "FINAL")
+ANIMATION_FRAMES = 60
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def case_name(objects, triangles, textures, animated, profile):
+    name = f"objects={objects} triangles={triangles} textures={textures} profile={profile}"
+    return name + (" animated" if animated else "")
+
+
+# ------------------------------------
+# Inside Blender
+# ------------------------------------
+
+def build_scene(objects, triangles, textures, texture_size, animated, seed=0):
+    """Replace the factory scene with ``objects`` grid meshes of about
+    ``triangles`` triangles in total, sharing ``textures`` image materials."""
+    import bmesh
+    import bpy
+    import numpy
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+    rng = numpy.random.default_rng(seed)
+
+    images = []
+    for index in range(textures):
+        image = bpy.data.images.new(f"bench_texture_{index}", texture_size, texture_size, alpha=False)
+        # Noise keeps PNG/WebP encoding honest; flat colours compress to nothing.
+        pixels = rng.random(texture_size * texture_size * 4, dtype=numpy.float32)
+        pixels[3::4] = 1.0
+        image.pixels.foreach_set(pixels)
+        image.pack()
+        images.append(image)
+
+    materials = []
+    for index in range(max(1, textures)):
+        material = bpy.data.materials.new(f"bench_material_{index}")
+        material.use_nodes = True
+        bsdf = material.node_tree.nodes.get("Principled BSDF")
+        if images and bsdf is not None:
+            node = material.node_tree.nodes.new("ShaderNodeTexImage")
+            node.image = images[index]
+            material.node_tree.links.new(node.outputs["Color"], bsdf.inputs["Base Color"])
+        materials.append(material)
+
+    # Square grids of quads; the scene's actual triangle count is reported.
+    side = max(1, round((triangles / max(objects, 1) / 2) ** 0.5))
+    columns = max(1, round(objects ** 0.5))
+    for index in range(objects):
+        mesh = bpy.data.meshes.new(f"bench_mesh_{index}")
+        bm = bmesh.new()
+        bmesh.ops.create_grid(bm, x_segments=side, y_segments=side, size=0.45, calc_uvs=True)
+        for vertex in bm.verts:
+            vertex.co.z = float(rng.random()) * 0.05
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.materials.append(materials[index % len(materials)])
+        obj = bpy.data.objects.new(f"bench_object_{index}", mesh)
+        obj.location = (index % columns, index // columns, 0.0)
+        scene.collection.objects.link(obj)
+        if animated:
+            for frame in (1, ANIMATION_FRAMES // 2, ANIMATION_FRAMES):
+                obj.rotation_euler.z = frame / ANIMATION_FRAMES * 3.14159
+                obj.keyframe_insert("rotation_euler", frame=frame)
+    scene.frame_start, scene.frame_end = 1, ANIMATION_FRAMES
+
+    camera = bpy.data.objects.new("bench_camera", bpy.data.cameras.new("bench_camera"))
+    camera.location = (columns / 2, -columns, columns)
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+    return sum(len(mesh.polygons) * 2 for mesh in bpy.data.meshes)
+
+
+def directory_bytes(path):
+    return sum(item.stat().st_size for item in Path(path).rglob("*") if item.is_file())
+
+
+def run_worker(args):
+    """Runs inside Blender: build the scene and time each pipeline entry point."""
+    import importlib.util
+    import bpy
+
+    spec = importlib.util.spec_from_file_location(
+        "blendxweb2_bench",
+        benchlib.ADDON_ROOT / "__init__.py",
+        submodule_search_locations=[str(benchlib.ADDON_ROOT)],
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = addon
+    spec.loader.exec_module(addon)
+
+    started = time.perf_counter()
+    triangles = build_scene(args.objects, args.triangles, args.textures, args.texture_size, args.animated)
+    build_seconds = time.perf_counter() - started
+
+    work_dir = Path(tempfile.mkdtemp(prefix="blendxweb2_bench_"))
+    samples = {}
+    stages = {}
+
+    def sample(metric, value):
+        samples.setdefault(metric, []).append(value)
+
+    def reset_caches():
+        addon.export_cache.invalidate()
+        addon.dirty_chunk_tracker.mark_all_dirty()
+
+    try:
+        settings = addon.build_export_settings(args.profile)
+        for run in range(args.repeat):
+            run_dir = work_dir / f"run{run}"
+            run_dir.mkdir()
+            addon.content_store = addon.ContentStore(root=run_dir / "store")
+
+            glb_path = run_dir / "direct.glb"
+            started = time.perf_counter()
+            addon.export_scene_to_gltf(bpy.context, str(glb_path), settings)
+            sample("export_scene_to_gltf_seconds", time.perf_counter() - started)
+            sample("glb_bytes", glb_path.stat().st_size)
+
+            reset_caches()
+            for metric, directory in (
+                ("preview_cold", run_dir / "session_a"),
+                ("preview_unchanged", run_dir / "session_a"),
+                ("preview_from_store", run_dir / "session_b"),
+            ):
+                timer = addon.StageTimer()
+                started = time.perf_counter()
+                scene_dir = addon.generate_preview_files(bpy.context, str(directory), args.profile, timer=timer)
+                sample(f"{metric}_seconds", time.perf_counter() - started)
+                for stage, seconds in timer.as_dict().items():
+                    stages.setdefault(metric, {}).setdefault(stage, []).append(seconds)
+                if metric == "preview_cold":
+                    sample("preview_bytes", directory_bytes(scene_dir))
+
+            reset_caches()
+            addon.content_store = addon.ContentStore(root=run_dir / "package_store")
+            started = time.perf_counter()
+            archive = addon.package_for_export(bpy.context, str(run_dir / "package"), args.profile)
+            sample("package_for_export_seconds", time.perf_counter() - started)
+            if archive:
+                sample("package_bytes", Path(archive).stat().st_size)
+            shutil.rmtree(run_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    result = {
+        "blender": bpy.app.version_string,
+        "triangles": triangles,
+        "build_scene_seconds": round(build_seconds, 4),
+        "samples": samples,
+        "stages": stages,
+    }
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+
+
+# ------------------------------------
+# Driver
+# ------------------------------------
+
+def run_case(args, objects, triangles, textures):
+    command = [
+        args.blender,
+        "--background",
+        "--factory-startup",
+        "--python-exit-code", "1",
+        "--python", str(Path(__file__).resolve()),
+        "--",
+        "--worker",
+        "--objects", str(objects),
+        "--triangles", str(triangles),
+        "--textures", str(textures),
+        "--texture-size", str(args.texture_size),
+        "--profile", args.profile,
+        "--repeat", str(args.repeat),
+    ]
+    if args.animated:
+        command.append("--animated")
+    try:
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            timeout=args.timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {args.timeout}s"}
+    except OSError as error:
+        return {"error": f"could not start Blender: {error}"}
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    tail = "\n".join(completed.stdout.splitlines()[-20:])
+    return {"error": f"Blender exited with {completed.returncode}:\n{tail}"}
+
+
+def run_benchmarks(args):
+    cases = []
+    failed = 0
+    for objects, triangles, textures in itertools.product(args.objects, args.triangles, args.textures):
+        name = case_name(objects, triangles, textures, args.animated, args.profile)
+        print(f"[blendXweb2] bench {name}", flush=True)
+        raw = run_case(args, objects, triangles, textures)
+        case = {
+            "name": name,
+            "params": {
+                "objects": objects,
+                "triangles": triangles,
+                "textures": textures,
+                "texture_size": args.texture_size,
+                "animated": args.animated,
+                "profile": args.profile,
+            },
+        }
+        if "error" in raw:
+            failed += 1
+            case.update(error=raw["error"], metrics={})
+            print(f"[blendXweb2]   failed: {raw['error']}", file=sys.stderr)
+        else:
+            case.update(
+                blender=raw["blender"],
+                triangles=raw["triangles"],
+                build_scene_seconds=raw["build_scene_seconds"],
+                metrics={metric: benchlib.summarize(values) for metric, values in raw["samples"].items()},
+                stages={
+                    run: {stage: benchlib.summarize(values) for stage, values in run_stages.items()}
+                    for run, run_stages in raw["stages"].items()
+                },
+            )
+            for metric, summary in case["metrics"].items():
+                print(f"[blendXweb2]   {metric}: {summary['median']:g}")
+        cases.append(case)
+
+    results = {"tool": "bench_export", "environment": benchlib.environment(), "cases": cases}
+    benchlib.write_results(args.output, results)
+    print(f"[blendXweb2] results written to {args.output}")
+    regressions = benchlib.compare(results, args.compare) if args.compare else 0
+    return 1 if failed or regressions else 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the export pipeline on synthetic scenes.")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"),
+                        help="Blender executable (default: $BLENDER or 'blender')")
+    parser.add_argument("--objects", type=int_list, default=[10, 100],
+                        help="comma-separated object counts")
+    parser.add_argument("--triangles", type=int_list, default=[20_000, 200_000],
+                        help="comma-separated triangle counts for the whole scene")
+    parser.add_argument("--textures", type=int_list, default=[0, 4],
+                        help="comma-separated texture counts")
+    parser.add_argument("--texture-size", type=int, default=1024, help="texture width and height in pixels")
+    parser.add_argument("--animated", action="store_true", help="keyframe a rotation on every object")
+    parser.add_argument("--profile", choices=PROFILES, default="FAST_PREVIEW", help="export profile")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case")
+    parser.add_argument("--timeout", type=float, default=3600, help="per-case timeout in seconds")
+    parser.add_argument("--output", default="bench_export.json", help="results file")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file to compare against")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        # One case per worker process.
+        args.objects, args.triangles, args.textures = args.objects[0], args.triangles[0], args.textures[0]
+    return args
+
+
+if __name__ == "__main__":
+    # Inside Blender our arguments follow the "--" separator.
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+    if args.worker:
+        run_worker(args)
+    else:
+        sys.exit(run_benchmarks(args))
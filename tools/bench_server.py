@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Load-test server/server.py with concurrent clients downloading GLBs.
+Usage: python bench_server.py [--engines threaded,asyncio] [--sizes-mb 1,16]
+                              [--concurrency 1,8,32] [--requests 20]
+                              [--revalidate] [--gzip] [--repeat 3]
+                              [--output FILE] [--compare BASELINE]
+
+Blender is not needed. The files are random bytes written to a temporary
+directory, so they do not compress. Each engine is started as its own
+`server.py` process, so the server and the client threads do not share an
+interpreter lock.
+
+Every combination of engine, file size and concurrency is a case. In each
+case that many client threads download the file --requests times each,
+over keep-alive connections. The results are request and byte throughput
+plus latency percentiles. --revalidate sends If-None-Match with the ETag
+of the previous response, which measures the 304 path a refreshing viewer
+takes. --gzip asks for a precompressed .gz sibling, written as the add-on
+would. Results are written as JSON; --compare prints how the medians moved
+against an earlier result file.
+"""
+
+import argparse
+import gzip
+import http.client
+import itertools
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import benchlib  # noqa: E402
+
+SERVER_SCRIPT = benchlib.ADDON_ROOT / "server" / "server.py"
+SERVER_START_TIMEOUT_SECONDS = 10
+ENGINES = ("threaded", "asyncio")
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def engine_list(value):
+    engines = [item.strip() for item in value.split(",") if item.strip()]
+    for engine in engines:
+        if engine not in ENGINES:
+            raise argparse.ArgumentTypeError(f"unknown engine {engine!r}")
+    return engines
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def write_payloads(directory, sizes_mb, precompress):
+    for size_mb in sizes_mb:
+        path = Path(directory) / f"scene_{size_mb}mb.glb"
+        with path.open("wb") as handle:
+            for _ in range(size_mb):
+                handle.write(os.urandom(1024 * 1024))
+        if precompress:
+            with path.open("rb") as source, gzip.open(f"{path}.gz", "wb", compresslevel=1) as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+
+
+def start_server(engine, directory):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER_SCRIPT), str(port), str(directory), "--engine", engine],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{engine} server exited with {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, port
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"{engine} server did not start listening on port {port}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def client(port, url_path, requests, revalidate, accept_gzip, barrier, latencies, totals, lock):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    etag = None
+    local_latencies = []
+    received = errors = not_modified = 0
+    barrier.wait()
+    for _ in range(requests):
+        headers = {}
+        if accept_gzip:
+            headers["Accept-Encoding"] = "gzip"
+        if revalidate and etag:
+            headers["If-None-Match"] = etag
+        started = time.perf_counter()
+        try:
+            connection.request("GET", url_path, headers=headers)
+            response = connection.getresponse()
+            while True:
+                block = response.read(1024 * 1024)
+                if not block:
+                    break
+                received += len(block)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            continue
+        local_latencies.append(time.perf_counter() - started)
+        if response.status == 304:
+            not_modified += 1
+        elif response.status != 200:
+            errors += 1
+        etag = response.getheader("ETag") or etag
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        totals["bytes"] += received
+        totals["errors"] += errors
+        totals["not_modified"] += not_modified
+
+
+def run_load(port, url_path, concurrency, requests, revalidate, accept_gzip):
+    """One round of ``concurrency`` clients; returns the round's metrics."""
+    latencies = []
+    totals = {"bytes": 0, "errors": 0, "not_modified": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    threads = [
+        threading.Thread(
+            target=client,
+            args=(port, url_path, requests, revalidate, accept_gzip, barrier, latencies, totals, lock),
+            daemon=True,
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "mb_per_second": totals["bytes"] / elapsed / (1024 * 1024),
+        "latency_p50_ms": benchlib.percentile(latencies, 0.50) * 1000 if latencies else 0.0,
+        "latency_p95_ms": benchlib.percentile(latencies, 0.95) * 1000 if latencies else 0.0,
+        "latency_p99_ms": benchlib.percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        "errors": totals["errors"],
+        "not_modified": totals["not_modified"],
+    }
+
+
+def run_benchmarks(args):
+    directory = Path(tempfile.mkdtemp(prefix="blendxweb2_bench_server_"))
+    cases = []
+    try:
+        write_payloads(directory, args.sizes_mb, args.gzip)
+        for engine in args.engines:
+            process, port = start_server(engine, directory)
+            try:
+                for size_mb, concurrency in itertools.product(args.sizes_mb, args.concurrency):
+                    name = f"engine={engine} size_mb={size_mb} concurrency={concurrency}"
+                    if args.revalidate:
+                        name += " revalidate"
+                    if args.gzip:
+                        name += " gzip"
+                    print(f"[blendXweb2] bench {name}", flush=True)
+                    url_path = f"/scene_{size_mb}mb.glb"
+                    # One untimed round warms the page cache and the server.
+                    run_load(port, url_path, concurrency, 1, args.revalidate, args.gzip)
+                    rounds = [
+                        run_load(port, url_path, concurrency, args.requests, args.revalidate, args.gzip)
+                        for _ in range(args.repeat)
+                    ]
+                    counts = {key: sum(round_.pop(key) for round_ in rounds) for key in ("errors", "not_modified")}
+                    metrics = {
+                        metric: benchlib.summarize([round_[metric] for round_ in rounds])
+                        for metric in rounds[0]
+                    }
+                    cases.append({
+                        "name": name,
+                        "params": {
+                            "engine": engine,
+                            "size_mb": size_mb,
+                            "concurrency": concurrency,
+                            "requests_per_client": args.requests,
+                            "revalidate": args.revalidate,
+                            "gzip": args.gzip,
+                        },
+                        "metrics": metrics,
+                        "counts": counts,
+                    })
+                    print(
+                        f"[blendXweb2]   {metrics['requests_per_second']['median']:g} req/s, "
+                        f"{metrics['mb_per_second']['median']:g} MB/s, "
+                        f"p95 {metrics['latency_p95_ms']['median']:g} ms, "
+                        f"{counts['errors']} errors"
+                    )
+            finally:
+                stop_server(process)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    results = {"tool": "bench_server", "environment": benchlib.environment(), "cases": cases}
+    benchlib.write_results(args.output, results)
+    print(f"[blendXweb2] results written to {args.output}")
+    failed = any(case["counts"]["errors"] for case in cases)
+    regressions = benchlib.compare(results, args.compare) if args.compare else 0
+    return 1 if failed or regressions else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the preview server.")
+    parser.add_argument("--engines", type=engine_list, default=list(ENGINES),
+                        help="comma-separated server engines")
+    parser.add_argument("--sizes-mb", type=int_list, default=[1, 16],
+                        help="comma-separated GLB sizes in MB")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 8, 32],
+                        help="comma-separated numbers of concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client and round")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="send If-None-Match with the last ETag (304 path)")
+    parser.add_argument("--gzip", action="store_true", help="request precompressed .gz siblings")
+    parser.add_argument("--repeat", type=int, default=3, help="rounds per case")
+    parser.add_argument("--output", default="bench_server.json", help="results file")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file to compare against")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmarks(parse_args()))
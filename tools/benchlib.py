@@ -0,0 +1,110 @@
+"""
+Helpers shared by the benchmark scripts in this directory.
+
+Results are JSON documents with an ``environment`` block (commit, Python,
+platform) and a list of ``cases``. Every case has a unique ``name`` and
+maps metric names to summaries of repeated samples, so two result files
+from different commits can be compared with ``--compare``.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ADDON_ROOT = Path(__file__).resolve().parent.parent
+# A metric is reported as changed when its median moves by more than this.
+COMPARE_THRESHOLD = 0.05
+# Durations and sizes should shrink; everything else (throughput) grow.
+LOWER_IS_BETTER_SUFFIXES = ("_seconds", "_ms", "_bytes")
+
+
+def percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def summarize(samples, digits=4):
+    """Median, min, max and spread of repeated measurements."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"n": 0}
+    return {
+        "n": len(ordered),
+        "median": round(statistics.median(ordered), digits),
+        "min": round(ordered[0], digits),
+        "max": round(ordered[-1], digits),
+        "stdev": round(statistics.stdev(ordered), digits) if len(ordered) > 1 else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        completed = subprocess.run(
+            ["git", "-C", str(ADDON_ROOT), "rev-parse", "HEAD"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return completed.stdout.strip() or None
+
+
+def environment():
+    return {
+        "commit": git_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path, results):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    with partial.open("w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    os.replace(partial, path)
+
+
+def compare(results, baseline_path):
+    """Print how each case's medians moved against a baseline result file.
+
+    Timings, latencies and sizes (see ``LOWER_IS_BETTER_SUFFIXES``) are
+    flagged as regressions when they grow; all other metrics when they
+    shrink. Returns the number of regressions.
+    """
+    with Path(baseline_path).open("r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    baseline_cases = {case["name"]: case for case in baseline.get("cases", [])}
+    print(f"compared with {baseline_path} (commit {baseline.get('environment', {}).get('commit')})")
+    regressions = 0
+    for case in results["cases"]:
+        previous = baseline_cases.get(case["name"])
+        if previous is None:
+            print(f"  {case['name']}: not in baseline")
+            continue
+        for metric, summary in case["metrics"].items():
+            before = previous.get("metrics", {}).get(metric, {}).get("median")
+            after = summary.get("median")
+            if not before or after is None:
+                continue
+            change = after / before - 1.0
+            worse = change > 0 if metric.endswith(LOWER_IS_BETTER_SUFFIXES) else change < 0
+            flag = ""
+            if abs(change) > COMPARE_THRESHOLD:
+                flag = "  REGRESSION" if worse else "  improved"
+                regressions += worse
+            print(f"  {case['name']} {metric}: {before:g} -> {after:g} ({change:+.1%}){flag}")
+    return regressions
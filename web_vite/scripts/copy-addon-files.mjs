@@ -34,6 +34,11 @@ const assets = [
     destination: (outDir) => resolve(outDir, 'server'),
     type: 'directory',
   },
+  {
+    source: resolve(repoRoot, 'tools'),
+    destination: (outDir) => resolve(outDir, 'tools'),
+    type: 'directory',
+  },
 ];
 
 const log = (message) => {
@@ -25,6 +25,8 @@ import {
   updateNormalsStatus,
   updateLightingDisplay,
 } from './ui.js';
+import { requestRender } from './render.js';
+import { setMaterialProperty, useShadingVariant } from './materials.js';
 
 const setAnimationLoopMode = (actions, mode) => {
   actions.forEach((action) => {
@@ -39,20 +41,19 @@ const setAnimationLoopMode = (actions, mode) => {
 };
 
 export const applyShadingMode = (mode) => {
+  requestRender();
   const scene = getScene();
   if (!scene) return;
 
-  scene.traverse((child) => {
-    if (child.isMesh && child.material) {
-      child.material.flatShading = mode === 'flat';
-      child.material.needsUpdate = true;
-    }
-  });
+  // Swaps in cached (and pre-compiled) variants instead of flipping
+  // flatShading, which would rebuild every program.
+  useShadingVariant(scene, mode);
 
   updateShadingStatus(mode);
 };
 
 export const toggleNormals = (show) => {
+  requestRender();
   const scene = getScene();
   if (!scene) return;
 
@@ -82,17 +83,15 @@ export const toggleNormals = (show) => {
 };
 
 export const toggleWireframe = (enabled) => {
+  requestRender();
   const scene = getScene();
   if (!scene) return;
 
-  scene.traverse((child) => {
-    if (child.isMesh && child.material) {
-      child.material.wireframe = enabled;
-    }
-  });
+  setMaterialProperty(scene, 'wireframe', enabled);
 };
 
 export const toggleGrid = (visible) => {
+  requestRender();
   const grid = getGrid();
   if (grid) {
     grid.visible = visible;
@@ -100,6 +99,7 @@ export const toggleGrid = (visible) => {
 };
 
 export const toggleLights = (visible) => {
+  requestRender();
   const scene = getScene();
   if (!scene) return;
 
@@ -111,6 +111,7 @@ export const toggleLights = (visible) => {
 };
 
 export const updateLightingIntensity = (intensity) => {
+  requestRender();
   const scene = getScene();
   if (!scene) return;
 
@@ -126,6 +127,7 @@ export const updateLightingIntensity = (intensity) => {
 };
 
 export const resetCameraToScene = () => {
+  requestRender();
   const scene = getScene();
   if (!scene) return;
 
@@ -180,6 +182,7 @@ export const resetCameraToScene = () => {
 };
 
 export const setCameraPreset = ({ x = 0, y = 0, z = 0 }) => {
+  requestRender();
   const camera = getCamera();
   const controls = getControls();
   if (!camera) return;
@@ -194,6 +197,7 @@ export const setCameraPreset = ({ x = 0, y = 0, z = 0 }) => {
 };
 
 export const playAnimations = () => {
+  requestRender();
   const mixer = getMixer();
   const actions = getAnimationActions();
   if (!mixer || !actions.length) return;
@@ -208,6 +212,7 @@ export const playAnimations = () => {
 };
 
 export const pauseAnimations = () => {
+  requestRender();
   const actions = getAnimationActions();
   if (!actions.length) return;
 
@@ -220,6 +225,7 @@ export const pauseAnimations = () => {
 };
 
 export const stopAnimations = () => {
+  requestRender();
   const mixer = getMixer();
   const actions = getAnimationActions();
   if (!mixer || !actions.length) return;
@@ -233,6 +239,7 @@ export const stopAnimations = () => {
 };
 
 export const seekAnimation = (time) => {
+  requestRender();
   const mixer = getMixer();
   const actions = getAnimationActions();
   if (!mixer || !actions.length) return;
@@ -272,6 +279,7 @@ export const seekAnimation = (time) => {
 };
 
 export const initializeAnimations = (gltf, duration, mixer) => {
+  requestRender();
   if (!gltf.animations || !gltf.animations.length) return;
 
   const actions = gltf.animations.map((clip) => mixer.clipAction(clip));
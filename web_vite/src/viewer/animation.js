@@ -17,15 +17,18 @@ const clampTime = (time, duration) => {
   return time;
 };
 
+/**
+ * Advance playing animations; returns true while another frame is needed.
+ */
 export const tickAnimations = (deltaTime) => {
   const mixer = getMixer();
   if (!mixer || !isPlaying()) {
-    return;
+    return false;
   }
 
   const duration = getAnimationDuration();
   if (!(duration > 0)) {
-    return;
+    return false;
   }
 
   mixer.update(deltaTime);
@@ -43,4 +46,5 @@ export const tickAnimations = (deltaTime) => {
   setAnimationSliderValue(clampedTime);
 
   updateAnimationTimeDisplay(clampedTime, duration);
+  return isPlaying();
 };
\ No newline at end of file
@@ -0,0 +1,264 @@
+/**
+ * Flat bounding volume hierarchy over axis-aligned boxes.
+ *
+ * Used by the BVH worker for per-geometry triangle hierarchies and on the
+ * main thread for the scene-level object hierarchy. Nodes are stored depth
+ * first: an inner node's left child directly follows it and `nodeData`
+ * holds the index of its right child; a leaf stores the offset and count of
+ * its items in `order`.
+ */
+
+const LEAF_FLAG = 0x80000000;
+
+const computeRangeBounds = (itemBounds, centroids, order, start, end, out) => {
+  let minX = Infinity;
+  let minY = Infinity;
+  let minZ = Infinity;
+  let maxX = -Infinity;
+  let maxY = -Infinity;
+  let maxZ = -Infinity;
+  let cMinX = Infinity;
+  let cMinY = Infinity;
+  let cMinZ = Infinity;
+  let cMaxX = -Infinity;
+  let cMaxY = -Infinity;
+  let cMaxZ = -Infinity;
+  for (let i = start; i < end; i += 1) {
+    const item = order[i];
+    const b = item * 6;
+    minX = Math.min(minX, itemBounds[b]);
+    minY = Math.min(minY, itemBounds[b + 1]);
+    minZ = Math.min(minZ, itemBounds[b + 2]);
+    maxX = Math.max(maxX, itemBounds[b + 3]);
+    maxY = Math.max(maxY, itemBounds[b + 4]);
+    maxZ = Math.max(maxZ, itemBounds[b + 5]);
+    const c = item * 3;
+    cMinX = Math.min(cMinX, centroids[c]);
+    cMinY = Math.min(cMinY, centroids[c + 1]);
+    cMinZ = Math.min(cMinZ, centroids[c + 2]);
+    cMaxX = Math.max(cMaxX, centroids[c]);
+    cMaxY = Math.max(cMaxY, centroids[c + 1]);
+    cMaxZ = Math.max(cMaxZ, centroids[c + 2]);
+  }
+  out[0] = minX;
+  out[1] = minY;
+  out[2] = minZ;
+  out[3] = maxX;
+  out[4] = maxY;
+  out[5] = maxZ;
+  out[6] = cMinX;
+  out[7] = cMinY;
+  out[8] = cMinZ;
+  out[9] = cMaxX;
+  out[10] = cMaxY;
+  out[11] = cMaxZ;
+};
+
+const partition = (centroids, order, start, end, axis, pivot) => {
+  let left = start;
+  let right = end - 1;
+  while (left <= right) {
+    if (centroids[order[left] * 3 + axis] < pivot) {
+      left += 1;
+    } else {
+      const swap = order[left];
+      order[left] = order[right];
+      order[right] = swap;
+      right -= 1;
+    }
+  }
+  return left;
+};
+
+/**
+ * Build a hierarchy over `count` boxes stored as min/max triples in
+ * `itemBounds` (6 floats per item). Splits at the spatial median of the
+ * longest centroid axis, falling back to an object median.
+ */
+export const buildBVH = (itemBounds, count, leafSize = 8) => {
+  const centroids = new Float32Array(count * 3);
+  for (let i = 0; i < count; i += 1) {
+    const b = i * 6;
+    centroids[i * 3] = (itemBounds[b] + itemBounds[b + 3]) * 0.5;
+    centroids[i * 3 + 1] = (itemBounds[b + 1] + itemBounds[b + 4]) * 0.5;
+    centroids[i * 3 + 2] = (itemBounds[b + 2] + itemBounds[b + 5]) * 0.5;
+  }
+
+  const order = new Uint32Array(count);
+  for (let i = 0; i < count; i += 1) {
+    order[i] = i;
+  }
+
+  const maxNodes = Math.max(1, 2 * Math.ceil(count / Math.max(1, leafSize)) * 2);
+  let nodeBounds = new Float32Array(maxNodes * 6);
+  let nodeData = new Uint32Array(maxNodes * 2);
+  let nodeCount = 0;
+
+  const allocate = () => {
+    if (nodeCount * 6 >= nodeBounds.length) {
+      const grownBounds = new Float32Array(nodeBounds.length * 2);
+      grownBounds.set(nodeBounds);
+      nodeBounds = grownBounds;
+      const grownData = new Uint32Array(nodeData.length * 2);
+      grownData.set(nodeData);
+      nodeData = grownData;
+    }
+    nodeCount += 1;
+    return nodeCount - 1;
+  };
+
+  const scratch = new Float32Array(12);
+  // Each stack entry: start, end, index of the parent whose right child
+  // this range becomes (or -1 for the root / left children).
+  const stack = [[0, count, -1]];
+  while (stack.length) {
+    const [start, end, parent] = stack.pop();
+    const node = allocate();
+    if (parent >= 0) {
+      nodeData[parent * 2] = node;
+    }
+    computeRangeBounds(itemBounds, centroids, order, start, end, scratch);
+    nodeBounds.set(scratch.subarray(0, 6), node * 6);
+
+    const size = end - start;
+    if (size <= leafSize) {
+      nodeData[node * 2] = start;
+      nodeData[node * 2 + 1] = size | LEAF_FLAG;
+      continue;
+    }
+
+    const extentX = scratch[9] - scratch[6];
+    const extentY = scratch[10] - scratch[7];
+    const extentZ = scratch[11] - scratch[8];
+    let axis = 0;
+    if (extentY > extentX && extentY >= extentZ) {
+      axis = 1;
+    } else if (extentZ > extentX && extentZ > extentY) {
+      axis = 2;
+    }
+
+    let mid = partition(centroids, order, start, end, axis, scratch[6 + axis] + [extentX, extentY, extentZ][axis] * 0.5);
+    if (mid === start || mid === end) {
+      // All centroids on one side (e.g. identical centroids): split evenly.
+      const range = Array.from(order.subarray(start, end)).sort(
+        (a, b) => centroids[a * 3 + axis] - centroids[b * 3 + axis],
+      );
+      order.set(range, start);
+      mid = start + (size >> 1);
+    }
+
+    nodeData[node * 2 + 1] = 0;
+    // Push right first so the left child is built (and allocated) next.
+    stack.push([mid, end, node]);
+    stack.push([start, mid, -1]);
+  }
+
+  return {
+    nodeBounds: nodeBounds.slice(0, nodeCount * 6),
+    nodeData: nodeData.slice(0, nodeCount * 2),
+    order,
+    nodeCount,
+  };
+};
+
+const isLeaf = (bvh, node) => (bvh.nodeData[node * 2 + 1] & LEAF_FLAG) !== 0;
+
+const rayBoxDistance = (b, o, ox, oy, oz, ix, iy, iz, tMax) => {
+  let t1 = (b[o] - ox) * ix;
+  let t2 = (b[o + 3] - ox) * ix;
+  let tNear = Math.min(t1, t2);
+  let tFar = Math.max(t1, t2);
+  t1 = (b[o + 1] - oy) * iy;
+  t2 = (b[o + 4] - oy) * iy;
+  tNear = Math.max(tNear, Math.min(t1, t2));
+  tFar = Math.min(tFar, Math.max(t1, t2));
+  t1 = (b[o + 2] - oz) * iz;
+  t2 = (b[o + 5] - oz) * iz;
+  tNear = Math.max(tNear, Math.min(t1, t2));
+  tFar = Math.min(tFar, Math.max(t1, t2));
+  if (tFar < Math.max(tNear, 0) || tNear > tMax) {
+    return Infinity;
+  }
+  return Math.max(tNear, 0);
+};
+
+/**
+ * Walk leaves hit by a ray, nearest node first.
+ *
+ * `visitItem(item, entryDistance)` returns the new maximum distance (e.g.
+ * the closest hit so far) so farther nodes are pruned.
+ */
+export const traverseRay = (bvh, origin, direction, tMax, visitItem) => {
+  const ix = 1 / direction[0];
+  const iy = 1 / direction[1];
+  const iz = 1 / direction[2];
+  const [ox, oy, oz] = origin;
+  const b = bvh.nodeBounds;
+  const stack = [0];
+  const distances = [rayBoxDistance(b, 0, ox, oy, oz, ix, iy, iz, tMax)];
+  let limit = tMax;
+
+  while (stack.length) {
+    const node = stack.pop();
+    const entry = distances.pop();
+    if (entry > limit) {
+      continue;
+    }
+    if (isLeaf(bvh, node)) {
+      const offset = bvh.nodeData[node * 2];
+      const count = bvh.nodeData[node * 2 + 1] & ~LEAF_FLAG;
+      for (let i = offset; i < offset + count; i += 1) {
+        limit = Math.min(limit, visitItem(bvh.order[i], entry));
+      }
+      continue;
+    }
+    const left = node + 1;
+    const right = bvh.nodeData[node * 2];
+    const leftDistance = rayBoxDistance(b, left * 6, ox, oy, oz, ix, iy, iz, limit);
+    const rightDistance = rayBoxDistance(b, right * 6, ox, oy, oz, ix, iy, iz, limit);
+    // Push the farther child first so the nearer one is visited first.
+    if (leftDistance < rightDistance) {
+      if (rightDistance !== Infinity) {
+        stack.push(right);
+        distances.push(rightDistance);
+      }
+      stack.push(left);
+      distances.push(leftDistance);
+    } else {
+      if (leftDistance !== Infinity) {
+        stack.push(left);
+        distances.push(leftDistance);
+      }
+      if (rightDistance !== Infinity) {
+        stack.push(right);
+        distances.push(rightDistance);
+      }
+    }
+  }
+};
+
+/**
+ * Visit every item whose node passes `testNode(bounds, offset)`, where
+ * `bounds` is the node bounds array and `offset` the node's first float.
+ */
+export const traverseNodes = (bvh, testNode, visitItem) => {
+  if (!bvh.nodeCount) {
+    return;
+  }
+  const stack = [0];
+  while (stack.length) {
+    const node = stack.pop();
+    if (!testNode(bvh.nodeBounds, node * 6)) {
+      continue;
+    }
+    if (isLeaf(bvh, node)) {
+      const offset = bvh.nodeData[node * 2];
+      const count = bvh.nodeData[node * 2 + 1] & ~LEAF_FLAG;
+      for (let i = offset; i < offset + count; i += 1) {
+        visitItem(bvh.order[i]);
+      }
+      continue;
+    }
+    stack.push(bvh.nodeData[node * 2], node + 1);
+  }
+};
@@ -0,0 +1,124 @@
+import { buildBVH, traverseRay } from './bvh.js';
+
+// Triangle hierarchies live here, next to copies of the positions and
+// indices they were built from, so neither building nor ray queries run on
+// the main thread. Keyed by the id the main thread assigned to a geometry.
+const geometries = new Map();
+
+const TRIANGLE_LEAF_SIZE = 8;
+
+const buildTriangleBounds = (positions, index, triangleCount) => {
+  const bounds = new Float32Array(triangleCount * 6);
+  for (let t = 0; t < triangleCount; t += 1) {
+    let minX = Infinity;
+    let minY = Infinity;
+    let minZ = Infinity;
+    let maxX = -Infinity;
+    let maxY = -Infinity;
+    let maxZ = -Infinity;
+    for (let corner = 0; corner < 3; corner += 1) {
+      const vertex = index ? index[t * 3 + corner] : t * 3 + corner;
+      const x = positions[vertex * 3];
+      const y = positions[vertex * 3 + 1];
+      const z = positions[vertex * 3 + 2];
+      minX = Math.min(minX, x);
+      minY = Math.min(minY, y);
+      minZ = Math.min(minZ, z);
+      maxX = Math.max(maxX, x);
+      maxY = Math.max(maxY, y);
+      maxZ = Math.max(maxZ, z);
+    }
+    bounds.set([minX, minY, minZ, maxX, maxY, maxZ], t * 6);
+  }
+  return bounds;
+};
+
+// Möller–Trumbore, double sided. Returns the ray parameter or Infinity.
+const intersectTriangle = (positions, index, triangle, origin, direction) => {
+  const a = (index ? index[triangle * 3] : triangle * 3) * 3;
+  const b = (index ? index[triangle * 3 + 1] : triangle * 3 + 1) * 3;
+  const c = (index ? index[triangle * 3 + 2] : triangle * 3 + 2) * 3;
+  const e1x = positions[b] - positions[a];
+  const e1y = positions[b + 1] - positions[a + 1];
+  const e1z = positions[b + 2] - positions[a + 2];
+  const e2x = positions[c] - positions[a];
+  const e2y = positions[c + 1] - positions[a + 1];
+  const e2z = positions[c + 2] - positions[a + 2];
+  const px = direction[1] * e2z - direction[2] * e2y;
+  const py = direction[2] * e2x - direction[0] * e2z;
+  const pz = direction[0] * e2y - direction[1] * e2x;
+  const det = e1x * px + e1y * py + e1z * pz;
+  if (Math.abs(det) < 1e-12) {
+    return Infinity;
+  }
+  const inv = 1 / det;
+  const tx = origin[0] - positions[a];
+  const ty = origin[1] - positions[a + 1];
+  const tz = origin[2] - positions[a + 2];
+  const u = (tx * px + ty * py + tz * pz) * inv;
+  if (u < 0 || u > 1) {
+    return Infinity;
+  }
+  const qx = ty * e1z - tz * e1y;
+  const qy = tz * e1x - tx * e1z;
+  const qz = tx * e1y - ty * e1x;
+  const v = (direction[0] * qx + direction[1] * qy + direction[2] * qz) * inv;
+  if (v < 0 || u + v > 1) {
+    return Infinity;
+  }
+  const t = (e2x * qx + e2y * qy + e2z * qz) * inv;
+  return t >= 0 ? t : Infinity;
+};
+
+const raycastGeometry = (entry, origin, direction, far) => {
+  let best = { t: far, face: -1 };
+  traverseRay(entry.bvh, origin, direction, far, (triangle) => {
+    const t = intersectTriangle(entry.positions, entry.index, triangle, origin, direction);
+    if (t < best.t) {
+      best = { t, face: triangle };
+    }
+    return best.t;
+  });
+  return best.face >= 0 ? best : null;
+};
+
+self.addEventListener('message', (event) => {
+  const message = event.data;
+  if (message.type === 'build') {
+    const started = performance.now();
+    const { id, positions, index } = message;
+    const triangleCount = index ? index.length / 3 : positions.length / 9;
+    const bounds = buildTriangleBounds(positions, index, triangleCount);
+    const bvh = buildBVH(bounds, triangleCount, TRIANGLE_LEAF_SIZE);
+    geometries.set(id, { positions, index, bvh });
+    self.postMessage({
+      type: 'built',
+      id,
+      triangles: triangleCount,
+      nodes: bvh.nodeCount,
+      ms: performance.now() - started,
+    });
+  } else if (message.type === 'raycast') {
+    // Queries are in each geometry's local space; `direction` is not
+    // normalised, so hit parameters compare directly across meshes.
+    // Queries arrive sorted by box entry distance, so the first one that
+    // starts beyond the best hit ends the search.
+    let best = null;
+    for (const query of message.queries) {
+      if (best && query.entry > best.t) {
+        break;
+      }
+      const entry = geometries.get(query.id);
+      if (!entry) {
+        continue;
+      }
+      const hit = raycastGeometry(entry, query.origin, query.direction, best ? best.t : query.far);
+      if (hit && (!best || hit.t < best.t)) {
+        best = { key: query.key, t: hit.t, face: hit.face };
+      }
+    }
+    self.postMessage({ type: 'hit', requestId: message.requestId, hit: best });
+  } else if (message.type === 'release') {
+    message.ids.forEach((id) => geometries.delete(id));
+  }
+});
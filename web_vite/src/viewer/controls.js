@@ -16,6 +16,8 @@ import {
   stopAnimations,
   seekAnimation,
 } from './actions.js';
+import { setHudVisible } from './hud.js';
+import { setContinuousRendering } from './render.js';
 
 export const registerControlHandlers = ({ hasAnimations }) => {
   const {
@@ -24,6 +26,8 @@ export const registerControlHandlers = ({ hasAnimations }) => {
     wireframeToggle,
     gridToggle,
     lightsToggle,
+    hudToggle,
+    continuousToggle,
     lightingSlider,
     lightingValue,
     resetCamera,
@@ -78,6 +82,18 @@ export const registerControlHandlers = ({ hasAnimations }) => {
     });
   }
 
+  if (hudToggle) {
+    hudToggle.addEventListener('change', (event) => {
+      setHudVisible(event.target.checked);
+    });
+  }
+
+  if (continuousToggle) {
+    continuousToggle.addEventListener('change', (event) => {
+      setContinuousRendering(event.target.checked);
+    });
+  }
+
   if (lightingSlider && lightingValue) {
     lightingSlider.addEventListener('input', (event) => {
       const value = parseFloat(event.target.value);
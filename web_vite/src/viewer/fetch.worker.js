@@ -0,0 +1,20 @@
+import { fetchResponseBody } from './stream.js';
+
+// Downloads run here so reading and reassembling large GLB bodies never
+// blocks the main thread; the finished buffer is transferred, not copied.
+self.addEventListener('message', async (event) => {
+  const { id, url } = event.data;
+  let lastReport = 0;
+  try {
+    const buffer = await fetchResponseBody(url, (loaded, total) => {
+      const now = performance.now();
+      if (now - lastReport > 50) {
+        lastReport = now;
+        self.postMessage({ id, type: 'progress', loaded, total });
+      }
+    });
+    self.postMessage({ id, type: 'done', buffer }, [buffer]);
+  } catch (error) {
+    self.postMessage({ id, type: 'error', message: String(error?.message || error) });
+  }
+});
@@ -0,0 +1,181 @@
+import { getDomRefs, getRenderer } from './state.js';
+import { isContinuousRendering, requestRender } from './render.js';
+
+const TELEMETRY_URL = '__telemetry';
+const FRAME_SAMPLES = 600;
+const HUD_REFRESH_MS = 250;
+const TELEMETRY_DELAY_MS = 10000;
+
+const frameTimes = new Float32Array(FRAME_SAMPLES);
+let frameCount = 0;
+let lastFrameAt = null;
+let lastHudUpdate = 0;
+let hudElement = null;
+let telemetryAvailable = true;
+let telemetryTimer = null;
+const loadTimings = {};
+
+const percentile = (sorted, fraction) =>
+  sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * fraction))] : 0;
+
+const frameStats = () => {
+  const count = Math.min(frameCount, FRAME_SAMPLES);
+  const samples = Array.from(frameTimes.subarray(0, count)).sort((a, b) => a - b);
+  const mean = count ? samples.reduce((sum, value) => sum + value, 0) / count : 0;
+  return {
+    frames: frameCount,
+    fps: mean ? 1000 / mean : 0,
+    p50: percentile(samples, 0.5),
+    p95: percentile(samples, 0.95),
+    p99: percentile(samples, 0.99),
+  };
+};
+
+const rendererStats = () => {
+  const info = getRenderer()?.info;
+  if (!info) {
+    return null;
+  }
+  return {
+    calls: info.render.calls,
+    triangles: info.render.triangles,
+    geometries: info.memory.geometries,
+    textures: info.memory.textures,
+    programs: info.programs ? info.programs.length : 0,
+  };
+};
+
+const renderHud = () => {
+  const stats = frameStats();
+  const gpu = rendererStats();
+  const lines = [
+    `${stats.fps.toFixed(1)} fps (${isContinuousRendering() ? 'continuous' : 'on demand'})`,
+    `frame p50 ${stats.p50.toFixed(1)} / p95 ${stats.p95.toFixed(1)} / p99 ${stats.p99.toFixed(1)} ms`,
+  ];
+  if (gpu) {
+    lines.push(
+      `draw calls ${gpu.calls}  triangles ${gpu.triangles.toLocaleString()}`,
+      `geometries ${gpu.geometries}  textures ${gpu.textures}  programs ${gpu.programs}`,
+    );
+  }
+  Object.entries(loadTimings).forEach(([name, ms]) => {
+    lines.push(`${name} ${ms.toFixed(0)} ms`);
+  });
+  hudElement.textContent = lines.join('\n');
+};
+
+/**
+ * Record the time at which a frame was rendered.
+ *
+ * `now` is a requestAnimationFrame timestamp; call `resetFrameClock` after
+ * the loop was idle so the pause is not counted as one long frame.
+ */
+export const recordFrame = (now) => {
+  if (lastFrameAt !== null) {
+    frameTimes[frameCount % FRAME_SAMPLES] = now - lastFrameAt;
+    frameCount += 1;
+  }
+  lastFrameAt = now;
+
+  if (hudElement && now - lastHudUpdate > HUD_REFRESH_MS) {
+    lastHudUpdate = now;
+    renderHud();
+  }
+};
+
+export const resetFrameClock = () => {
+  lastFrameAt = null;
+};
+
+export const resetLoadTimings = () => {
+  Object.keys(loadTimings).forEach((name) => delete loadTimings[name]);
+};
+
+export const markLoadTiming = (name, ms) => {
+  loadTimings[name] = (loadTimings[name] || 0) + ms;
+};
+
+/**
+ * Await `promise` and add its duration to the named load timing.
+ */
+export const timed = async (name, promise) => {
+  const started = performance.now();
+  try {
+    return await promise;
+  } finally {
+    markLoadTiming(name, performance.now() - started);
+  }
+};
+
+export const setHudVisible = (visible) => {
+  const { viewer, hudToggle } = getDomRefs();
+  if (hudToggle) {
+    hudToggle.checked = visible;
+  }
+  if (visible && !hudElement && viewer) {
+    hudElement = document.createElement('pre');
+    hudElement.className = 'perf-hud';
+    viewer.appendChild(hudElement);
+    renderHud();
+    requestRender();
+  } else if (!visible && hudElement) {
+    hudElement.remove();
+    hudElement = null;
+  }
+};
+
+export const buildTelemetrySummary = (sceneTitle) => ({
+  scene: sceneTitle || document.title,
+  url: window.location.pathname,
+  userAgent: navigator.userAgent,
+  devicePixelRatio: window.devicePixelRatio,
+  frameTime: frameStats(),
+  renderer: rendererStats(),
+  load: { ...loadTimings },
+});
+
+/**
+ * POST the current summary to the preview server.
+ *
+ * Static hosts without the endpoint answer 404/405 once; telemetry is then
+ * switched off for the rest of the session.
+ */
+export const sendTelemetry = async (sceneTitle) => {
+  if (!telemetryAvailable || window.location.protocol === 'file:') {
+    return false;
+  }
+  try {
+    const response = await fetch(TELEMETRY_URL, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(buildTelemetrySummary(sceneTitle)),
+      keepalive: true,
+    });
+    telemetryAvailable = response.ok;
+  } catch (error) {
+    telemetryAvailable = false;
+  }
+  return telemetryAvailable;
+};
+
+/**
+ * Report once the model has been on screen for a while, and again when the
+ * page is hidden so long sessions are summarised too.
+ */
+export const scheduleTelemetry = (getSceneTitle) => {
+  if (telemetryTimer) {
+    clearTimeout(telemetryTimer);
+  }
+  telemetryTimer = setTimeout(() => {
+    telemetryTimer = null;
+    sendTelemetry(getSceneTitle());
+  }, TELEMETRY_DELAY_MS);
+};
+
+export const registerTelemetryOnHide = (getSceneTitle) => {
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') {
+      sendTelemetry(getSceneTitle());
+    }
+  });
+};
@@ -0,0 +1,92 @@
+import * as THREE from 'three';
+
+// Fewer copies than this are not worth an extra InstancedMesh.
+const MIN_INSTANCES = 3;
+
+export const animatedNodeNames = (animations) => {
+  const names = new Set();
+  (animations || []).forEach((clip) => {
+    clip.tracks.forEach((track) => {
+      names.add(THREE.PropertyBinding.parseTrackName(track.name).nodeName);
+    });
+  });
+  return names;
+};
+
+export const isAnimated = (object, root, names) => {
+  for (let node = object; node && node !== root.parent; node = node.parent) {
+    if (names.has(node.name) || names.has(node.uuid)) {
+      return true;
+    }
+  }
+  return false;
+};
+
+const canInstance = (mesh) =>
+  mesh.isMesh &&
+  !mesh.isInstancedMesh &&
+  !mesh.isSkinnedMesh &&
+  !Array.isArray(mesh.material) &&
+  mesh.children.length === 0 &&
+  Object.keys(mesh.geometry.morphAttributes).length === 0;
+
+/**
+ * Collapse meshes that share a geometry and material into InstancedMeshes.
+ *
+ * Blender linked duplicates and collection instances arrive as separate
+ * nodes that reference the same glTF mesh, so GLTFLoader gives them shared
+ * geometry and material objects but one draw call each. Animated, skinned
+ * and morphing meshes, and meshes with children, are left untouched.
+ * Meshes already instanced through EXT_mesh_gpu_instancing are skipped.
+ *
+ * Returns the number of draw calls saved.
+ */
+export const instanceRepeatedMeshes = (root, animations) => {
+  root.updateMatrixWorld(true);
+  const animated = animatedNodeNames(animations);
+
+  const groups = new Map();
+  root.traverse((child) => {
+    if (!canInstance(child) || isAnimated(child, root, animated)) {
+      return;
+    }
+    const key = `${child.geometry.uuid}/${child.material.uuid}`;
+    if (!groups.has(key)) {
+      groups.set(key, []);
+    }
+    groups.get(key).push(child);
+  });
+
+  const rootInverse = root.matrixWorld.clone().invert();
+  const matrix = new THREE.Matrix4();
+  let saved = 0;
+
+  groups.forEach((meshes) => {
+    if (meshes.length < MIN_INSTANCES) {
+      return;
+    }
+    const [first] = meshes;
+    const instanced = new THREE.InstancedMesh(first.geometry, first.material, meshes.length);
+    instanced.name = first.name;
+    instanced.castShadow = meshes.some((mesh) => mesh.castShadow);
+    instanced.receiveShadow = meshes.some((mesh) => mesh.receiveShadow);
+    instanced.userData.instancedFrom = meshes.map((mesh) => mesh.name);
+
+    meshes.forEach((mesh, index) => {
+      matrix.multiplyMatrices(rootInverse, mesh.matrixWorld);
+      instanced.setMatrixAt(index, matrix);
+      mesh.removeFromParent();
+    });
+    instanced.instanceMatrix.needsUpdate = true;
+    instanced.computeBoundingBox();
+    instanced.computeBoundingSphere();
+
+    root.add(instanced);
+    saved += meshes.length - 1;
+  });
+
+  if (saved > 0) {
+    console.info(`[BlendXWeb] instancing saved ${saved} draw calls`);
+  }
+  return saved;
+};
@@ -0,0 +1,30 @@
+const EVENTS_URL = 'events';
+
+/**
+ * Subscribe to the preview server's reload notifications.
+ *
+ * Exported packages are usually served by plain static hosts without the
+ * events endpoint; EventSource then fails once and the connection is closed.
+ */
+export const connectLiveReload = (onReload) => {
+  if (typeof EventSource === 'undefined' || window.location.protocol === 'file:') {
+    return null;
+  }
+
+  const source = new EventSource(EVENTS_URL);
+  source.addEventListener('reload', (event) => {
+    let payload = {};
+    try {
+      payload = JSON.parse(event.data);
+    } catch (error) {
+      console.warn('[BlendXWeb] malformed reload event:', error);
+    }
+    onReload(payload);
+  });
+  source.addEventListener('error', () => {
+    if (source.readyState === EventSource.CLOSED) {
+      console.info('[BlendXWeb] live reload unavailable on this host');
+    }
+  });
+  return source;
+};
@@ -0,0 +1,233 @@
+import * as THREE from 'three';
+import { GLTFLoader } from 'three/examples/jsm/loaders/GLTFLoader.js';
+import { DRACOLoader } from 'three/examples/jsm/loaders/DRACOLoader.js';
+import { MeshoptDecoder } from 'three/examples/jsm/libs/meshopt_decoder.module.js';
+
+import { fetchResponseBody } from './stream.js';
+import { instanceRepeatedMeshes } from './instancing.js';
+import { dedupeMaterials } from './materials.js';
+
+const chunkCache = new Map();
+const pendingDownloads = new Map();
+let sharedLoader = null;
+let fetchWorker = null;
+let nextDownloadId = 0;
+
+const rejectPendingDownloads = (error) => {
+  pendingDownloads.forEach(({ reject }) => reject(error));
+  pendingDownloads.clear();
+};
+
+const getFetchWorker = () => {
+  if (fetchWorker !== null) {
+    return fetchWorker;
+  }
+  try {
+    fetchWorker = new Worker(new URL('./fetch.worker.js', import.meta.url), { type: 'module' });
+    fetchWorker.addEventListener('message', (event) => {
+      const { id, type } = event.data;
+      const pending = pendingDownloads.get(id);
+      if (!pending) {
+        return;
+      }
+      if (type === 'progress') {
+        pending.onProgress?.(event.data.loaded, event.data.total);
+      } else if (type === 'done') {
+        pendingDownloads.delete(id);
+        pending.resolve(event.data.buffer);
+      } else {
+        pendingDownloads.delete(id);
+        pending.reject(new Error(event.data.message));
+      }
+    });
+    fetchWorker.addEventListener('error', (event) => {
+      console.warn('Download worker failed, falling back to main-thread downloads:', event);
+      fetchWorker = false;
+      rejectPendingDownloads(new Error('Download worker failed'));
+    });
+  } catch (error) {
+    fetchWorker = false;
+  }
+  return fetchWorker;
+};
+
+/**
+ * Download a file once, streaming progress, and resolve with its bytes.
+ *
+ * The transfer runs in a worker when possible so the main thread only
+ * receives the finished (transferred) ArrayBuffer.
+ */
+export const fetchArrayBuffer = (url, onProgress) => {
+  const worker = getFetchWorker();
+  if (!worker) {
+    return fetchResponseBody(url, onProgress);
+  }
+  return new Promise((resolve, reject) => {
+    nextDownloadId += 1;
+    pendingDownloads.set(nextDownloadId, { resolve, reject, onProgress });
+    worker.postMessage({ id: nextDownloadId, url: new URL(url, document.baseURI).href });
+  });
+};
+
+/**
+ * Parse a downloaded GLB, merge identical materials and batch its repeated
+ * meshes into instances.
+ */
+export const parseModel = async (loader, buffer, resourcePath = '') => {
+  const gltf = await loader.parseAsync(buffer, resourcePath);
+  dedupeMaterials(gltf.scene);
+  instanceRepeatedMeshes(gltf.scene, gltf.animations);
+  return gltf;
+};
+
+const setupDracoLoader = () => {
+  const dracoLoader = new DRACOLoader();
+  dracoLoader.setDecoderPath('draco/');
+  // Prefer the WASM decoder (draco_wasm_wrapper.js + draco_decoder.wasm);
+  // fall back to the pure JS build where WebAssembly is unavailable.
+  dracoLoader.setDecoderConfig({ type: typeof WebAssembly === 'object' ? 'wasm' : 'js' });
+  // Geometry decoding already runs in DRACOLoader's worker pool; size it to
+  // the machine so chunked scenes decode in parallel.
+  dracoLoader.setWorkerLimit(Math.max(1, Math.min(navigator.hardwareConcurrency || 4, 8)));
+  return dracoLoader;
+};
+
+export const createGltfLoader = () => {
+  const loader = new GLTFLoader();
+  try {
+    const dracoLoader = setupDracoLoader();
+    loader.setDRACOLoader(dracoLoader);
+  } catch (error) {
+    console.warn('Draco loader setup failed, continuing without Draco support:', error);
+  }
+  // Accept EXT_meshopt_compression GLBs post-processed with gltfpack.
+  loader.setMeshoptDecoder(MeshoptDecoder);
+  return loader;
+};
+
+export const getGltfLoader = () => {
+  if (!sharedLoader) {
+    sharedLoader = createGltfLoader();
+  }
+  return sharedLoader;
+};
+
+/**
+ * Remember which export generation a manifest came from (the preview
+ * server's X-Generation header), so the files it lists are fetched from
+ * that same generation even if a newer export is published meanwhile.
+ */
+const withGeneration = (manifest, response) => {
+  const generation = parseInt(response.headers.get('x-generation') || '', 10);
+  if (Number.isInteger(generation)) {
+    manifest.generation = generation;
+  }
+  return manifest;
+};
+
+// Content-hashed URL of a manifest entry; static hosts ignore `g`.
+const manifestFileUrl = (manifest, entry) => {
+  const generation = manifest?.generation === undefined ? '' : `&g=${manifest.generation}`;
+  return `${entry.file}?v=${entry.hash}${generation}`;
+};
+
+export const fetchSceneManifest = async () => {
+  try {
+    const response = await fetch('scene_manifest.json', { cache: 'no-store' });
+    if (!response.ok) {
+      return null;
+    }
+    const manifest = await response.json();
+    return Array.isArray(manifest?.chunks) ? withGeneration(manifest, response) : null;
+  } catch (error) {
+    return null;
+  }
+};
+
+export const fetchLodManifest = async () => {
+  try {
+    const response = await fetch('scene_lod.json', { cache: 'no-store' });
+    if (!response.ok) {
+      return null;
+    }
+    const manifest = await response.json();
+    return Array.isArray(manifest?.levels) && manifest.levels.length > 1 ? withGeneration(manifest, response) : null;
+  } catch (error) {
+    return null;
+  }
+};
+
+/**
+ * Download and parse one level listed in `scene_lod.json` (`manifest`).
+ */
+export const loadLodLevel = async (loader, manifest, level, onProgress) => {
+  const buffer = await fetchArrayBuffer(manifestFileUrl(manifest, level), (loaded) => {
+    if (level.size) {
+      onProgress?.(Math.min(99, Math.floor((loaded / level.size) * 100)));
+    }
+  });
+  const slash = level.file.lastIndexOf('/');
+  return parseModel(loader, buffer, slash >= 0 ? level.file.slice(0, slash + 1) : '');
+};
+
+const loadChunk = async (loader, manifest, chunk, onProgress) => {
+  const buffer = await fetchArrayBuffer(manifestFileUrl(manifest, chunk), (loaded) =>
+    onProgress(chunk, loaded),
+  );
+  const slash = chunk.file.lastIndexOf('/');
+  return parseModel(loader, buffer, slash >= 0 ? chunk.file.slice(0, slash + 1) : '');
+};
+
+/**
+ * Assemble a chunked export into a single root group.
+ *
+ * Chunks already loaded with the same content hash are reused from the
+ * in-memory cache; only new or changed chunks are fetched.
+ */
+export const loadChunkedScene = async (loader, manifest, onProgress) => {
+  const totalBytes = manifest.chunks.reduce((sum, chunk) => sum + (chunk.size || 0), 0);
+  const loadedBytes = new Map();
+
+  const reportProgress = (chunk, loaded) => {
+    loadedBytes.set(chunk.name, loaded);
+    if (totalBytes > 0) {
+      const sum = [...loadedBytes.values()].reduce((acc, value) => acc + value, 0);
+      onProgress(Math.min(99, Math.floor((sum / totalBytes) * 100)));
+    }
+  };
+
+  const results = await Promise.all(
+    manifest.chunks.map(async (chunk) => {
+      const cached = chunkCache.get(chunk.name);
+      if (cached && cached.hash === chunk.hash) {
+        reportProgress(chunk, chunk.size || 0);
+        return cached.gltf;
+      }
+      const gltf = await loadChunk(loader, manifest, chunk, reportProgress);
+      gltf.scene.name = chunk.name;
+      chunkCache.set(chunk.name, { hash: chunk.hash, gltf });
+      return gltf;
+    }),
+  );
+
+  const liveNames = new Set(manifest.chunks.map((chunk) => chunk.name));
+  [...chunkCache.keys()].forEach((name) => {
+    if (!liveNames.has(name)) {
+      chunkCache.delete(name);
+    }
+  });
+
+  const root = new THREE.Group();
+  root.name = 'SceneChunks';
+  const animations = [];
+  results.forEach((gltf) => {
+    root.add(gltf.scene);
+    animations.push(...(gltf.animations || []));
+  });
+
+  return {
+    scene: root,
+    animations,
+    fileSize: totalBytes,
+  };
+};
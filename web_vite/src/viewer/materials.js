@@ -0,0 +1,154 @@
+import { getCamera, getRenderer, getScene } from './state.js';
+
+// Smooth/flat variants per material. Both variants map to the same record,
+// so a mesh can be switched whichever variant it currently shows.
+const shadingVariants = new WeakMap();
+
+const IGNORED_KEYS = new Set(['uuid', 'id', 'name', 'version', 'userData', '_listeners']);
+
+const valueKey = (value) => {
+  if (value === null || value === undefined) {
+    return String(value);
+  }
+  if (value.isTexture) {
+    return `texture:${value.uuid}`;
+  }
+  if (value.isColor) {
+    return `color:${value.getHexString()}`;
+  }
+  if (value.isVector2 || value.isVector3 || value.isVector4 || value.isEuler || value.isMatrix3) {
+    return value.toArray().join(',');
+  }
+  if (typeof value === 'object') {
+    return JSON.stringify(value);
+  }
+  return String(value);
+};
+
+const materialKey = (material) =>
+  Object.keys(material)
+    .filter((key) => !IGNORED_KEYS.has(key) && typeof material[key] !== 'function')
+    .sort()
+    .map((key) => `${key}=${valueKey(material[key])}`)
+    .join(';');
+
+const forEachMaterialSlot = (root, visit) => {
+  root.traverse((child) => {
+    if (!child.isMesh || !child.material) {
+      return;
+    }
+    if (Array.isArray(child.material)) {
+      child.material = child.material.map((material) => visit(material));
+    } else {
+      child.material = visit(child.material);
+    }
+  });
+};
+
+/**
+ * Point meshes whose materials are identical (same type, parameters and
+ * textures) at a single material instance.
+ *
+ * Exporters write one material per Blender material slot user, and
+ * GLTFLoader clones materials per mesh variant, so large scenes often
+ * carry many copies of the same material. Fewer materials mean fewer
+ * programs to prepare and more meshes that can share an instance batch.
+ */
+export const dedupeMaterials = (root) => {
+  const byKey = new Map();
+  let merged = 0;
+  forEachMaterialSlot(root, (material) => {
+    const key = `${material.type}|${materialKey(material)}`;
+    const shared = byKey.get(key);
+    if (!shared) {
+      byKey.set(key, material);
+      return material;
+    }
+    if (shared !== material) {
+      merged += 1;
+    }
+    return shared;
+  });
+  return merged;
+};
+
+const variantsOf = (material) => {
+  let record = shadingVariants.get(material);
+  if (!record) {
+    // A material GLTFLoader already made flat (geometry without normals)
+    // has no smooth variant; it keeps showing itself in both modes.
+    const flat = material.flatShading ? material : material.clone();
+    flat.flatShading = true;
+    record = { smooth: material, flat };
+    shadingVariants.set(material, record);
+    shadingVariants.set(flat, record);
+  }
+  return record;
+};
+
+/**
+ * Every material variant created for `material`, including itself.
+ */
+export const materialVariants = (material) => {
+  const record = shadingVariants.get(material);
+  return record ? [...new Set([record.smooth, record.flat])] : [material];
+};
+
+/**
+ * Switch every mesh under `root` to its `mode` ('smooth' or 'flat')
+ * variant. Only material references change, so no program is rebuilt.
+ */
+export const useShadingVariant = (root, mode) => {
+  forEachMaterialSlot(root, (material) => {
+    if (mode === 'flat') {
+      return variantsOf(material).flat;
+    }
+    return shadingVariants.get(material)?.smooth || material;
+  });
+};
+
+/**
+ * Set a property on every variant of the materials under `root`.
+ */
+export const setMaterialProperty = (root, property, value) => {
+  root.traverse((child) => {
+    if (!child.isMesh || !child.material) {
+      return;
+    }
+    const materials = Array.isArray(child.material) ? child.material : [child.material];
+    materials.forEach((material) => {
+      materialVariants(material).forEach((variant) => {
+        variant[property] = value;
+      });
+    });
+  });
+};
+
+/**
+ * Compile the programs of the shading mode not currently shown, so the
+ * first switch does not stall.
+ *
+ * The other variants are swapped in only for the synchronous part of
+ * `compileAsync` (which collects the materials to prepare) and swapped
+ * back before anything is drawn; compilation then finishes in the
+ * background where KHR_parallel_shader_compile is available.
+ */
+export const prewarmShadingVariants = (root, currentMode) => {
+  const renderer = getRenderer();
+  const scene = getScene();
+  const camera = getCamera();
+  if (!renderer || !scene || !camera || !renderer.compileAsync) {
+    return Promise.resolve();
+  }
+  const otherMode = currentMode === 'flat' ? 'smooth' : 'flat';
+  useShadingVariant(root, otherMode);
+  let pending;
+  try {
+    pending = renderer.compileAsync(root, camera, scene);
+  } finally {
+    useShadingVariant(root, currentMode);
+  }
+  return pending.catch((error) => {
+    console.warn('Shader pre-compilation failed:', error);
+  });
+};
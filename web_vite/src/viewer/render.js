@@ -0,0 +1,44 @@
+/**
+ * Render-on-demand scheduling.
+ *
+ * Frames are only drawn after `requestRender()` (control changes, resize,
+ * UI actions, model swaps) and keep going while the frame callback reports
+ * ongoing motion: damped camera movement or playing animations. Continuous
+ * mode redraws every animation frame, as the viewer used to.
+ */
+let frameCallback = null;
+let frameRequested = false;
+let loopRunning = false;
+let continuous = false;
+
+const onAnimationFrame = (now) => {
+  frameRequested = false;
+  // `resumed` tells the callback that the loop was idle before this frame,
+  // so clocks can be reset instead of reporting the pause as one long frame.
+  const resumed = !loopRunning;
+  const keepGoing = frameCallback ? frameCallback(now, resumed) : false;
+  loopRunning = continuous || Boolean(keepGoing);
+  if (loopRunning) {
+    requestRender();
+  }
+};
+
+export const setFrameCallback = (callback) => {
+  frameCallback = callback;
+  requestRender();
+};
+
+export const requestRender = () => {
+  if (frameRequested) {
+    return;
+  }
+  frameRequested = true;
+  requestAnimationFrame(onAnimationFrame);
+};
+
+export const setContinuousRendering = (enabled) => {
+  continuous = Boolean(enabled);
+  requestRender();
+};
+
+export const isContinuousRendering = () => continuous;
@@ -1,7 +1,5 @@
 import * as THREE from 'three';
 import { OrbitControls } from 'three/examples/jsm/controls/OrbitControls.js';
-import { GLTFLoader } from 'three/examples/jsm/loaders/GLTFLoader.js';
-import { DRACOLoader } from 'three/examples/jsm/loaders/DRACOLoader.js';
 
 import {
   setScene,
@@ -16,8 +14,13 @@ import {
   getControls,
   getDomRefs,
   getClock,
+  getMixer,
+  getModelRoot,
   setModelRoot,
+  setMixer,
+  setAnimationActions,
   setIsPlaying,
+  isPlaying,
   setReferenceCameraPose,
 } from './state.js';
 
@@ -28,14 +31,53 @@ import {
   setLoadingProgress,
   updateSceneInfo,
   updateModelInfo,
+  showSceneInfoStats,
   setModelFileSize,
   showErrorMessage,
   updateAnimationTimeDisplay,
 } from './ui.js';
 
-import { initializeAnimations } from './actions.js';
+import {
+  initializeAnimations,
+  applyShadingMode,
+  toggleNormals,
+  toggleWireframe,
+  toggleLights,
+  updateLightingIntensity,
+  seekAnimation,
+  pauseAnimations,
+} from './actions.js';
 import { registerControlHandlers } from './controls.js';
 import { tickAnimations } from './animation.js';
+import {
+  getGltfLoader,
+  fetchArrayBuffer,
+  fetchSceneManifest,
+  fetchLodManifest,
+  loadChunkedScene,
+  loadLodLevel,
+  parseModel,
+} from './loader.js';
+import { connectLiveReload } from './live.js';
+import { requestRender, setContinuousRendering, setFrameCallback } from './render.js';
+import { cullScene, indexModel, pick } from './spatial.js';
+import { materialVariants, prewarmShadingVariants } from './materials.js';
+import {
+  markLoadTiming,
+  recordFrame,
+  registerTelemetryOnHide,
+  resetFrameClock,
+  resetLoadTimings,
+  scheduleTelemetry,
+  setHudVisible,
+  timed,
+} from './hud.js';
+
+const getSceneTitle = () => getDomRefs().sceneTitle?.textContent;
+
+// Latest scene_info.json; from version 2 it carries bounds, counts and the
+// scene camera, available before the model itself has downloaded.
+let sceneInfo = null;
 
 const extractReferenceCameraPose = (root) => {
   let pose = null;
@@ -67,6 +109,25 @@ const extractReferenceCameraPose = (root) => {
   return pose;
 };
 
+const sceneInfoCameraPose = (info) => {
+  const camera = info?.camera;
+  if (!camera) {
+    return null;
+  }
+  const position = new THREE.Vector3().fromArray(camera.position);
+  const target = new THREE.Vector3().fromArray(camera.target);
+  const up = new THREE.Vector3().fromArray(camera.up || [0, 1, 0]);
+  const quaternion = new THREE.Quaternion().setFromRotationMatrix(
+    new THREE.Matrix4().lookAt(position, target, up),
+  );
+  return {
+    position: camera.position,
+    quaternion: quaternion.toArray(),
+    target: camera.target,
+    fov: camera.fov,
+  };
+};
+
 const createRenderer = (container) => {
   const renderer = new THREE.WebGLRenderer({ antialias: true });
   renderer.setSize(container.clientWidth, container.clientHeight);
@@ -147,6 +208,7 @@ const initScene = () => {
     controls = new OrbitControls(camera, renderer.domElement);
     controls.enableDamping = true;
     controls.dampingFactor = 0.05;
+    controls.addEventListener('change', requestRender);
   } catch (error) {
     console.error('Error creating OrbitControls:', error);
   }
@@ -166,8 +228,9 @@ const initScene = () => {
   setClock(clock);
 
   window.addEventListener('resize', handleResize);
+  renderer.domElement.addEventListener('dblclick', focusOnPointer);
 
-  animate();
+  setFrameCallback(renderFrame);
 };
 
 const handleResize = () => {
@@ -182,6 +245,29 @@ const handleResize = () => {
   camera.aspect = viewer.clientWidth / viewer.clientHeight;
   camera.updateProjectionMatrix();
   renderer.setSize(viewer.clientWidth, viewer.clientHeight);
+  requestRender();
+};
+
+/**
+ * Double-click: orbit around the surface point under the pointer.
+ */
+const focusOnPointer = async (event) => {
+  const camera = getCamera();
+  const controls = getControls();
+  if (!camera || !controls) {
+    return;
+  }
+  const rect = event.currentTarget.getBoundingClientRect();
+  const ndc = new THREE.Vector2(
+    ((event.clientX - rect.left) / rect.width) * 2 - 1,
+    -((event.clientY - rect.top) / rect.height) * 2 + 1,
+  );
+  const hit = await pick(camera, ndc);
+  if (hit) {
+    controls.target.copy(hit.point);
+    controls.update();
+    requestRender();
+  }
 };
 
 const loadSceneInfo = async () => {
@@ -191,6 +277,7 @@ const loadSceneInfo = async () => {
       throw new Error(`HTTP error: ${response.status}`);
     }
     const data = await response.json();
+    sceneInfo = data;
     updateSceneInfo(data);
 
     if (!data.has_animations) {
@@ -203,6 +290,7 @@ const loadSceneInfo = async () => {
     return data;
   } catch (error) {
     console.warn('Unable to load scene_info.json:', error);
+    sceneInfo = null;
     updateSceneInfo(null);
     const { animationControls } = getDomRefs();
     if (animationControls) {
@@ -212,21 +300,13 @@ const loadSceneInfo = async () => {
   }
 };
 
-const setupDracoLoader = () => {
-  const dracoLoader = new DRACOLoader();
-  dracoLoader.setDecoderPath('draco/');
-  dracoLoader.setDecoderConfig({ type: 'js' });
-  return dracoLoader;
-};
-
-const centerCameraOnModel = (model) => {
+const frameBox = (boundingBox) => {
   const camera = getCamera();
   const controls = getControls();
   if (!camera) {
     return;
   }
 
-  const boundingBox = new THREE.Box3().setFromObject(model);
   const center = new THREE.Vector3();
   boundingBox.getCenter(center);
   const size = new THREE.Vector3();
@@ -248,121 +328,384 @@ const centerCameraOnModel = (model) => {
   }
 };
 
+const centerCameraOnModel = (model) => {
+  frameBox(new THREE.Box3().setFromObject(model));
+};
+
+/**
+ * Frame the exported scene bounds from `scene_info.json` while the model is
+ * still downloading. Returns true when the view was framed.
+ */
+const frameSceneInfo = (info) => {
+  const bounds = info?.bounds;
+  if (!bounds) {
+    return false;
+  }
+  frameBox(new THREE.Box3(new THREE.Vector3().fromArray(bounds.min), new THREE.Vector3().fromArray(bounds.max)));
+  requestRender();
+  return true;
+};
+
+const presentModel = (gltf, { preserveView = false } = {}) => {
+  const scene = getScene();
+  if (!scene) {
+    throw new Error('Scene not initialized');
+  }
+
+  gltf.scene.traverse((child) => {
+    if (child.isMesh) {
+      child.castShadow = true;
+      child.receiveShadow = true;
+    }
+  });
+
+  scene.add(gltf.scene);
+  setModelRoot(gltf.scene);
+  if (!showSceneInfoStats(sceneInfo)) {
+    updateModelInfo(gltf);
+  }
+
+  const refPose = sceneInfoCameraPose(sceneInfo) || extractReferenceCameraPose(gltf.scene);
+  if (refPose) {
+    setReferenceCameraPose(refPose);
+  }
+
+  if (!preserveView) {
+    centerCameraOnModel(gltf.scene);
+  }
+
+  const { animationControls, animationSlider } = getDomRefs();
+
+  if (gltf.animations && gltf.animations.length > 0) {
+    const mixer = new THREE.AnimationMixer(gltf.scene);
+    const duration = Math.max(...gltf.animations.map((clip) => clip.duration));
+    initializeAnimations(gltf, duration, mixer);
+
+    if (animationControls) {
+      animationControls.style.display = '';
+    }
+  } else {
+    setIsPlaying(false);
+    updateAnimationTimeDisplay(0, 0);
+    if (animationControls) {
+      animationControls.style.display = 'none';
+    }
+    if (animationSlider) {
+      animationSlider.max = 0;
+      animationSlider.value = 0;
+    }
+  }
+
+  requestRender();
+  // Picking and culling hierarchies are built after the first frame.
+  indexModel(gltf.scene, gltf.animations, requestRender);
+  setTimeout(() => {
+    if (getModelRoot() === gltf.scene) {
+      prewarmShadingVariants(gltf.scene, getDomRefs().shadingToggle?.dataset.mode || 'smooth');
+    }
+  }, 0);
+};
+
+const loadSingleModel = async (loader) => {
+  // One streamed download; the bytes go straight to GLTFLoader.parseAsync so
+  // the browser never transfers scene.glb twice.
+  const buffer = await timed(
+    'download',
+    fetchArrayBuffer('scene.glb', (loaded, total) => {
+      if (total) {
+        setLoadingProgress(Math.min(99, Math.floor((loaded / total) * 100)));
+      }
+    }),
+  );
+  setModelFileSize(buffer.byteLength);
+  setLoadingProgress(100);
+  return timed('parse + decode', parseModel(loader, buffer, ''));
+};
+
+const fetchModel = async () => {
+  const loader = getGltfLoader();
+  const manifest = await fetchSceneManifest();
+  if (manifest) {
+    const gltf = await timed(
+      'chunks download + parse',
+      loadChunkedScene(loader, manifest, setLoadingProgress),
+    );
+    setModelFileSize(gltf.fileSize);
+    return gltf;
+  }
+  return loadSingleModel(loader);
+};
+
+const timedPresent = (gltf, options) => {
+  const started = performance.now();
+  presentModel(gltf, options);
+  markLoadTiming('present', performance.now() - started);
+};
+
+// Bumped whenever a new model load starts, so background refinement of an
+// older load never swaps its levels over a newer model.
+let modelGeneration = 0;
+
+/**
+ * Stream the finer LOD levels in after the coarse one is on screen.
+ *
+ * Each level replaces the previous one in place; camera and display
+ * toggles carry over. The last level is the full scene.glb.
+ */
+const refineModel = async (loader, manifest, levels, generation) => {
+  for (const level of levels) {
+    let gltf;
+    try {
+      gltf = await timed(`${level.name} download + parse`, loadLodLevel(loader, manifest, level));
+    } catch (error) {
+      console.error(`Failed to load ${level.file}:`, error);
+      return;
+    }
+    if (generation !== modelGeneration) {
+      return;
+    }
+    replaceModel(gltf, captureViewState());
+    markLoadTiming(`${level.name} on screen at`, performance.now());
+    if (level.name === 'full') {
+      setModelFileSize(level.size);
+    }
+  }
+};
+
 const loadModel = async () => {
   showLoadingOverlay();
   setLoadingProgress('start');
 
-  const loader = new GLTFLoader();
-  try {
-    const dracoLoader = setupDracoLoader();
-    loader.setDRACOLoader(dracoLoader);
-  } catch (error) {
-    console.warn('Draco loader setup failed, continuing without Draco support:', error);
+  setReferenceCameraPose(sceneInfoCameraPose(sceneInfo));
+  modelGeneration += 1;
+  const generation = modelGeneration;
+  resetLoadTimings();
+  // With exported bounds the view is framed now and kept when the model
+  // arrives; stats are filled in the same way.
+  const framed = frameSceneInfo(sceneInfo);
+  showSceneInfoStats(sceneInfo);
+  if (framed) {
+    markLoadTiming('framed at', performance.now());
   }
-
-  setReferenceCameraPose(null);
+  const presentOptions = { preserveView: framed };
 
   try {
-    const response = await fetch('scene.glb');
-    if (!response.ok) {
-      throw new Error(`HTTP error: ${response.status}`);
+    const loader = getGltfLoader();
+    const lod = await fetchLodManifest();
+    if (lod) {
+      // Time-to-first-frame only depends on the coarsest level, whose
+      // triangle budget is fixed at export time.
+      const [coarse, ...finer] = lod.levels;
+      const gltf = await timed(
+        `${coarse.name} download + parse`,
+        loadLodLevel(loader, lod, coarse, setLoadingProgress),
+      );
+      setLoadingProgress(100);
+      timedPresent(gltf, presentOptions);
+      hideLoadingOverlay();
+      markLoadTiming('first model on screen at', performance.now());
+      refineModel(loader, lod, finer, generation);
+      return gltf;
     }
 
-    const fileSize = response.headers.get('content-length');
-    if (fileSize) {
-      setModelFileSize(parseInt(fileSize, 10));
-    }
+    const gltf = await fetchModel();
+
+    setLoadingProgress(100);
+    timedPresent(gltf, presentOptions);
+    hideLoadingOverlay();
+    markLoadTiming('first model on screen at', performance.now());
+    return gltf;
   } catch (error) {
-    console.error('Failed to fetch scene.glb:', error);
-  }
-
-  return new Promise((resolve, reject) => {
-    loader.load(
-      'scene.glb',
-      (gltf) => {
-        setLoadingProgress(100);
-        const scene = getScene();
-        if (!scene) {
-          reject(new Error('Scene not initialized'));
-          return;
+    console.error('Error loading GLB:', error);
+    hideLoadingOverlay();
+    showErrorMessage('Error loading 3D model. Check console for details.');
+    throw error;
+  }
+};
+
+const collectResources = (root) => {
+  const resources = new Set();
+  if (!root) {
+    return resources;
+  }
+  root.traverse((child) => {
+    if (child.geometry) {
+      resources.add(child.geometry);
+    }
+    if (child.isInstancedMesh) {
+      // Frees the per-instance matrix buffers.
+      resources.add(child);
+    }
+    const materials = Array.isArray(child.material) ? child.material : [child.material];
+    materials.filter(Boolean).flatMap(materialVariants).forEach((material) => {
+      resources.add(material);
+      Object.values(material).forEach((value) => {
+        if (value && value.isTexture) {
+          resources.add(value);
         }
+      });
+    });
+  });
+  return resources;
+};
 
-        gltf.scene.traverse((child) => {
-          if (child.isMesh) {
-            child.castShadow = true;
-            child.receiveShadow = true;
-          }
-        });
+const captureViewState = () => {
+  const camera = getCamera();
+  const controls = getControls();
+  const mixer = getMixer();
+  const { shadingToggle, wireframeToggle, lightsToggle, lightingSlider, normalsStatus } =
+    getDomRefs();
+  return {
+    hasAnimations: Boolean(mixer),
+    animationTime: mixer ? mixer.time : 0,
+    wasPlaying: isPlaying(),
+    shadingMode: shadingToggle?.dataset.mode || 'smooth',
+    wireframe: Boolean(wireframeToggle?.checked),
+    lights: lightsToggle ? lightsToggle.checked : true,
+    lightingIntensity: lightingSlider ? parseFloat(lightingSlider.value || '1') : 1,
+    normals: normalsStatus?.textContent === 'ON',
+    cameraPose: camera
+      ? {
+          position: camera.position.clone(),
+          quaternion: camera.quaternion.clone(),
+          target: controls ? controls.target.clone() : null,
+        }
+      : null,
+  };
+};
 
-        scene.add(gltf.scene);
-        setModelRoot(gltf.scene);
-        updateModelInfo(gltf);
+const restoreViewState = (viewState) => {
+  const camera = getCamera();
+  const controls = getControls();
+  if (camera && viewState.cameraPose) {
+    camera.position.copy(viewState.cameraPose.position);
+    camera.quaternion.copy(viewState.cameraPose.quaternion);
+    if (controls && viewState.cameraPose.target) {
+      controls.target.copy(viewState.cameraPose.target);
+      controls.update();
+    }
+  }
 
-        const refPose = extractReferenceCameraPose(gltf.scene);
-        if (refPose) {
-          setReferenceCameraPose(refPose);
-        }
+  applyShadingMode(viewState.shadingMode);
+  toggleWireframe(viewState.wireframe);
+  toggleLights(viewState.lights);
+  updateLightingIntensity(viewState.lightingIntensity);
+  if (viewState.normals) {
+    toggleNormals(true);
+  }
 
-        centerCameraOnModel(gltf.scene);
-
-        const { animationControls, animationSlider } = getDomRefs();
-
-        if (gltf.animations && gltf.animations.length > 0) {
-          const mixer = new THREE.AnimationMixer(gltf.scene);
-          initializeAnimations(gltf, gltf.animations[0].duration, mixer);
-
-          if (animationControls) {
-            animationControls.style.display = '';
-          }
-        } else {
-          setIsPlaying(false);
-          updateAnimationTimeDisplay(0, 0);
-          if (animationControls) {
-            animationControls.style.display = 'none';
-          }
-          if (animationSlider) {
-            animationSlider.max = 0;
-            animationSlider.value = 0;
-          }
-        }
+  // A model that had no animations (e.g. a coarse LOD level) leaves the
+  // new clips in their default playback state.
+  if (getMixer() && viewState.hasAnimations) {
+    seekAnimation(viewState.animationTime);
+    if (!viewState.wasPlaying) {
+      pauseAnimations();
+    }
+  }
+};
 
-        hideLoadingOverlay();
-        resolve(gltf);
-      },
-      (xhr) => {
-        if (xhr.total) {
-          const percent = Math.floor((xhr.loaded / xhr.total) * 100);
-          setLoadingProgress(percent);
-        }
-      },
-      (error) => {
-        console.error('Error loading GLB:', error);
-        hideLoadingOverlay();
-        showErrorMessage('Error loading 3D model. Check console for details.');
-        reject(error);
-      },
-    );
-  });
+/**
+ * Replace the displayed model with `gltf`, disposing GPU resources the new
+ * model does not share and restoring `viewState` afterwards.
+ */
+const replaceModel = (gltf, viewState) => {
+  const scene = getScene();
+  const previousRoot = getModelRoot();
+  const previousMixer = getMixer();
+  if (previousMixer) {
+    previousMixer.stopAllAction();
+    if (previousRoot) {
+      previousMixer.uncacheRoot(previousRoot);
+    }
+  }
+  setMixer(null);
+  setAnimationActions([]);
+  toggleNormals(false);
+
+  const staleResources = collectResources(previousRoot);
+  collectResources(gltf.scene).forEach((resource) => staleResources.delete(resource));
+  if (previousRoot && scene) {
+    scene.remove(previousRoot);
+  }
+  staleResources.forEach((resource) => resource.dispose());
+
+  presentModel(gltf, { preserveView: true });
+  restoreViewState(viewState);
 };
 
-const animate = () => {
-  requestAnimationFrame(animate);
+let reloadInFlight = null;
+let reloadQueued = false;
+
+/**
+ * Swap in a freshly exported model without a page reload.
+ *
+ * Camera pose, animation time and display toggles are carried over; the
+ * renderer, controls and Draco decoder are reused.
+ */
+const reloadModel = async () => {
+  if (reloadInFlight) {
+    reloadQueued = true;
+    return reloadInFlight;
+  }
 
-  const controls = getControls();
-  if (controls && controls.update) {
-    controls.update();
+  reloadInFlight = (async () => {
+    const viewState = captureViewState();
+    try {
+      await loadSceneInfo();
+      // Live reloads go straight to the full scene: the viewer already shows
+      // the model, so a coarse intermediate would only flicker.
+      modelGeneration += 1;
+      resetLoadTimings();
+      const gltf = await fetchModel();
+      replaceModel(gltf, viewState);
+      console.info('[BlendXWeb] model reloaded');
+      scheduleTelemetry(getSceneTitle);
+    } catch (error) {
+      console.error('Live reload failed:', error);
+    }
+  })();
+
+  await reloadInFlight;
+  reloadInFlight = null;
+  if (reloadQueued) {
+    reloadQueued = false;
+    await reloadModel();
   }
+  return undefined;
+};
 
+const shadowCameras = (scene) =>
+  scene.children
+    .filter((child) => child.isDirectionalLight && child.castShadow && child.visible)
+    .map((light) => light.shadow.camera);
+
+/**
+ * Draw one frame; returns true while the view is still changing (damped
+ * camera motion or playing animations) and another frame is needed.
+ */
+const renderFrame = (now, resumed) => {
   const clock = getClock();
+  if (resumed) {
+    // Drop the idle gap so animations and frame stats do not jump.
+    clock?.getDelta();
+    resetFrameClock();
+  }
+
+  const controls = getControls();
+  const cameraMoving = Boolean(controls && controls.update && controls.update());
+
   const delta = clock ? clock.getDelta() : 0;
-  tickAnimations(delta);
+  const animating = tickAnimations(delta);
 
   const scene = getScene();
   const camera = getCamera();
   const renderer = getRenderer();
   if (scene && camera && renderer) {
+    cullScene(camera, shadowCameras(scene));
     renderer.render(scene, camera);
+    recordFrame(now);
   }
+  return cameraMoving || animating;
 };
 
 export const setupViewer = async () => {
@@ -374,9 +717,27 @@ export const setupViewer = async () => {
     hasAnimations: sceneInfo?.has_animations ?? false,
   });
 
+  const params = new URLSearchParams(window.location.search);
+  if (params.has('hud')) {
+    setHudVisible(true);
+  }
+  if (params.has('continuous')) {
+    setContinuousRendering(true);
+    const { continuousToggle } = getDomRefs();
+    if (continuousToggle) {
+      continuousToggle.checked = true;
+    }
+  }
+
   try {
     await loadModel();
+    scheduleTelemetry(getSceneTitle);
   } catch (error) {
     console.error('Model load failed:', error);
   }
+  registerTelemetryOnHide(getSceneTitle);
+
+  connectLiveReload(() => {
+    reloadModel();
+  });
 };
\ No newline at end of file
@@ -0,0 +1,371 @@
+import * as THREE from 'three';
+
+import { buildBVH, traverseNodes, traverseRay } from './bvh.js';
+import { animatedNodeNames, isAnimated } from './instancing.js';
+
+// Below this many static meshes three's per-object frustum test is cheap
+// enough that hierarchy culling does not pay for itself.
+const CULLING_MIN_OBJECTS = 256;
+const OBJECT_LEAF_SIZE = 4;
+
+let bvhWorker = null;
+let nextGeometryId = 0;
+let nextPickId = 0;
+let indexGeneration = 0;
+const geometryIds = new WeakMap();
+const builtGeometries = new Set();
+// Posted to the worker but not yet reported built; shared geometries
+// (every instance of an InstancedMesh is its own item) are sent once.
+const queuedGeometries = new Set();
+const pendingPicks = new Map();
+
+// Scene-level index of the current model: one item per static mesh or
+// instance, plus the moving meshes that are only raycast on demand.
+let sceneIndex = null;
+
+const getBvhWorker = () => {
+  if (bvhWorker !== null) {
+    return bvhWorker;
+  }
+  try {
+    bvhWorker = new Worker(new URL('./bvh.worker.js', import.meta.url), { type: 'module' });
+    bvhWorker.addEventListener('message', (event) => {
+      const message = event.data;
+      if (message.type === 'built') {
+        queuedGeometries.delete(message.id);
+        builtGeometries.add(message.id);
+      } else if (message.type === 'hit') {
+        const pending = pendingPicks.get(message.requestId);
+        pendingPicks.delete(message.requestId);
+        pending?.(message.hit);
+      }
+    });
+    bvhWorker.addEventListener('error', (event) => {
+      console.warn('BVH worker failed, picking falls back to brute-force raycasts:', event);
+      bvhWorker = false;
+      builtGeometries.clear();
+      queuedGeometries.clear();
+      pendingPicks.forEach((resolve) => resolve(null));
+      pendingPicks.clear();
+    });
+  } catch (error) {
+    bvhWorker = false;
+  }
+  return bvhWorker;
+};
+
+const geometryId = (geometry) => {
+  if (!geometryIds.has(geometry)) {
+    nextGeometryId += 1;
+    geometryIds.set(geometry, nextGeometryId);
+  }
+  return geometryIds.get(geometry);
+};
+
+// Copies positions to a tightly packed Float32Array; interleaved and
+// quantised (normalized integer) attributes are decoded through getX/Y/Z.
+const packPositions = (attribute) => {
+  if (!attribute.isInterleavedBufferAttribute && !attribute.normalized && attribute.array instanceof Float32Array) {
+    return attribute.array.slice(0, attribute.count * 3);
+  }
+  const positions = new Float32Array(attribute.count * 3);
+  for (let i = 0; i < attribute.count; i += 1) {
+    positions[i * 3] = attribute.getX(i);
+    positions[i * 3 + 1] = attribute.getY(i);
+    positions[i * 3 + 2] = attribute.getZ(i);
+  }
+  return positions;
+};
+
+const sendGeometry = (worker, geometry) => {
+  const id = geometryId(geometry);
+  const attribute = geometry.getAttribute('position');
+  if (builtGeometries.has(id) || queuedGeometries.has(id) || !attribute) {
+    return id;
+  }
+  queuedGeometries.add(id);
+  const positions = packPositions(attribute);
+  const index = geometry.index ? Uint32Array.from(geometry.index.array) : null;
+  const transfer = index ? [positions.buffer, index.buffer] : [positions.buffer];
+  worker.postMessage({ type: 'build', id, positions, index }, transfer);
+  return id;
+};
+
+const restoreVisibility = (index) => {
+  if (!index.visible) {
+    return;
+  }
+  index.cullable.forEach((itemIndex) => {
+    const { object } = index.items[itemIndex];
+    object.visible = true;
+    object.frustumCulled = true;
+  });
+};
+
+const collectItems = (root, animations) => {
+  const names = animatedNodeNames(animations);
+  const items = [];
+  const dynamic = [];
+  const box = new THREE.Box3();
+  const matrix = new THREE.Matrix4();
+  root.updateMatrixWorld(true);
+
+  root.traverse((object) => {
+    if (!object.isMesh || !object.geometry?.getAttribute('position')) {
+      return;
+    }
+    if (object.isSkinnedMesh || object.morphTargetInfluences || isAnimated(object, root, names)) {
+      dynamic.push(object);
+      return;
+    }
+    const geometry = object.geometry;
+    if (!geometry.boundingBox) {
+      geometry.computeBoundingBox();
+    }
+    if (object.isInstancedMesh) {
+      for (let instanceId = 0; instanceId < object.count; instanceId += 1) {
+        object.getMatrixAt(instanceId, matrix);
+        matrix.premultiply(object.matrixWorld);
+        box.copy(geometry.boundingBox).applyMatrix4(matrix);
+        items.push({ object, instanceId, box: box.clone() });
+      }
+    } else {
+      box.copy(geometry.boundingBox).applyMatrix4(object.matrixWorld);
+      items.push({ object, instanceId: null, box: box.clone() });
+    }
+  });
+  return { items, dynamic };
+};
+
+const buildSceneIndex = (root, animations) => {
+  const started = performance.now();
+  const { items, dynamic } = collectItems(root, animations);
+  const bounds = new Float32Array(items.length * 6);
+  items.forEach((item, i) => {
+    item.box.min.toArray(bounds, i * 6);
+    item.box.max.toArray(bounds, i * 6 + 3);
+  });
+  const bvh = buildBVH(bounds, items.length, OBJECT_LEAF_SIZE);
+
+  // Only whole meshes without children can be hidden without side effects;
+  // instanced meshes are culled by three as a single object.
+  const cullable = [];
+  items.forEach((item, i) => {
+    if (item.instanceId === null && item.object.children.length === 0) {
+      cullable.push(i);
+    }
+  });
+
+  const worker = getBvhWorker();
+  const geometries = new Set();
+  if (worker) {
+    items.forEach((item) => geometries.add(sendGeometry(worker, item.object.geometry)));
+  }
+
+  console.info(
+    `[BlendXWeb] spatial index: ${items.length} objects, ${geometries.size} geometries queued ` +
+      `(${(performance.now() - started).toFixed(1)} ms)`,
+  );
+  return {
+    items,
+    dynamic,
+    bvh,
+    bounds,
+    geometries,
+    cullable,
+    culling: cullable.length >= CULLING_MIN_OBJECTS,
+    visible: null,
+  };
+};
+
+const releaseGeometries = (ids) => {
+  if (!ids.length) {
+    return;
+  }
+  ids.forEach((id) => {
+    builtGeometries.delete(id);
+    queuedGeometries.delete(id);
+  });
+  if (bvhWorker) {
+    bvhWorker.postMessage({ type: 'release', ids });
+  }
+};
+
+/**
+ * Drop the index of the current model and show everything it had culled.
+ */
+export const clearSpatialIndex = () => {
+  indexGeneration += 1;
+  if (!sceneIndex) {
+    return;
+  }
+  restoreVisibility(sceneIndex);
+  sceneIndex = null;
+};
+
+/**
+ * Index `root` once the browser is idle so the first frame is not delayed.
+ *
+ * Builds the object hierarchy on the main thread (one box per mesh or
+ * instance) and hands each unique geometry to the BVH worker, which keeps
+ * the triangle hierarchies. Geometries the new model no longer uses are
+ * released from the worker.
+ */
+export const indexModel = (root, animations, onReady) => {
+  const previous = sceneIndex;
+  clearSpatialIndex();
+  const generation = indexGeneration;
+  const schedule = window.requestIdleCallback
+    ? (callback) => window.requestIdleCallback(callback, { timeout: 1000 })
+    : (callback) => setTimeout(callback, 0);
+
+  schedule(() => {
+    if (generation !== indexGeneration) {
+      return;
+    }
+    sceneIndex = buildSceneIndex(root, animations);
+    if (previous) {
+      releaseGeometries([...previous.geometries].filter((id) => !sceneIndex.geometries.has(id)));
+    }
+    onReady?.();
+  });
+};
+
+const frustumMatrix = new THREE.Matrix4();
+const nodeBox = new THREE.Box3();
+
+const cameraFrustum = (camera) => {
+  camera.updateMatrixWorld();
+  frustumMatrix.multiplyMatrices(camera.projectionMatrix, camera.matrixWorldInverse);
+  return new THREE.Frustum().setFromProjectionMatrix(frustumMatrix);
+};
+
+/**
+ * Hide static meshes outside the view (and outside `shadowCameras`, so
+ * off-screen casters keep their shadows) using the object hierarchy.
+ *
+ * Only visibility changes are written to the scene graph. Meshes left
+ * visible skip three's own per-object test, which the hierarchy replaces.
+ */
+export const cullScene = (camera, shadowCameras = []) => {
+  const index = sceneIndex;
+  if (!index || !index.culling) {
+    return;
+  }
+  const frusta = [camera, ...shadowCameras].map(cameraFrustum);
+  const testNode = (bounds, offset) => {
+    nodeBox.min.fromArray(bounds, offset);
+    nodeBox.max.fromArray(bounds, offset + 3);
+    return frusta.some((candidate) => candidate.intersectsBox(nodeBox));
+  };
+
+  const visible = new Set();
+  traverseNodes(index.bvh, testNode, (item) => visible.add(item));
+
+  index.cullable.forEach((item) => {
+    const show = visible.has(item);
+    if (!index.visible || index.visible.has(item) !== show) {
+      const { object } = index.items[item];
+      object.visible = show;
+      object.frustumCulled = false;
+    }
+  });
+  index.visible = visible;
+};
+
+const raycaster = new THREE.Raycaster();
+const inverseMatrix = new THREE.Matrix4();
+const localOrigin = new THREE.Vector3();
+const localTarget = new THREE.Vector3();
+
+const bruteForceHit = (object, instanceId = null) => {
+  const hits = raycaster.intersectObject(object, false);
+  const hit = instanceId === null ? hits[0] : hits.find((entry) => entry.instanceId === instanceId);
+  return hit ? { object, instanceId: hit.instanceId ?? null, distance: hit.distance, point: hit.point } : null;
+};
+
+const nearest = (a, b) => (!a || (b && b.distance < a.distance) ? b : a);
+
+const queryWorker = (queries) =>
+  new Promise((resolve) => {
+    nextPickId += 1;
+    pendingPicks.set(nextPickId, resolve);
+    bvhWorker.postMessage({ type: 'raycast', requestId: nextPickId, queries });
+  });
+
+/**
+ * Find the closest surface under `ndc` (normalised device coordinates).
+ *
+ * The object hierarchy narrows the candidates; their triangle hierarchies
+ * are queried in the BVH worker. Moving meshes and geometries the worker
+ * has not finished building are raycast directly with three.
+ */
+export const pick = async (camera, ndc) => {
+  const index = sceneIndex;
+  if (!index) {
+    return null;
+  }
+  raycaster.setFromCamera(ndc, camera);
+  const { ray } = raycaster;
+
+  let best = null;
+  index.dynamic.forEach((object) => {
+    best = nearest(best, bruteForceHit(object));
+  });
+
+  const candidates = [];
+  const limit = best ? best.distance : Infinity;
+  traverseRay(index.bvh, ray.origin.toArray(), ray.direction.toArray(), limit, (item, entry) => {
+    candidates.push({ item, entry });
+    return limit;
+  });
+  // Nearest boxes first: once a box starts beyond the closest hit so far,
+  // neither it nor anything after it can win.
+  candidates.sort((a, b) => a.entry - b.entry);
+
+  const queries = [];
+  for (const { item, entry } of candidates) {
+    if (best && entry > best.distance) {
+      break;
+    }
+    const { object, instanceId } = index.items[item];
+    const id = geometryIds.get(object.geometry);
+    if (!bvhWorker || !builtGeometries.has(id)) {
+      best = nearest(best, bruteForceHit(object, instanceId));
+      continue;
+    }
+    inverseMatrix.copy(object.matrixWorld);
+    if (instanceId !== null) {
+      const instanceMatrix = new THREE.Matrix4();
+      object.getMatrixAt(instanceId, instanceMatrix);
+      inverseMatrix.multiply(instanceMatrix);
+    }
+    inverseMatrix.invert();
+    // Transform the ray without normalising, so the hit parameter stays a
+    // world-space distance for every mesh.
+    localOrigin.copy(ray.origin).applyMatrix4(inverseMatrix);
+    localTarget.copy(ray.origin).add(ray.direction).applyMatrix4(inverseMatrix).sub(localOrigin);
+    queries.push({
+      id,
+      key: item,
+      origin: localOrigin.toArray(),
+      direction: localTarget.toArray(),
+      entry,
+      far: best ? best.distance : Infinity,
+    });
+  }
+
+  if (queries.length) {
+    const hit = await queryWorker(queries);
+    if (hit && index === sceneIndex) {
+      const { object, instanceId } = index.items[hit.key];
+      best = nearest(best, {
+        object,
+        instanceId,
+        distance: hit.t,
+        point: ray.at(hit.t, new THREE.Vector3()),
+      });
+    }
+  }
+  return best;
+};
@@ -25,6 +25,8 @@ const state = {
     wireframeToggle: null,
     gridToggle: null,
     lightsToggle: null,
+    hudToggle: null,
+    continuousToggle: null,
     resetCamera: null,
     topView: null,
     frontView: null,
@@ -0,0 +1,62 @@
+/**
+ * Total decoded bytes of a response, or 0 when unknown.
+ *
+ * The body stream yields decoded bytes, while Content-Length is the
+ * transfer size; for a precompressed variant the server sends the decoded
+ * size as X-Uncompressed-Length. Without it progress is indeterminate.
+ */
+const decodedLength = (response) => {
+  const header = response.headers.get('content-encoding')
+    ? response.headers.get('x-uncompressed-length')
+    : response.headers.get('content-length');
+  return parseInt(header || '0', 10) || 0;
+};
+
+/**
+ * Read a fetch Response body into a single ArrayBuffer, reporting progress.
+ *
+ * `total` is the decoded size, or 0 when it is unknown; callers should
+ * still clamp the resulting percentage.
+ */
+export const readResponseBody = async (response, onProgress) => {
+  const total = decodedLength(response);
+
+  if (!response.body || typeof response.body.getReader !== 'function') {
+    const buffer = await response.arrayBuffer();
+    onProgress?.(buffer.byteLength, total);
+    return buffer;
+  }
+
+  const reader = response.body.getReader();
+  const parts = [];
+  let loaded = 0;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    parts.push(value);
+    loaded += value.byteLength;
+    onProgress?.(loaded, total);
+  }
+
+  if (parts.length === 1 && parts[0].byteOffset === 0 && parts[0].byteLength === parts[0].buffer.byteLength) {
+    return parts[0].buffer;
+  }
+
+  const bytes = new Uint8Array(loaded);
+  let offset = 0;
+  parts.forEach((part) => {
+    bytes.set(part, offset);
+    offset += part.byteLength;
+  });
+  return bytes.buffer;
+};
+
+export const fetchResponseBody = async (url, onProgress) => {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`HTTP error: ${response.status} for ${url}`);
+  }
+  return readResponseBody(response, onProgress);
+};
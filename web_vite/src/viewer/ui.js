@@ -43,23 +43,53 @@ export const setLoadingProgress = (value) => {
   }
 };
 
+const formatMegabytes = (bytes) => `${(bytes / (1024 * 1024)).toFixed(2)} MB`;
+
 export const updateSceneInfo = (info) => {
   const { sceneTitle, sceneStats } = getDomRefs();
   if (!sceneTitle || !sceneStats) return;
 
   if (info) {
     sceneTitle.textContent = info.title || 'Blender Scene';
-    sceneStats.textContent = `Objects: ${info.objects ?? '-'}`;
+    const parts = [`Objects: ${info.objects ?? '-'}`];
+    if (info.textures?.count) {
+      parts.push(`Textures: ${info.textures.count} (${formatMegabytes(info.textures.bytes)})`);
+    }
+    if (info.animations?.length) {
+      const longest = Math.max(...info.animations.map((clip) => clip.duration));
+      parts.push(`Clips: ${info.animations.length} (${formatTime(longest)})`);
+    }
+    sceneStats.textContent = parts.join(' · ');
   } else {
     sceneTitle.textContent = 'Blender Scene';
     sceneStats.textContent = 'No scene info available';
   }
 };
 
-export const updateModelInfo = (gltf) => {
+const setModelStats = (vertices, faces, materials) => {
   const { modelVertices, modelFaces, modelMaterials } = getDomRefs();
   if (!modelVertices || !modelFaces || !modelMaterials) return;
 
+  modelVertices.textContent = vertices ? vertices.toLocaleString() : '-';
+  modelFaces.textContent = faces ? Math.floor(faces).toLocaleString() : '-';
+  modelMaterials.textContent = materials || '-';
+};
+
+/**
+ * Fill the model stats from `scene_info.json` (exported since version 2).
+ * Returns false when the info carries no counts and the model has to be
+ * walked instead. The counts describe the full scene, also while a coarse
+ * LOD level is on screen.
+ */
+export const showSceneInfoStats = (info) => {
+  if (!info || typeof info.triangles !== 'number') {
+    return false;
+  }
+  setModelStats(info.vertices, info.triangles, info.materials);
+  return true;
+};
+
+export const updateModelInfo = (gltf) => {
   let totalVertices = 0;
   let totalFaces = 0;
   const materials = new Set();
@@ -67,11 +97,12 @@ export const updateModelInfo = (gltf) => {
   if (gltf && gltf.scene) {
     gltf.scene.traverse((child) => {
       if (child.isMesh && child.geometry) {
+        const copies = child.isInstancedMesh ? child.count : 1;
         if (child.geometry.attributes.position) {
-          totalVertices += child.geometry.attributes.position.count;
+          totalVertices += child.geometry.attributes.position.count * copies;
         }
         if (child.geometry.index) {
-          totalFaces += child.geometry.index.count / 3;
+          totalFaces += (child.geometry.index.count / 3) * copies;
         }
         if (child.material) {
           materials.add(child.material.uuid);
@@ -80,17 +111,14 @@ export const updateModelInfo = (gltf) => {
     });
   }
 
-  modelVertices.textContent = totalVertices ? totalVertices.toLocaleString() : '-';
-  modelFaces.textContent = totalFaces ? Math.floor(totalFaces).toLocaleString() : '-';
-  modelMaterials.textContent = materials.size || '-';
+  setModelStats(totalVertices, totalFaces, materials.size);
 };
 
 export const setModelFileSize = (bytes) => {
   const { modelFilesize } = getDomRefs();
   if (!modelFilesize || !bytes) return;
 
-  const mb = bytes / (1024 * 1024);
-  modelFilesize.textContent = `${mb.toFixed(2)} MB`;
+  modelFilesize.textContent = formatMegabytes(bytes);
 };
 
 export const showErrorMessage = (message) => {
@@ -182,6 +210,8 @@ export const initializeUI = () => {
     wireframeToggle: document.getElementById('toggle-wireframe'),
     gridToggle: document.getElementById('toggle-grid'),
     lightsToggle: document.getElementById('toggle-lights'),
+    hudToggle: document.getElementById('toggle-hud'),
+    continuousToggle: document.getElementById('toggle-continuous'),
     resetCamera: document.getElementById('btn-reset-camera'),
     topView: document.getElementById('btn-top-view'),
     frontView: document.getElementById('btn-front-view'),